@@ -0,0 +1,35 @@
+"""Add storage_cursors table for incremental scans
+
+Revision ID: 5a7c9e1b3d24
+Revises: 8e2b6d4f0a13
+Create Date: 2025-05-08 10:12:37.418205
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5a7c9e1b3d24"
+down_revision: Union[str, None] = "8e2b6d4f0a13"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "storage_cursors",
+        sa.Column("scope", sa.String(), nullable=False),
+        sa.Column("cursor", sa.Text(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("scope"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("storage_cursors")
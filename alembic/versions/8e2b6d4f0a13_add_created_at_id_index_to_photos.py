@@ -0,0 +1,33 @@
+"""Add composite (created_at, id) index to photos
+
+Revision ID: 8e2b6d4f0a13
+Revises: 3c1f8a2d9b47
+Create Date: 2025-05-07 16:41:09.552871
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8e2b6d4f0a13"
+down_revision: Union[str, None] = "3c1f8a2d9b47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # The composite index serves both the ORDER BY and the keyset seek
+    # (created_at, id) > (:c, :i), so the single-column index is redundant.
+    op.create_index(
+        "ix_photos_created_at_id", "photos", ["created_at", "id"], unique=False
+    )
+    op.drop_index("ix_photos_created_at", table_name="photos")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index("ix_photos_created_at", "photos", ["created_at"], unique=False)
+    op.drop_index("ix_photos_created_at_id", table_name="photos")
@@ -0,0 +1,35 @@
+"""Add content_hash, size and mtime columns to photos
+
+Revision ID: b7d1f3a5c926
+Revises: 5a7c9e1b3d24
+Create Date: 2025-05-09 09:41:05.127634
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7d1f3a5c926"
+down_revision: Union[str, None] = "5a7c9e1b3d24"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("photos", sa.Column("content_hash", sa.String(64), nullable=True))
+    op.add_column("photos", sa.Column("size", sa.BigInteger(), nullable=True))
+    op.add_column("photos", sa.Column("mtime", sa.Float(), nullable=True))
+    op.create_index("ix_photos_content_hash", "photos", ["content_hash"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_photos_content_hash", table_name="photos")
+    op.drop_column("photos", "mtime")
+    op.drop_column("photos", "size")
+    op.drop_column("photos", "content_hash")
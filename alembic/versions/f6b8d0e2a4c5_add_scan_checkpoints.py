@@ -0,0 +1,63 @@
+"""Add scan checkpoint tables and scan_jobs.resumed_from
+
+Revision ID: f6b8d0e2a4c5
+Revises: e5a7c9d1f3b4
+Create Date: 2025-05-12 16:48:09.331752
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f6b8d0e2a4c5"
+down_revision: Union[str, None] = "e5a7c9d1f3b4"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "scan_checkpoints",
+        sa.Column("scope", sa.String(), nullable=False),
+        sa.Column("job_id", sa.Uuid(), nullable=True),
+        sa.Column("cursor", sa.Text(), nullable=True),
+        sa.Column("planned", sa.Integer(), nullable=False),
+        sa.Column("processed", sa.Integer(), nullable=False),
+        sa.Column("batches", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("scope"),
+    )
+    op.create_table(
+        "scan_checkpoint_items",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("scope", sa.String(), nullable=False),
+        sa.Column("kind", sa.String(8), nullable=False),
+        sa.Column("key", sa.String(), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=True),
+        sa.Column("mtime", sa.Float(), nullable=True),
+        sa.Column("content_hash", sa.String(64), nullable=True),
+        sa.Column("photo_id", sa.Uuid(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_scan_checkpoint_items_scope_id",
+        "scan_checkpoint_items",
+        ["scope", "id"],
+    )
+    op.add_column("scan_jobs", sa.Column("resumed_from", sa.Uuid(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("scan_jobs", "resumed_from")
+    op.drop_index(
+        "ix_scan_checkpoint_items_scope_id", table_name="scan_checkpoint_items"
+    )
+    op.drop_table("scan_checkpoint_items")
+    op.drop_table("scan_checkpoints")
@@ -0,0 +1,83 @@
+"""
+Micro-benchmark for the image pipeline in tagline_backend_app.imaging.
+
+Measures the per-request cost of opening the source image, comparing the old
+prologue (pillow_heif.is_supported + a throwaway Image.open just to check the
+format, then the real open, each on its own BytesIO) against the single open
+the pipeline now does, and times the full thumbnail and display renditions.
+
+Usage:
+    python -m benchmarks.bench_image_pipeline [--size 4032x3024] [--repeat 50]
+"""
+
+import argparse
+import io
+import statistics
+import time
+from typing import Callable
+
+import pillow_heif
+from PIL import Image
+
+from tagline_backend_app import imaging
+
+
+def _legacy_open(image_data: bytes) -> Image.Image:
+    # What each route did before the pipeline was consolidated
+    if (
+        not pillow_heif.is_supported(io.BytesIO(image_data))
+        and not Image.open(io.BytesIO(image_data)).format
+    ):
+        pillow_heif.register_heif_opener()
+    return Image.open(io.BytesIO(image_data))
+
+
+def _sample(size: tuple[int, int], fmt: str) -> bytes:
+    # A gradient compresses like a photo better than a flat fill does
+    img = Image.linear_gradient("L").resize(size).convert("RGB")
+    buf = io.BytesIO()
+    img.save(buf, format=fmt, quality=90)
+    return buf.getvalue()
+
+
+def _time(fn: Callable[[bytes], object], data: bytes, repeat: int) -> list[float]:
+    fn(data)  # warm up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(data)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def _report(label: str, samples: list[float]) -> None:
+    print(
+        f"{label:<28} median {statistics.median(samples) * 1e6:10.1f} us"
+        f"   min {min(samples) * 1e6:10.1f} us"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", default="4032x3024", help="source WxH")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    size = tuple(int(v) for v in args.size.split("x"))
+
+    imaging.register_codecs()
+    formats = ["JPEG"]
+    if pillow_heif.libheif_info().get("HEIF"):
+        formats.append("HEIF")
+
+    for fmt in formats:
+        data = _sample(size, fmt)
+        print(f"\n{fmt} {size[0]}x{size[1]} ({len(data) / 1024:.0f} KiB)")
+        _report("open: legacy prologue", _time(_legacy_open, data, args.repeat))
+        _report("open: single open", _time(imaging._open, data, args.repeat))
+        repeat = max(1, args.repeat // 10)
+        _report("render_thumbnail", _time(imaging.render_thumbnail, data, repeat))
+        _report("render_image", _time(imaging.render_image, data, repeat))
+
+
+if __name__ == "__main__":
+    main()
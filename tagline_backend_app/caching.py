@@ -1,16 +1,99 @@
 """Caching utilities, primarily for thumbnails."""
 
 import logging
-from typing import Optional
+import threading
+from typing import Any, Optional
+from uuid import UUID
 
 from cachetools import LRUCache
 
 from tagline_backend_app.config import get_settings
+from tagline_backend_app.disk_cache import DiskCache
+from tagline_backend_app.imaging import IMAGE_TRANSFORM, THUMBNAIL_TRANSFORM
+from tagline_backend_app.singleflight import SingleFlight
+
+# Sentinel for ByteLRUCache.pop() called without a default
+_MISSING = object()
+
+
+class ByteLRUCache(LRUCache):
+    """
+    Thread-safe LRU cache bounded by the total size in bytes of its values.
+
+    Each entry is weighed by ``len(value)``, and least recently used entries are
+    evicted until the new entry fits, so ``max_bytes`` is a hard ceiling on the
+    memory held by cached payloads. Hit, miss and eviction counters are kept for
+    capacity planning (see ``stats()``).
+    """
+
+    def __init__(self, max_bytes: int):
+        super().__init__(maxsize=max_bytes, getsizeof=len)
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __getitem__(self, key):
+        with self._lock:
+            return super().__getitem__(key)
+
+    def __setitem__(self, key, value):
+        with self._lock:
+            super().__setitem__(key, value)
+
+    def __delitem__(self, key):
+        with self._lock:
+            super().__delitem__(key)
+
+    def get(self, key, default=None):
+        """Return the cached value for key (marking it recently used), or default."""
+        with self._lock:
+            if key in self:
+                self.hits += 1
+                return self[key]
+            self.misses += 1
+            return default
+
+    def pop(self, key, default=_MISSING):
+        """
+        Remove key and return its value (not counted as an eviction), or
+        return default if key is absent; raises KeyError without a default.
+        """
+        with self._lock:
+            if default is _MISSING:
+                return super().pop(key)
+            return super().pop(key, default)
+
+    def popitem(self):
+        """Evict the least recently used entry (called when over budget)."""
+        with self._lock:
+            item = super().popitem()
+            self.evictions += 1
+            return item
+
+    def stats(self) -> dict[str, Any]:
+        """Return a snapshot of the cache's size and counters."""
+        with self._lock:
+            return {
+                "max_bytes": self.maxsize,
+                "current_bytes": self.currsize,
+                "entries": len(self),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
 
 # Global thumbnail cache instance (initialized later)
-THUMBNAIL_CACHE: Optional[LRUCache] = None
+THUMBNAIL_CACHE: Optional[ByteLRUCache] = None
 # Global image cache instance (initialized later)
-IMAGE_CACHE: Optional[LRUCache] = None
+IMAGE_CACHE: Optional[ByteLRUCache] = None
+# Global on-disk cache for thumbnails and images (second tier, initialized later)
+DERIVATIVE_CACHE: Optional[DiskCache] = None
+# Global on-disk cache for originals of remote providers (see CachedStorageProvider)
+ORIGINAL_CACHE: Optional[DiskCache] = None
+# Coalesces concurrent misses for the same rendition into one generation
+DERIVATIVE_FLIGHTS = SingleFlight()
 
 
 def initialize_thumbnail_cache():
@@ -19,28 +102,24 @@ def initialize_thumbnail_cache():
     settings = get_settings()
 
     max_size_mb = settings.THUMBNAIL_CACHE_MAX_MB
-    # Estimate cache item size (512x512 WebP can vary, using a rough estimate)
-    # Assume avg 50KB per thumbnail for sizing calculation
-    avg_thumbnail_size_kb = 50
-    max_items = int((max_size_mb * 1024) / avg_thumbnail_size_kb)
+    max_bytes = max_size_mb * 1024 * 1024
 
-    if max_items <= 0:
+    if max_bytes <= 0:
         logging.warning(
-            f"Calculated max_items for thumbnail cache is {max_items}. "
+            f"Thumbnail cache budget is {max_size_mb}MB. "
             f"Disabling cache. Check THUMBNAIL_CACHE_MAX_MB ({max_size_mb}MB)."
         )
         THUMBNAIL_CACHE = None  # Explicitly disable if size is too small
         return
 
     logging.info(
-        f"Initializing thumbnail LRU cache: max_size={max_size_mb}MB, "
-        f"estimated max_items={max_items} (assuming ~{avg_thumbnail_size_kb}KB/thumb)"
+        f"Initializing thumbnail LRU cache: max_size={max_size_mb}MB "
+        f"({max_bytes} bytes, sized by actual thumbnail bytes)"
     )
-    # Note: cachetools maxsize is number of items, not bytes
-    THUMBNAIL_CACHE = LRUCache(maxsize=max_items)
+    THUMBNAIL_CACHE = ByteLRUCache(max_bytes=max_bytes)
 
 
-def get_thumbnail_cache() -> Optional[LRUCache]:
+def get_thumbnail_cache() -> Optional[ByteLRUCache]:
     """Returns the initialized global thumbnail cache instance."""
     if THUMBNAIL_CACHE is None:
         logging.warning(
@@ -55,28 +134,146 @@ def initialize_image_cache():
     settings = get_settings()
 
     max_size_mb = settings.IMAGE_CACHE_MAX_MB
-    # Estimate cache item size (1024x1024 JPEG can vary, using a rough estimate)
-    # Assume avg 400KB per image for sizing calculation
-    avg_image_size_kb = 400
-    max_items = int((max_size_mb * 1024) / avg_image_size_kb)
+    max_bytes = max_size_mb * 1024 * 1024
 
-    if max_items <= 0:
+    if max_bytes <= 0:
         logging.warning(
-            f"Calculated max_items for image cache is {max_items}. "
+            f"Image cache budget is {max_size_mb}MB. "
             f"Disabling cache. Check IMAGE_CACHE_MAX_MB ({max_size_mb}MB)."
         )
         IMAGE_CACHE = None  # Explicitly disable if size is too small
         return
 
     logging.info(
-        f"Initializing image LRU cache: max_size={max_size_mb}MB, "
-        f"estimated max_items={max_items} (assuming ~{avg_image_size_kb}KB/image)"
+        f"Initializing image LRU cache: max_size={max_size_mb}MB "
+        f"({max_bytes} bytes, sized by actual image bytes)"
     )
-    IMAGE_CACHE = LRUCache(maxsize=max_items)
+    IMAGE_CACHE = ByteLRUCache(max_bytes=max_bytes)
 
 
-def get_image_cache() -> Optional[LRUCache]:
+def get_image_cache() -> Optional[ByteLRUCache]:
     """Returns the initialized global image cache instance."""
     if IMAGE_CACHE is None:
         logging.warning("Image cache accessed before initialization or is disabled.")
     return IMAGE_CACHE
+
+
+def initialize_derivative_cache():
+    """Initializes the global on-disk derivative cache based on environment settings."""
+    global DERIVATIVE_CACHE
+    settings = get_settings()
+
+    cache_dir = settings.DERIVATIVE_CACHE_DIR
+    max_size_mb = settings.DERIVATIVE_CACHE_MAX_MB
+    if cache_dir is None or max_size_mb <= 0:
+        logging.info(
+            "On-disk derivative cache disabled "
+            "(set DERIVATIVE_CACHE_DIR and DERIVATIVE_CACHE_MAX_MB to enable)."
+        )
+        DERIVATIVE_CACHE = None
+        return
+
+    try:
+        DERIVATIVE_CACHE = DiskCache(cache_dir, max_bytes=max_size_mb * 1024 * 1024)
+    except OSError as e:
+        logging.error(f"Could not open derivative cache at {cache_dir}: {e}")
+        DERIVATIVE_CACHE = None
+        return
+    logging.info(
+        f"Initializing on-disk derivative cache: path={cache_dir}, "
+        f"max_size={max_size_mb}MB"
+    )
+
+
+def get_derivative_cache() -> Optional[DiskCache]:
+    """Returns the initialized global on-disk derivative cache, or None if disabled."""
+    return DERIVATIVE_CACHE
+
+
+def initialize_original_cache():
+    """Initializes the global on-disk cache for originals from settings."""
+    global ORIGINAL_CACHE
+    settings = get_settings()
+
+    cache_dir = settings.ORIGINAL_CACHE_DIR
+    max_size_mb = settings.ORIGINAL_CACHE_MAX_MB
+    if cache_dir is None or max_size_mb <= 0:
+        logging.info(
+            "On-disk originals cache disabled "
+            "(set ORIGINAL_CACHE_DIR and ORIGINAL_CACHE_MAX_MB to enable)."
+        )
+        ORIGINAL_CACHE = None
+        return
+
+    try:
+        ORIGINAL_CACHE = DiskCache(cache_dir, max_bytes=max_size_mb * 1024 * 1024)
+    except OSError as e:
+        logging.error(f"Could not open originals cache at {cache_dir}: {e}")
+        ORIGINAL_CACHE = None
+        return
+    logging.info(
+        f"Initializing on-disk originals cache: path={cache_dir}, "
+        f"max_size={max_size_mb}MB"
+    )
+
+
+def get_original_cache() -> Optional[DiskCache]:
+    """Returns the initialized global on-disk originals cache, or None if disabled."""
+    return ORIGINAL_CACHE
+
+
+def _version(photo_id: UUID, content_hash: Optional[str]) -> str:
+    # Rows imported before content hashing have no hash; their keys keep the
+    # old id-only form
+    return f"{photo_id}:{content_hash}" if content_hash else str(photo_id)
+
+
+def derivative_key(
+    photo_id: UUID, transform: str, content_hash: Optional[str] = None
+) -> str:
+    """Key for a derived rendition of a photo's content in the on-disk cache."""
+    return f"{_version(photo_id, content_hash)}:{transform}"
+
+
+def thumbnail_cache_key(photo_id: UUID, content_hash: Optional[str] = None) -> str:
+    """Key for a photo's thumbnail in the in-memory thumbnail cache."""
+    return f"thumbnail:{_version(photo_id, content_hash)}"
+
+
+def image_cache_key(photo_id: UUID, content_hash: Optional[str] = None) -> str:
+    """Key for a photo's 1024px image in the in-memory image cache."""
+    return _version(photo_id, content_hash)
+
+
+def invalidate_renditions(photo_id: UUID, content_hash: Optional[str] = None) -> None:
+    """
+    Drop every cached rendition of a photo's content (memory and disk), e.g.
+    after its original changed; pass the hash the renditions were keyed on.
+    Memory caches of other worker processes are not reached, but they stop
+    being looked up once the row carries the new hash.
+    """
+    if THUMBNAIL_CACHE is not None:
+        THUMBNAIL_CACHE.pop(thumbnail_cache_key(photo_id, content_hash), None)
+    if IMAGE_CACHE is not None:
+        IMAGE_CACHE.pop(image_cache_key(photo_id, content_hash), None)
+    if DERIVATIVE_CACHE is not None:
+        for transform in (THUMBNAIL_TRANSFORM, IMAGE_TRANSFORM):
+            DERIVATIVE_CACHE.delete(derivative_key(photo_id, transform, content_hash))
+
+
+def get_derivative_flights() -> SingleFlight:
+    """Returns the global single-flight group used for rendition cache misses."""
+    return DERIVATIVE_FLIGHTS
+
+
+def get_cache_stats() -> dict[str, Any]:
+    """Return size and counter snapshots for each cache (None if disabled)."""
+    return {
+        "thumbnail": THUMBNAIL_CACHE.stats() if THUMBNAIL_CACHE is not None else None,
+        "image": IMAGE_CACHE.stats() if IMAGE_CACHE is not None else None,
+        "derivative_disk": (
+            DERIVATIVE_CACHE.stats() if DERIVATIVE_CACHE is not None else None
+        ),
+        "original_disk": ORIGINAL_CACHE.stats() if ORIGINAL_CACHE is not None else None,
+        "coalescing": DERIVATIVE_FLIGHTS.stats(),
+    }
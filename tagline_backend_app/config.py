@@ -16,13 +16,17 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 class FilesystemProviderSettings(BaseSettings):
     """
     Settings specific to the filesystem storage provider.
-    The path is now optional. If unset, provider will raise a runtime error on first use.
+    The path is now optional. If unset, provider will raise a runtime error on
+    first use.
     """
 
     path: Optional[Path] = Field(
         default=None,
         alias="FILESYSTEM_STORAGE_PATH",
-        description="Root directory for storing photos. Reads from FILESYSTEM_STORAGE_PATH env var. Optional; if unset, provider will raise on use.",
+        description=(
+            "Root directory for storing photos. Reads from FILESYSTEM_STORAGE_PATH env "
+            "var. Optional; if unset, provider will raise on use."
+        ),
     )
 
 
@@ -32,7 +36,9 @@ class Settings(BaseSettings):
 
     Includes authentication and security parameters:
     - BACKEND_PASSWORD: Password for admin or privileged backend actions.
-    - CORS_ALLOWED_ORIGINS: Comma-separated list of allowed CORS origins (e.g. 'https://frontend.com,https://admin.frontend.com'). If empty or unset, CORS is not enabled (secure default).
+    - CORS_ALLOWED_ORIGINS: Comma-separated list of allowed CORS origins
+      (e.g. 'https://frontend.com,https://admin.frontend.com'). If empty or
+      unset, CORS is not enabled (secure default).
     """
 
     @property
@@ -40,28 +46,53 @@ class Settings(BaseSettings):
         """Return True only if APP_ENV is 'production' (case-insensitive)."""
         return self.APP_ENV.strip().lower() == "production"
 
+    @property
+    def scan_extensions(self) -> Optional[list[str]]:
+        """Return SCAN_EXTENSIONS as lowercase suffixes, or None for all files."""
+        extensions = [
+            ext.strip().lower()
+            for ext in self.SCAN_EXTENSIONS.split(",")
+            if ext.strip()
+        ]
+        return [ext if ext.startswith(".") else f".{ext}" for ext in extensions] or None
+
     CORS_ALLOWED_ORIGINS: str = Field(
         default="",
-        description="Comma-separated list of allowed CORS origins. If empty, CORS is not enabled.",
+        description=(
+            "Comma-separated list of allowed CORS origins. If empty, CORS is not "
+            "enabled."
+        ),
     )
 
     APP_ENV: str = Field(
         default="production",
-        description="Application environment. Use 'production' for prod, 'development' for dev, 'test' for testing.",
+        description=(
+            "Application environment. Use 'production' for prod, 'development' for "
+            "dev, 'test' for testing."
+        ),
     )
 
     STORAGE_PROVIDER: str = Field(
         default="filesystem",
-        description="Which storage backend to use (e.g., 'filesystem', 's3', 'dropbox'). Defaults to 'filesystem'.",
+        description=(
+            "Which storage backend to use (e.g., 'filesystem', 's3', 'dropbox'). "
+            "Defaults to 'filesystem'."
+        ),
     )
     DATABASE_URL: str = Field(
         default=...,
-        description="Database connection string. REQUIRED. Must be set via environment variable for all environments.",
+        description=(
+            "Database connection string. REQUIRED. Must be set via environment "
+            "variable for all environments."
+        ),
     )  # No default: fail fast if missing
 
     REDIS_URL: Optional[str] = Field(
         default=None,
-        description="Redis connection string for token storage. Must be set in production and development.",
+        description=(
+            "Redis connection string for token storage. Must be set in production and "
+            "development."
+        ),
     )
     filesystem_storage: FilesystemProviderSettings = Field(
         default_factory=cast(
@@ -92,13 +123,27 @@ class Settings(BaseSettings):
     dropbox_access_token: Optional[str] = Field(
         default=None,
         alias="DROPBOX_ACCESS_TOKEN",
-        description="[DEPRECATED] Long-lived Dropbox access token. Use refresh token flow instead.",
+        description=(
+            "[DEPRECATED] Long-lived Dropbox access token. Use refresh token flow "
+            "instead."
+        ),
+    )
+    dropbox_max_connections: int = Field(
+        default=16,
+        alias="DROPBOX_MAX_CONNECTIONS",
+        description=(
+            "Size of the Dropbox client's keep-alive HTTP connection pool (shared by "
+            "requests and scan workers)"
+        ),
     )
 
     TAGLINE_API_KEY: str = Field(
         default="",
         alias="TAGLINE_API_KEY",
-        description="API key for backend authentication. Set via TAGLINE_API_KEY env var. Required.",
+        description=(
+            "API key for backend authentication. Set via TAGLINE_API_KEY env var. "
+            "Required."
+        ),
     )
 
     LOG_LEVEL: str = Field(
@@ -114,6 +159,124 @@ class Settings(BaseSettings):
         default=200,
         description="Default image cache size in MB",
     )
+    DERIVATIVE_CACHE_DIR: Optional[Path] = Field(
+        default=None,
+        description=(
+            "Directory for the on-disk thumbnail/image cache (second tier, shared by "
+            "all workers on the host). Disabled if unset."
+        ),
+    )
+    DERIVATIVE_CACHE_MAX_MB: int = Field(
+        default=2048,
+        description="Maximum size of the on-disk thumbnail/image cache in MB",
+    )
+    ORIGINAL_CACHE_DIR: Optional[Path] = Field(
+        default=None,
+        description=(
+            "Directory for the on-disk cache of Dropbox originals (must differ from "
+            "DERIVATIVE_CACHE_DIR). Disabled if unset."
+        ),
+    )
+    ORIGINAL_CACHE_MAX_MB: int = Field(
+        default=10240,
+        description="Maximum size of the on-disk originals cache in MB",
+    )
+    IMAGE_CACHE_CONTROL: str = Field(
+        default="private, max-age=86400, stale-while-revalidate=604800",
+        description=(
+            "Cache-Control header for /photos/{id}/image and /thumbnail responses. Use "
+            "'public' only if a shared cache/CDN should store them."
+        ),
+    )
+    IMAGE_WORKER_PROCESSES: int = Field(
+        default=0,
+        description=(
+            "Worker processes for image decode/resize/encode. 0 runs transforms in "
+            "request threads."
+        ),
+    )
+    IMAGE_WORKER_QUEUE_DEPTH: int = Field(
+        default=32,
+        description=(
+            "Transforms allowed to wait for a busy worker process before requests get "
+            "503"
+        ),
+    )
+    SCAN_WORKERS: int = Field(
+        default=8,
+        description=(
+            "Threads fetching and probing files in parallel during /scan (2x this many "
+            "in flight)"
+        ),
+    )
+    SCAN_BATCH_SIZE: int = Field(
+        default=500,
+        description=(
+            "Files applied and committed (and checkpointed) per batch during /scan"
+        ),
+    )
+    SCAN_LOCK_LEASE_SECONDS: int = Field(
+        default=60,
+        description=(
+            "Lifetime of the scan lease row (SQLite) without a heartbeat; a crashed "
+            "worker's scan lock frees up after this long. PostgreSQL uses an advisory "
+            "lock instead."
+        ),
+    )
+    SCAN_RESUME_ON_STARTUP: bool = Field(
+        default=True,
+        description=(
+            "At startup, resume a scan that a previous process left unfinished "
+            "(filesystem and Dropbox providers)"
+        ),
+    )
+    SCAN_EXTENSIONS: str = Field(
+        default="",
+        description=(
+            "Comma-separated file extensions considered by /scan and the watcher (e.g. "
+            "'.jpg,.jpeg,.heic'). Empty scans every file."
+        ),
+    )
+    FILESYSTEM_WATCH_ENABLED: bool = Field(
+        default=False,
+        description=(
+            "Watch the filesystem storage root and import/update/remove changed files "
+            "within seconds (filesystem provider only)"
+        ),
+    )
+    FILESYSTEM_WATCH_FORCE_POLLING: bool = Field(
+        default=False,
+        description=(
+            "Poll instead of using inotify. Needed for network shares, where inotify "
+            "does not see writes from other hosts."
+        ),
+    )
+    FILESYSTEM_WATCH_POLL_INTERVAL_MS: int = Field(
+        default=2000,
+        description="Polling interval in ms when the watcher polls",
+    )
+    FILESYSTEM_WATCH_DEBOUNCE_MS: int = Field(
+        default=1000,
+        description="Quiet period in ms before a burst of filesystem events is applied",
+    )
+    SCAN_PREGENERATE_THUMBNAILS: bool = Field(
+        default=False,
+        description=(
+            "Render thumbnails into the on-disk derivative cache while /scan imports "
+            "photos. Requires DERIVATIVE_CACHE_DIR."
+        ),
+    )
+    SCAN_PREGENERATE_IMAGES: bool = Field(
+        default=False,
+        description=(
+            "Also render 1024px images into the on-disk derivative cache during /scan. "
+            "Requires DERIVATIVE_CACHE_DIR."
+        ),
+    )
+    SCAN_PREGENERATE_CONCURRENCY: int = Field(
+        default=2,
+        description="Photos rendered in parallel by scan pre-generation",
+    )
 
     def __init__(self, **kwargs: Any) -> None:
         """Initialize settings from environment variables"""
@@ -136,7 +299,8 @@ class Settings(BaseSettings):
         # Fail fast if DATABASE_URL is missing
         if not kwargs.get("DATABASE_URL") and not os.environ.get("DATABASE_URL"):
             raise RuntimeError(
-                "DATABASE_URL environment variable is required but not set. Please set it in your environment or .env file."
+                "DATABASE_URL environment variable is required but not set. "
+                "Please set it in your environment or .env file."
             )
 
         super().__init__(**kwargs)
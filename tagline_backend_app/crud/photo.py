@@ -3,8 +3,10 @@ CRUD repository for Photo model.
 """
 
 import uuid
-from typing import List, Optional
+from datetime import datetime
+from typing import Iterable, List, Optional, Tuple
 
+from sqlalchemy import delete, func, insert, or_, select, tuple_
 from sqlalchemy.orm import Session
 
 from tagline_backend_app.models import Photo
@@ -39,6 +41,38 @@ class PhotoRepository:
         self.db.refresh(photo)
         return photo
 
+    def bulk_create(
+        self, rows: Iterable[dict[str, object]], batch_size: int = 500
+    ) -> List[uuid.UUID]:
+        """
+        Insert many Photos with one INSERT round-trip and one commit per batch.
+        Unlike create(), rows are not loaded back as ORM objects (no refresh).
+        Args:
+            rows: Column values per photo ('filename', plus optionally 'id',
+                'description', 'width', 'height'). Missing ids are generated here,
+                so callers can use them before the insert.
+            batch_size: Rows per INSERT/commit.
+        Returns:
+            The ids of the inserted Photos, in input order.
+        """
+        batch_size = max(1, batch_size)
+        ids: List[uuid.UUID] = []
+        batch: List[dict[str, object]] = []
+        for row in rows:
+            row = {"id": uuid.uuid4(), **row}
+            batch.append(row)
+            ids.append(row["id"])  # type: ignore[arg-type]
+            if len(batch) >= batch_size:
+                self._insert_batch(batch)
+                batch = []
+        if batch:
+            self._insert_batch(batch)
+        return ids
+
+    def _insert_batch(self, batch: List[dict[str, object]]) -> None:
+        self.db.execute(insert(Photo), batch)
+        self.db.commit()
+
     def get(self, photo_id: uuid.UUID) -> Optional[Photo]:
         """Get a Photo by its ID."""
         return self.db.get(Photo, photo_id)
@@ -47,6 +81,90 @@ class PhotoRepository:
         """List all Photos."""
         return self.db.query(Photo).all()
 
+    def list_page(self, offset: int = 0, limit: int = 50) -> List[Photo]:
+        """
+        List one page of Photos using LIMIT/OFFSET in SQL.
+        Rows are ordered by (created_at, id) so pages are stable between requests.
+        Args:
+            offset: Number of rows to skip.
+            limit: Maximum number of rows to return.
+        Returns:
+            The Photos on the requested page.
+        """
+        stmt = (
+            select(Photo)
+            .order_by(Photo.created_at, Photo.id)
+            .offset(offset)
+            .limit(limit)
+        )
+        return list(self.db.scalars(stmt))
+
+    def list_after(
+        self, after: Optional[Tuple[datetime, uuid.UUID]] = None, limit: int = 50
+    ) -> List[Photo]:
+        """
+        List Photos using keyset pagination on (created_at, id).
+        Seeks directly to the first row after the given key, so the cost does not
+        grow with how deep the page is (unlike OFFSET).
+        Args:
+            after: (created_at, id) of the last row on the previous page, or None
+                to start from the beginning.
+            limit: Maximum number of rows to return.
+        Returns:
+            The Photos following the given key, in (created_at, id) order.
+        """
+        stmt = select(Photo).order_by(Photo.created_at, Photo.id).limit(limit)
+        if after is not None:
+            stmt = stmt.where(tuple_(Photo.created_at, Photo.id) > tuple_(*after))
+        return list(self.db.scalars(stmt))
+
+    def list_by_filenames(self, filenames: Iterable[str]) -> List[Photo]:
+        """Return the Photos whose filename is in filenames (queried in chunks)."""
+        names = list(filenames)
+        photos: List[Photo] = []
+        for i in range(0, len(names), 500):
+            stmt = select(Photo).where(Photo.filename.in_(names[i : i + 500]))
+            photos.extend(self.db.scalars(stmt))
+        return photos
+
+    def list_by_ids(self, photo_ids: Iterable[uuid.UUID]) -> List[Photo]:
+        """Return the Photos whose id is in photo_ids (queried in chunks)."""
+        ids = list(photo_ids)
+        photos: List[Photo] = []
+        for i in range(0, len(ids), 500):
+            stmt = select(Photo).where(Photo.id.in_(ids[i : i + 500]))
+            photos.extend(self.db.scalars(stmt))
+        return photos
+
+    def list_under(self, keys: Iterable[str]) -> List[Photo]:
+        """
+        Return the Photos stored at any of keys or, since a key may name a
+        folder, anywhere underneath one.
+        """
+        photos: List[Photo] = []
+        for key in keys:
+            stmt = select(Photo).where(self._under(key))
+            photos.extend(self.db.scalars(stmt))
+        return photos
+
+    @staticmethod
+    def _under(key: str):
+        return or_(
+            Photo.filename == key,
+            Photo.filename.startswith(key.rstrip("/") + "/", autoescape=True),
+        )
+
+    def delete_by_ids(self, photo_ids: Iterable[uuid.UUID]) -> None:
+        """Delete the Photos with the given ids (in chunks) and commit."""
+        ids = list(photo_ids)
+        for i in range(0, len(ids), 500):
+            self.db.execute(delete(Photo).where(Photo.id.in_(ids[i : i + 500])))
+        self.db.commit()
+
+    def count(self) -> int:
+        """Return the total number of Photos using SELECT COUNT(*)."""
+        return self.db.scalar(select(func.count()).select_from(Photo)) or 0
+
     def update(
         self,
         photo_id: uuid.UUID,
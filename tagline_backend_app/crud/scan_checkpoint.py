@@ -0,0 +1,108 @@
+"""
+CRUD repository for ScanCheckpoint and ScanCheckpointItem models.
+"""
+
+import uuid
+from typing import Iterable, List, Optional
+
+from sqlalchemy import Row, delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from tagline_backend_app.models import ScanCheckpoint, ScanCheckpointItem
+
+
+class ScanCheckpointRepository:
+    """Repository for the persisted plans of in-progress scans."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, scope: str) -> Optional[ScanCheckpoint]:
+        """Return the checkpoint for scope, or None if no scan is in progress."""
+        return self.db.get(ScanCheckpoint, scope)
+
+    def create(
+        self,
+        scope: str,
+        job_id: Optional[uuid.UUID],
+        cursor: Optional[str],
+        items: Iterable[dict[str, object]],
+        batch_size: int = 1000,
+    ) -> ScanCheckpoint:
+        """
+        Replace the checkpoint for scope with a new plan and commit.
+        Args:
+            items: Column values per pending item ('kind', 'key', plus
+                optionally 'size', 'mtime', 'content_hash', 'photo_id'),
+                in the order they should be applied.
+            batch_size: Items per INSERT.
+        """
+        self._delete(scope)
+        checkpoint = ScanCheckpoint(scope=scope, job_id=job_id, cursor=cursor)
+        self.db.add(checkpoint)
+        planned = 0
+        batch: List[dict[str, object]] = []
+        for item in items:
+            batch.append({**item, "scope": scope})
+            if len(batch) >= batch_size:
+                self.db.execute(insert(ScanCheckpointItem), batch)
+                planned += len(batch)
+                batch = []
+        if batch:
+            self.db.execute(insert(ScanCheckpointItem), batch)
+            planned += len(batch)
+        checkpoint.planned = planned
+        self.db.commit()
+        self.db.refresh(checkpoint)
+        return checkpoint
+
+    def remaining(self, scope: str) -> List[Row]:
+        """
+        Return the items of scope's plan not applied yet, in plan order.
+        Items come back as plain rows rather than ORM objects, so a large
+        plan is not tracked (and expired on every commit) by the session.
+        """
+        stmt = (
+            select(
+                ScanCheckpointItem.id,
+                ScanCheckpointItem.kind,
+                ScanCheckpointItem.key,
+                ScanCheckpointItem.size,
+                ScanCheckpointItem.mtime,
+                ScanCheckpointItem.content_hash,
+                ScanCheckpointItem.photo_id,
+            )
+            .where(ScanCheckpointItem.scope == scope)
+            .order_by(ScanCheckpointItem.id)
+        )
+        return list(self.db.execute(stmt))
+
+    def advance(self, scope: str, item_ids: Iterable[int]) -> None:
+        """Drop applied items from scope's plan, count one more batch and commit."""
+        ids = list(item_ids)
+        for i in range(0, len(ids), 500):
+            self.db.execute(
+                delete(ScanCheckpointItem)
+                .where(ScanCheckpointItem.id.in_(ids[i : i + 500]))
+                .execution_options(synchronize_session=False)
+            )
+        self.db.execute(
+            update(ScanCheckpoint)
+            .where(ScanCheckpoint.scope == scope)
+            .values(
+                processed=ScanCheckpoint.processed + len(ids),
+                batches=ScanCheckpoint.batches + 1,
+            )
+        )
+        self.db.commit()
+
+    def delete(self, scope: str) -> None:
+        """Forget scope's checkpoint once its scan is complete, and commit."""
+        self._delete(scope)
+        self.db.commit()
+
+    def _delete(self, scope: str) -> None:
+        self.db.execute(
+            delete(ScanCheckpointItem).where(ScanCheckpointItem.scope == scope)
+        )
+        self.db.execute(delete(ScanCheckpoint).where(ScanCheckpoint.scope == scope))
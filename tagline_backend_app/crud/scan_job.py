@@ -0,0 +1,98 @@
+"""
+CRUD repository for ScanJob model.
+"""
+
+import uuid
+from datetime import UTC, datetime
+from typing import Any, Mapping, Optional
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from tagline_backend_app.db import rowcount
+from tagline_backend_app.models import ScanJob
+
+# ScanProgress counters persisted on ScanJob rows
+SCAN_JOB_COUNTERS = (
+    "files_seen",
+    "imported",
+    "skipped",
+    "modified",
+    "moved",
+    "deleted",
+)
+
+
+class ScanJobRepository:
+    """Repository for recorded scan jobs."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create(self, full: bool = False) -> ScanJob:
+        """Record a new running scan and commit."""
+        job = ScanJob(full=full, status="running")
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        return job
+
+    def get(self, job_id: uuid.UUID) -> Optional[ScanJob]:
+        """Get a ScanJob by its ID."""
+        return self.db.get(ScanJob, job_id)
+
+    def latest(self) -> Optional[ScanJob]:
+        """Return the most recently started ScanJob, or None if none ran yet."""
+        stmt = select(ScanJob).order_by(ScanJob.started_at.desc()).limit(1)
+        return self.db.scalars(stmt).first()
+
+    def running(self) -> Optional[ScanJob]:
+        """Return the most recently started job still marked running, if any."""
+        stmt = (
+            select(ScanJob)
+            .where(ScanJob.status == "running")
+            .order_by(ScanJob.started_at.desc())
+            .limit(1)
+        )
+        return self.db.scalars(stmt).first()
+
+    def fail_running(self, error: str) -> int:
+        """
+        Mark every job still marked running as failed and commit. Only safe
+        while holding the scan lock, when no job can really be running.
+        Returns:
+            The number of jobs marked failed.
+        """
+        failed = rowcount(
+            self.db.execute(
+                update(ScanJob)
+                .where(ScanJob.status == "running")
+                .values(status="failed", error=error, finished_at=datetime.now(UTC))
+            )
+        )
+        self.db.commit()
+        return failed
+
+    def save_progress(
+        self,
+        job_id: uuid.UUID,
+        counts: Mapping[str, Any],
+        status: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """
+        Store a job's counters (a ScanProgress snapshot, which also says which
+        job's checkpoint it resumed) and commit. Passing a final status
+        ('succeeded' or 'failed') also stamps finished_at.
+        """
+        job = self.get(job_id)
+        if job is None:
+            return
+        for counter in SCAN_JOB_COUNTERS:
+            setattr(job, counter, counts.get(counter, 0))
+        job.resumed_from = counts.get("resumed_from")
+        if status is not None:
+            job.status = status
+            job.error = error
+            job.finished_at = datetime.now(UTC)
+        self.db.commit()
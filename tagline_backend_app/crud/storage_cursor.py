@@ -0,0 +1,37 @@
+"""
+CRUD repository for StorageCursor model.
+"""
+
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from tagline_backend_app.models import StorageCursor
+
+
+class StorageCursorRepository:
+    """Repository for persisted storage listing cursors."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, scope: str) -> Optional[str]:
+        """Return the saved cursor for scope, or None if there is none."""
+        row = self.db.get(StorageCursor, scope)
+        return row.cursor if row is not None else None
+
+    def save(self, scope: str, cursor: str) -> None:
+        """Create or replace the cursor for scope."""
+        row = self.db.get(StorageCursor, scope)
+        if row is None:
+            self.db.add(StorageCursor(scope=scope, cursor=cursor))
+        else:
+            row.cursor = cursor
+        self.db.commit()
+
+    def delete(self, scope: str) -> None:
+        """Forget the cursor for scope, forcing the next scan to list everything."""
+        row = self.db.get(StorageCursor, scope)
+        if row is not None:
+            self.db.delete(row)
+            self.db.commit()
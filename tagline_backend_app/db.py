@@ -8,12 +8,12 @@ Uses SQLAlchemy and configuration from tagline_backend_app.config.
 import logging
 from contextlib import contextmanager
 from functools import lru_cache
-from typing import Generator
+from typing import Generator, cast
 
 from fastapi import HTTPException
-from sqlalchemy import create_engine
+from sqlalchemy import CursorResult, Result, create_engine, make_url
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
-from sqlalchemy.pool import NullPool, StaticPool
+from sqlalchemy.pool import NullPool, QueuePool, StaticPool
 
 # Use the new package name for imports
 from tagline_backend_app.config import get_settings
@@ -27,6 +27,12 @@ logger = logging.getLogger(__name__)
 Base = declarative_base()
 
 
+def _is_sqlite_memory(url: str) -> bool:
+    """True for SQLite URLs naming an in-memory database."""
+    database = make_url(url).database or ""
+    return not database or ":memory:" in database or "mode=memory" in url
+
+
 @lru_cache()
 def get_engine(db_url: str | None = None):
     """Returns a SQLAlchemy engine instance, cached for reuse."""
@@ -38,14 +44,27 @@ def get_engine(db_url: str | None = None):
     poolclass = NullPool  # Default for non-SQLite
 
     if url and url.startswith("sqlite"):
-        # Use StaticPool for ALL SQLite in-memory DBs (including shared cache URIs)
-        # This ensures all connections share the same in-memory DB in the same process.
-        # Required for reliable testing with sqlite:///:memory: and sqlite:///file::memory:?cache=shared
-        poolclass = StaticPool
+        # Scans and their progress flushes run on other threads
         connect_args = {"check_same_thread": False}
-        logger.info(
-            "Configuring SQLite engine with StaticPool and check_same_thread=False for in-memory or shared-cache DB."
-        )
+        if _is_sqlite_memory(url):
+            # All sessions must share the one connection that holds an
+            # in-memory DB (including shared-cache URIs); required for
+            # reliable testing with sqlite:///:memory:. Sessions used from
+            # several threads at once can interfere with each other's
+            # transactions, so this is for tests and development only
+            poolclass = StaticPool
+            logger.info(
+                "Configuring in-memory SQLite engine with StaticPool and "
+                "check_same_thread=False."
+            )
+        else:
+            # A file DB gets a connection per session from a regular pool,
+            # so each session (and thread) has its own transaction
+            poolclass = QueuePool
+            logger.info(
+                "Configuring file-based SQLite engine with QueuePool and "
+                "check_same_thread=False."
+            )
 
     try:
         engine = create_engine(url, poolclass=poolclass, connect_args=connect_args)
@@ -69,6 +88,11 @@ def get_session_local(engine=None):
     return SessionLocal
 
 
+def rowcount(result: Result) -> int:
+    """Rows matched by an UPDATE or DELETE (whose result is a CursorResult)."""
+    return cast(CursorResult, result).rowcount
+
+
 # --- Database Session Dependency ---
 
 
@@ -0,0 +1,200 @@
+"""
+disk_cache.py
+
+Size-bounded, process-shared disk cache for image bytes. caching.py opens two:
+- the derivative cache of rendered thumbnails and 1024px images
+  (DERIVATIVE_CACHE_DIR, budget DERIVATIVE_CACHE_MAX_MB);
+- the originals cache, which CachedStorageProvider reads Dropbox originals
+  through (ORIGINAL_CACHE_DIR, budget ORIGINAL_CACHE_MAX_MB).
+Each has its own directory and budget. Entries survive restarts and are
+visible to every worker on the host that points at the same directory.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, BinaryIO, Optional
+
+logger = logging.getLogger(__name__)
+
+# Temp files older than this are assumed to belong to a crashed writer
+_STALE_TMP_SECONDS = 3600
+# After eviction the cache is trimmed to this fraction of its budget, so a
+# cache sitting at its limit does not rescan the directory on every write.
+_EVICT_TARGET_RATIO = 0.9
+_TMP_PREFIX = ".tmp-"
+
+
+class DiskCache:
+    """
+    Key -> bytes cache stored as one file per entry under a root directory.
+
+    - Keys are hashed (SHA-256) into a two-level fan-out of files.
+    - Writes go to a temp file in the target directory and are moved into place
+      with os.replace(), so readers never see partial entries, even across
+      processes.
+    - Reads bump the file mtime, and eviction removes least recently used files
+      (oldest mtime) until the total size is back under budget. Eviction rescans
+      the directory, so writes from other workers are accounted for.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        """
+        Args:
+            root: Directory to store entries in (created if missing).
+            max_bytes: Budget for the total size of all entries.
+        """
+        root.mkdir(parents=True, exist_ok=True)
+        self._root = root.resolve()
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+        self._approx_bytes = sum(size for _, size, _ in self._scan())
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return self._root / digest[:2] / digest
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the bytes stored under key, or None on a miss."""
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        self._touch(path)
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def open(self, key: str) -> Optional[BinaryIO]:
+        """
+        Open the entry for key for reading without loading it into memory, or
+        return None on a miss. The open file stays readable even if the entry
+        is evicted or replaced meanwhile.
+        """
+        path = self._path(key)
+        try:
+            f = path.open("rb")
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+        self._touch(path)
+        with self._lock:
+            self.hits += 1
+        return f
+
+    def put(self, key: str, data: bytes) -> None:
+        """Atomically store data under key, evicting old entries if over budget."""
+        if len(data) > self._max_bytes:
+            raise ValueError("value too large")
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=_TMP_PREFIX)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            # An overwritten entry gives its bytes back
+            try:
+                replaced = path.stat().st_size
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        with self._lock:
+            self._approx_bytes = max(0, self._approx_bytes - replaced) + len(data)
+            over_budget = self._approx_bytes > self._max_bytes
+        if over_budget:
+            self.evict()
+
+    def delete(self, key: str) -> None:
+        """Remove the entry for key, if present."""
+        path = self._path(key)
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self._approx_bytes = max(0, self._approx_bytes - size)
+
+    def evict(self) -> None:
+        """Delete least recently used entries until under budget."""
+        # One evicting thread per process is enough; others just keep going
+        if not self._evict_lock.acquire(blocking=False):
+            return
+        try:
+            entries = sorted(self._scan())
+            total = sum(size for _, size, _ in entries)
+            target = int(self._max_bytes * _EVICT_TARGET_RATIO)
+            evicted = 0
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass  # Another worker got there first
+                total -= size
+                evicted += 1
+            with self._lock:
+                self._approx_bytes = total
+                self.evictions += evicted
+            if evicted:
+                logger.debug(f"Disk cache {self._root}: evicted {evicted} entries")
+        finally:
+            self._evict_lock.release()
+
+    def stats(self) -> dict[str, Any]:
+        """Return a snapshot of the cache's size (approximate) and counters."""
+        with self._lock:
+            return {
+                "path": str(self._root),
+                "max_bytes": self._max_bytes,
+                "current_bytes": self._approx_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def _scan(self) -> list[tuple[float, int, Path]]:
+        """Return (mtime, size, path) for every entry, removing stale temp files."""
+        entries: list[tuple[float, int, Path]] = []
+        now = time.time()
+        for shard in os.scandir(self._root):
+            if not shard.is_dir(follow_symlinks=False):
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+                if entry.name.startswith(_TMP_PREFIX):
+                    if now - st.st_mtime > _STALE_TMP_SECONDS:
+                        Path(entry.path).unlink(missing_ok=True)
+                    continue
+                entries.append((st.st_mtime, st.st_size, Path(entry.path)))
+        return entries
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass  # Entry may have just been evicted; the read already succeeded
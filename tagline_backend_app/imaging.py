@@ -0,0 +1,154 @@
+"""
+imaging.py
+
+CPU-bound image transforms used by the photo routes.
+Every transform takes the original image bytes and returns encoded bytes, so
+it can run in-process or in a worker process (see transform_pool.py).
+"""
+
+import io
+import math
+
+import pillow_heif
+from PIL import Image, ImageOps
+
+# Output sizes for each rendition
+THUMBNAIL_SIZE = (512, 384)
+IMAGE_MAX_EDGE = 1024
+
+# Transform parameters for each rendition. They are part of the on-disk cache
+# key, so changing a transform never serves renditions made with the old one.
+THUMBNAIL_TRANSFORM = "512x384-crop-upright-webp-q80"
+IMAGE_TRANSFORM = "1024-fit-upright-jpeg-q85"
+
+_EXIF_ORIENTATION = 0x0112
+# EXIF orientations that turn the image by 90 degrees (width and height swap)
+_TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+
+
+def register_codecs() -> None:
+    """
+    Register optional Pillow codecs (HEIF/HEIC). Safe to call more than once.
+    Called once at startup by create_app() and by each transform worker process.
+    """
+    pillow_heif.register_heif_opener()
+
+
+def _open(image_data: bytes) -> Image.Image:
+    """
+    Open the source image lazily (header only; pixels decode on first use).
+    BytesIO over an immutable bytes object shares its buffer rather than copying,
+    so this is the only wrapper the pipeline needs.
+    """
+    return Image.open(io.BytesIO(image_data))
+
+
+def _decode_reduced(img: Image.Image, min_size: tuple[int, int]) -> None:
+    """
+    Ask the decoder for the smallest rendition that is still at least min_size.
+
+    JPEG decodes straight at 1/2, 1/4 or 1/8 scale (DCT scaling), and pillow_heif
+    decodes an embedded HEIF thumbnail when one is large enough. Other formats
+    ignore the request. Must be called before the image is loaded.
+    """
+    img.draft(None, min_size)
+
+
+def _orientation(img: Image.Image) -> int:
+    """EXIF orientation of an opened image (1, upright, if it has none)."""
+    return img.getexif().get(_EXIF_ORIENTATION, 1)
+
+
+def _upright(img: Image.Image, orientation: int) -> Image.Image:
+    """
+    Turn the decoded image as its EXIF orientation says, so renditions look
+    the same whether rendered here or by the provider (Dropbox thumbnails
+    arrive already turned; pillow_heif turns HEIF images on decode).
+    """
+    if orientation == 1:
+        return img
+    return ImageOps.exif_transpose(img)
+
+
+def render_image(image_data: bytes) -> bytes:
+    """
+    Render the 1024px display image: longest edge 1024px, aspect ratio kept, JPEG q85.
+    The EXIF orientation is applied (the output carries no EXIF).
+    Raises whatever Pillow raises for unreadable or unsupported input.
+    """
+    img = _open(image_data)
+    orientation = _orientation(img)
+    # Decode at reduced scale when the output is smaller than the original
+    # (the longest edge is the same either way round)
+    scale = min(IMAGE_MAX_EDGE / img.width, IMAGE_MAX_EDGE / img.height)
+    if scale < 1:
+        _decode_reduced(
+            img, (math.ceil(img.width * scale), math.ceil(img.height * scale))
+        )
+    img = _upright(img, orientation)
+    # Convert to RGB for JPEG
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    # Resize so the longest edge is 1024px, preserving aspect ratio
+    # (thumbnail() also applies reduce() before the final LANCZOS pass)
+    img.thumbnail((IMAGE_MAX_EDGE, IMAGE_MAX_EDGE), Image.Resampling.LANCZOS)
+    # Save the resized image to JPEG in memory (no padding)
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=85)
+    return buffer.getvalue()
+
+
+def render_thumbnail(image_data: bytes) -> bytes:
+    """
+    Render the grid thumbnail: 512x384 center crop, lossy WebP q80, no transparency.
+    The EXIF orientation is applied before cropping.
+    Raises whatever Pillow raises for unreadable or unsupported input.
+    """
+    img = _open(image_data)
+
+    # Desired thumbnail size
+    target_w, target_h = THUMBNAIL_SIZE
+
+    # Decode at reduced scale. Any reduction that keeps both edges >= the
+    # target also keeps the center crop below >= the target, so no upscaling.
+    # The decoder works before the image is turned upright, so a turned image
+    # needs the target's edges swapped.
+    orientation = _orientation(img)
+    if orientation in _TRANSPOSED_ORIENTATIONS:
+        _decode_reduced(img, (target_h, target_w))
+    else:
+        _decode_reduced(img, THUMBNAIL_SIZE)
+    img = _upright(img, orientation)
+
+    # Ensure image is in RGB mode for WebP saving (no alpha)
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+
+    # Calculate crop (center crop)
+    img_ratio = img.width / img.height
+    target_ratio = target_w / target_h
+    if img_ratio > target_ratio:
+        # Image is wider than target: crop horizontally
+        new_width = int(target_ratio * img.height)
+        left = (img.width - new_width) // 2
+        right = left + new_width
+        top, bottom = 0, img.height
+    else:
+        # Image is taller than target: crop vertically
+        new_height = int(img.width / target_ratio)
+        top = (img.height - new_height) // 2
+        bottom = top + new_height
+        left, right = 0, img.width
+    # Crop and resize in one pass; reducing_gap lets Pillow reduce() by an
+    # integer factor first so LANCZOS only covers the last <=2x step
+    img_thumb = img.resize(
+        (target_w, target_h),
+        Image.Resampling.LANCZOS,
+        box=(left, top, right, bottom),
+        reducing_gap=2.0,
+    )
+
+    # Save to a bytes buffer as lossy WebP (no transparency)
+    buffer = io.BytesIO()
+    img_thumb.save(buffer, format="WEBP", quality=80, method=4)
+    return buffer.getvalue()
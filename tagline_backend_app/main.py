@@ -1,21 +1,41 @@
 import logging
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from tagline_backend_app.caching import (
+    get_original_cache,
+    initialize_derivative_cache,
     initialize_image_cache,
+    initialize_original_cache,
     initialize_thumbnail_cache,
 )
 from tagline_backend_app.config import get_settings
 from tagline_backend_app.constants import APP_NAME
+from tagline_backend_app.db import get_session_local
+from tagline_backend_app.imaging import register_codecs
 from tagline_backend_app.logging_config import setup_logging
 from tagline_backend_app.routes import health, photos
+from tagline_backend_app.scan_jobs import (
+    resume_interrupted_scan,
+    shutdown_scan_job_runner,
+)
+from tagline_backend_app.storage.cached import CachedStorageProvider
 from tagline_backend_app.storage.filesystem import (
     StorageProviderMisconfigured,
 )
 from tagline_backend_app.storage.memory import InMemoryStorageProvider
 from tagline_backend_app.storage.null import NullStorageProvider
+from tagline_backend_app.storage.registry import ProviderRegistry
+from tagline_backend_app.transform_pool import (
+    initialize_transform_pool,
+    shutdown_transform_pool,
+)
+from tagline_backend_app.watcher import (
+    start_filesystem_watcher,
+    stop_filesystem_watcher,
+)
 
 
 def create_app(settings=None) -> FastAPI:
@@ -32,7 +52,37 @@ def create_app(settings=None) -> FastAPI:
     #         "JWT_SECRET_KEY must be set in environment/config for security!"
     #     )
 
-    app = FastAPI(title=APP_NAME, version="0.1.0")
+    @asynccontextmanager
+    async def lifespan(app_instance: FastAPI):
+        provider_kind = getattr(app_instance.state, "photo_storage_provider_kind", None)
+        # Near-real-time import for the filesystem provider (opt-in)
+        if provider_kind == "filesystem":
+            try:
+                start_filesystem_watcher(
+                    app_instance.state.get_photo_storage_provider(app_instance),
+                    get_session_local(),
+                )
+            except Exception as e:
+                logger.warning(f"Not watching for filesystem changes: {e}")
+        # Finish a scan that a deploy or crash cut short
+        if settings.SCAN_RESUME_ON_STARTUP and provider_kind in (
+            "filesystem",
+            "dropbox",
+        ):
+            try:
+                provider = app_instance.state.get_photo_storage_provider(app_instance)
+            except Exception as e:
+                logger.warning(f"Not resuming interrupted scans: {e}")
+            else:
+                resume_interrupted_scan(provider)
+        yield
+        stop_filesystem_watcher()
+        shutdown_scan_job_runner()
+        app_instance.state.provider_registry.reset()
+        # Stop image worker processes on shutdown
+        shutdown_transform_pool()
+
+    app = FastAPI(title=APP_NAME, version="0.1.0", lifespan=lifespan)
 
     # Enable CORS if allowed origins are set
     allowed_origins = [
@@ -107,6 +157,7 @@ def create_app(settings=None) -> FastAPI:
             "app_secret": settings.dropbox_app_secret,
             "access_token": settings.dropbox_access_token,
             "root_path": settings.dropbox_root_path,
+            "max_connections": settings.dropbox_max_connections,
         }
         # Fail fast if required fields are missing
         if not (
@@ -129,7 +180,7 @@ def create_app(settings=None) -> FastAPI:
         )
 
     # Helper for lazy provider instantiation
-    def get_photo_storage_provider(app_instance):
+    def build_photo_storage_provider(app_instance):
         kind = getattr(app_instance.state, "photo_storage_provider_kind", None)
         if kind == "filesystem":
             from tagline_backend_app.storage.filesystem import FilesystemStorageProvider
@@ -147,17 +198,32 @@ def create_app(settings=None) -> FastAPI:
                 raise StorageProviderMisconfigured(
                     "Dropbox config missing from app state"
                 )
-            return DropboxStorageProvider(
+            provider = DropboxStorageProvider(
                 refresh_token=cfg["refresh_token"],
                 app_key=cfg["app_key"],
                 app_secret=cfg["app_secret"],
                 access_token=cfg["access_token"],
                 root_path=cfg["root_path"],
+                max_connections=cfg["max_connections"],
             )
+            # Keep downloaded originals on local disk (if configured)
+            original_cache = get_original_cache()
+            if original_cache is not None:
+                return CachedStorageProvider(provider, original_cache)
+            return provider
         raise NotImplementedError(
             "Only filesystem, null, memory, and dropbox providers are supported."
         )
 
+    # One provider instance per process (built on first use, see ProviderRegistry)
+    app.state.provider_registry = ProviderRegistry()
+
+    def get_photo_storage_provider(app_instance):
+        kind = getattr(app_instance.state, "photo_storage_provider_kind", None)
+        return app_instance.state.provider_registry.get(
+            kind, lambda: build_photo_storage_provider(app_instance)
+        )
+
     app.state.get_photo_storage_provider = get_photo_storage_provider
 
     # --- Ensure tables exist for test DB ---
@@ -168,17 +234,20 @@ def create_app(settings=None) -> FastAPI:
         Base.metadata.create_all(bind=engine)
         logger.info("Test environment detected: created all tables for in-memory DB.")
 
-    # Initialize HEIF support for Pillow
-    import pillow_heif
-
-    pillow_heif.register_heif_opener()
+    # Initialize HEIF support for Pillow (transforms rely on this, not per-call checks)
+    register_codecs()
     logger.info("Pillow HEIF opener registered.")
 
     # Initialize Thumbnail Cache
     initialize_thumbnail_cache()
     initialize_image_cache()
+    initialize_derivative_cache()
+    initialize_original_cache()
     logger.info("Thumbnail cache initialized.")
 
+    # Worker processes for image transforms (started lazily on first use)
+    initialize_transform_pool()
+
     # Register routes dynamically (reload to pick up changes/env)
     import importlib as _importlib
 
@@ -2,17 +2,23 @@
 models.py
 
 SQLAlchemy ORM models for Tagline backend.
-Defines the Photo table with metadata fields as required by the project spec.
+Defines the Photo table with metadata fields as required by the project spec,
+plus bookkeeping tables used by the storage scanner.
 """
 
 import uuid
 from datetime import UTC, datetime
 from typing import Optional
 
-from sqlalchemy import DateTime, String
+from sqlalchemy import BigInteger, Boolean, DateTime, Float, Index, String, Text
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 
+def as_utc(value: datetime) -> datetime:
+    """Treat naive timestamps (SQLite drops tzinfo) as UTC."""
+    return value if value.tzinfo else value.replace(tzinfo=UTC)
+
+
 class Base(DeclarativeBase):
     """Base class for all ORM models."""
 
@@ -29,6 +35,10 @@ class Photo(Base):
         description: Optional description of the photo
         width: Image width in pixels (nullable for legacy rows)
         height: Image height in pixels (nullable for legacy rows)
+        content_hash: Hash of the original's content (Dropbox content-hash
+            algorithm), used to detect edits and moves on rescan
+        size: Size of the original in bytes, as last listed
+        mtime: Modification time of the original (epoch seconds), as last listed
         created_at: Timezone-aware timestamp when the photo was added (UTC)
         updated_at: Timezone-aware timestamp when the photo was last modified (UTC)
     """
@@ -40,6 +50,9 @@ class Photo(Base):
     description: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     width: Mapped[Optional[int]] = mapped_column(nullable=True)
     height: Mapped[Optional[int]] = mapped_column(nullable=True)
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    size: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    mtime: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(UTC), nullable=False
     )
@@ -49,3 +62,162 @@ class Photo(Base):
         onupdate=lambda: datetime.now(UTC),
         nullable=False,
     )
+
+    __table_args__ = (
+        # Supports the (created_at, id) ordering and keyset seeks used by GET /photos
+        Index("ix_photos_created_at_id", "created_at", "id"),
+        # Lets a rescan match a moved file to its existing row
+        Index("ix_photos_content_hash", "content_hash"),
+    )
+
+
+class StorageCursor(Base):
+    """
+    Listing cursor persisted between scans, so the next scan can ask the
+    storage provider for changes only (see StorageProvider.list_changes).
+
+    Attributes:
+        scope: Provider/root the cursor belongs to (StorageProvider.cursor_scope())
+        cursor: Opaque provider cursor marking the end of the last applied listing
+        updated_at: Timezone-aware timestamp when the cursor was last saved (UTC)
+    """
+
+    __tablename__ = "storage_cursors"
+
+    scope: Mapped[str] = mapped_column(String, primary_key=True)
+    cursor: Mapped[str] = mapped_column(Text, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(UTC),
+        onupdate=lambda: datetime.now(UTC),
+        nullable=False,
+    )
+
+
+class ScanJob(Base):
+    """
+    One storage scan, as run by the scan job runner (see scan_jobs.py).
+    Counters are saved periodically while the scan runs and once more at the end.
+
+    Attributes:
+        id: Unique identifier (UUID, primary key)
+        status: 'running', 'succeeded' or 'failed'
+        full: Whether a full listing was requested (POST /scan?full=true)
+        started_at: Timezone-aware timestamp when the scan started (UTC)
+        finished_at: Timezone-aware timestamp when the scan ended (UTC), if it has
+        files_seen: Storage files reconciled so far
+        imported, skipped, modified, moved, deleted: Outcome counters
+        error: Error message if the scan failed
+        resumed_from: ID of the interrupted job whose checkpoint this scan resumed
+    """
+
+    __tablename__ = "scan_jobs"
+
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    status: Mapped[str] = mapped_column(String(16), nullable=False, default="running")
+    full: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    started_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(UTC), nullable=False
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+    files_seen: Mapped[int] = mapped_column(nullable=False, default=0)
+    imported: Mapped[int] = mapped_column(nullable=False, default=0)
+    skipped: Mapped[int] = mapped_column(nullable=False, default=0)
+    modified: Mapped[int] = mapped_column(nullable=False, default=0)
+    moved: Mapped[int] = mapped_column(nullable=False, default=0)
+    deleted: Mapped[int] = mapped_column(nullable=False, default=0)
+    error: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    resumed_from: Mapped[Optional[uuid.UUID]] = mapped_column(nullable=True)
+
+    # Supports GET /scan/latest
+    __table_args__ = (Index("ix_scan_jobs_started_at", "started_at"),)
+
+
+class ScanLease(Base):
+    """
+    Time-limited lease that lets one process run scans at a time on
+    databases without advisory locks (SQLite); see scan_lock.LeaseScanLock.
+
+    Attributes:
+        name: Lock name (primary key)
+        holder: Identifier of the process holding the lease (host:pid:nonce)
+        acquired_at: Timezone-aware timestamp when the holder took the lease (UTC)
+        expires_at: Timezone-aware timestamp after which another process may take
+            over the lease, unless the holder renews it first (UTC)
+    """
+
+    __tablename__ = "scan_leases"
+
+    name: Mapped[str] = mapped_column(String, primary_key=True)
+    holder: Mapped[str] = mapped_column(String, nullable=False)
+    acquired_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(UTC), nullable=False
+    )
+    expires_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=False
+    )
+
+
+class ScanCheckpoint(Base):
+    """
+    Progress of a scan's plan, so an interrupted scan can resume without
+    relisting storage. The work still to do is in scan_checkpoint_items.
+
+    Attributes:
+        scope: Provider/root the scan covers (one checkpoint per scope)
+        job_id: Scan job that made the plan (nullable for scans run outside a job)
+        cursor: Provider listing cursor to save once the plan is done, if any
+        planned: Number of items in the plan
+        processed: Number of items applied so far
+        batches: Number of batches committed so far
+        created_at: Timezone-aware timestamp when the plan was made (UTC)
+        updated_at: Timezone-aware timestamp of the last committed batch (UTC)
+    """
+
+    __tablename__ = "scan_checkpoints"
+
+    scope: Mapped[str] = mapped_column(String, primary_key=True)
+    job_id: Mapped[Optional[uuid.UUID]] = mapped_column(nullable=True)
+    cursor: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    planned: Mapped[int] = mapped_column(nullable=False, default=0)
+    processed: Mapped[int] = mapped_column(nullable=False, default=0)
+    batches: Mapped[int] = mapped_column(nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(UTC), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(UTC),
+        onupdate=lambda: datetime.now(UTC),
+        nullable=False,
+    )
+
+
+class ScanCheckpointItem(Base):
+    """
+    One unit of pending scan work: a listed file to check or import, or a
+    Photo row whose file is gone.
+
+    Attributes:
+        id: Autoincrement primary key (plan order)
+        scope: Checkpoint the item belongs to
+        kind: 'file' or 'gone'
+        key: Storage key (for 'gone', the row's filename when planned)
+        size, mtime, content_hash: Listing metadata (for 'gone', the row's hash)
+        photo_id: Row to delete or move ('gone' only)
+    """
+
+    __tablename__ = "scan_checkpoint_items"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    scope: Mapped[str] = mapped_column(String, nullable=False)
+    kind: Mapped[str] = mapped_column(String(8), nullable=False)
+    key: Mapped[str] = mapped_column(String, nullable=False)
+    size: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    mtime: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    photo_id: Mapped[Optional[uuid.UUID]] = mapped_column(nullable=True)
+
+    __table_args__ = (Index("ix_scan_checkpoint_items_scope_id", "scope", "id"),)
@@ -3,8 +3,11 @@ Health and diagnostics endpoints for Tagline backend.
 """
 
 from fastapi import APIRouter, Depends, Request
+from fastapi.responses import JSONResponse
 
+from tagline_backend_app.caching import get_cache_stats
 from tagline_backend_app.deps import verify_api_key
+from tagline_backend_app.transform_pool import get_transform_pool
 
 router = APIRouter()
 
@@ -14,3 +17,29 @@ def smoke_test(request: Request, _=Depends(verify_api_key)):
     """Health check: verifies storage provider config. Returns 200 if OK, 503 if misconfigured."""
     provider = request.app.state.get_photo_storage_provider(request.app)
     return {"status": "ok", "provider": type(provider).__name__}
+
+
+@router.get("/cache-stats")
+def cache_stats(_=Depends(verify_api_key)):
+    """Diagnostics: bytes, entries and hit/miss/eviction counters per cache."""
+    pool = get_transform_pool()
+    return {
+        **get_cache_stats(),
+        "transform_pool": pool.stats() if pool is not None else None,
+    }
+
+
+@router.get("/storage-health")
+def storage_health(request: Request, _=Depends(verify_api_key)):
+    """
+    Health check that reaches the storage backend (e.g. a Dropbox API call).
+    Returns 200 if every provider instance is healthy, else 503; unhealthy
+    instances are dropped and rebuilt on the next request.
+    """
+    request.app.state.get_photo_storage_provider(request.app)
+    report = request.app.state.provider_registry.health()
+    ok = all(entry["ok"] for entry in report.values())
+    return JSONResponse(
+        status_code=200 if ok else 503,
+        content={"status": "ok" if ok else "unhealthy", "providers": report},
+    )
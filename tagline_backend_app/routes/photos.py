@@ -2,33 +2,96 @@
 Photos API routes for Tagline backend.
 """
 
-# Imports for thumbnail generation
+import base64
+import hashlib
 import io
+import json
 import logging
+import mimetypes
+import re
 from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import BinaryIO, Iterator, Optional
 from uuid import UUID
 
-import pillow_heif  # Ensure it's imported, though registration happens in main
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
-from PIL import Image
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse
 from sqlalchemy.orm import Session
 
-from tagline_backend_app.caching import get_image_cache, get_thumbnail_cache
+from tagline_backend_app.caching import (
+    derivative_key,
+    get_derivative_cache,
+    get_derivative_flights,
+    get_image_cache,
+    get_thumbnail_cache,
+    image_cache_key,
+    thumbnail_cache_key,
+)
+from tagline_backend_app.config import get_settings
 from tagline_backend_app.crud.photo import PhotoRepository
 from tagline_backend_app.db import get_db
 from tagline_backend_app.deps import verify_api_key
+from tagline_backend_app.imaging import (
+    IMAGE_TRANSFORM,
+    THUMBNAIL_SIZE,
+    THUMBNAIL_TRANSFORM,
+    render_image,
+    render_thumbnail,
+)
+from tagline_backend_app.models import Photo as PhotoModel, as_utc
 from tagline_backend_app.schemas import (
     Photo,
     PhotoListResponse,
     PhotoMetadataFields,
     UpdateMetadataRequest,
 )
+from tagline_backend_app.storage.provider import StorageProvider
+from tagline_backend_app.transform_pool import TransformQueueFull, run_transform
 
 router = APIRouter()
 
 logger = logging.getLogger(__name__)
 
 
+def _rendition_headers(photo: PhotoModel, transform: str) -> dict[str, str]:
+    """
+    HTTP validators and caching headers for a rendition of a photo.
+    The strong ETag is derived from the photo id, its source version (content
+    hash, or updated_at for rows without one) and the transform parameters,
+    so it changes whenever the served bytes could.
+    """
+    version = photo.content_hash or photo.updated_at.isoformat()
+    digest = hashlib.sha256(f"{photo.id}:{version}:{transform}".encode()).hexdigest()
+    return {
+        "ETag": f'"{digest[:32]}"',
+        "Last-Modified": format_datetime(as_utc(photo.updated_at), usegmt=True),
+        "Cache-Control": get_settings().IMAGE_CACHE_CONTROL,
+    }
+
+
+def _not_modified(request: Request, photo: PhotoModel, headers: dict[str, str]) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since against a rendition's validators.
+    If-Modified-Since is ignored when If-None-Match is present (RFC 9110).
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        etag = headers["ETag"]
+        candidates = [tag.strip() for tag in if_none_match.split(",")]
+        # If-None-Match uses weak comparison, so W/"x" matches "x"
+        return any(tag == "*" or tag.removeprefix("W/") == etag for tag in candidates)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None:
+        try:
+            since = as_utc(parsedate_to_datetime(if_modified_since))
+        except (TypeError, ValueError):
+            return False  # Invalid dates are ignored
+        # HTTP dates have one-second resolution
+        return as_utc(photo.updated_at).replace(microsecond=0) <= since
+    return False
+
+
 @router.get(
     "/photos/{id}/image",
     responses={
@@ -36,6 +99,9 @@ logger = logging.getLogger(__name__)
             "content": {"image/jpeg": {}, "image/png": {}, "image/heic": {}},
             "description": "The image file for the photo.",
         },
+        304: {
+            "description": "Not modified (If-None-Match / If-Modified-Since matched)"
+        },
         404: {
             "description": "Photo or image file not found",
             "content": {"application/json": {"example": {"detail": "Photo not found"}}},
@@ -69,13 +135,9 @@ def get_photo_image(
     - **422**: If ID is not a valid UUID.
     - **500**: If storage or processing fails.
     """
-    import io
     import logging
     import traceback
 
-    import pillow_heif
-    from PIL import Image
-
     # 1. Validate UUID
     if not isinstance(id, UUID):
         logging.error(f"Invalid UUID in get_photo_image: {id}")
@@ -85,72 +147,123 @@ def get_photo_image(
     repo = PhotoRepository(db)
     try:
         photo = repo.get(id)
-        if photo is None:
-            raise HTTPException(status_code=404, detail="Photo not found")
     except Exception as exc:
         logging.error(
             f"DB error getting photo {id} for image: {exc}\n{traceback.format_exc()}"
         )
         raise HTTPException(status_code=500, detail="Database error")
+    if photo is None:
+        raise HTTPException(status_code=404, detail="Photo not found")
+
+    # 2b. Answer conditional requests before touching any cache or storage
+    headers = _rendition_headers(photo, IMAGE_TRANSFORM)
+    if _not_modified(request, photo, headers):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
     # 3. Check image cache
     cache = get_image_cache()
-    cache_key = str(id)
-    if cache is not None and cache_key in cache:
+    cache_key = image_cache_key(id, photo.content_hash)
+    cached_image = cache.get(cache_key) if cache is not None else None
+    if cached_image is not None:
         logging.debug(f"Image cache hit for {id}")
-        return Response(content=cache[cache_key], media_type="image/jpeg")
-
-    # 4. Get original image from storage
-    provider = request.app.state.get_photo_storage_provider(request.app)
-    filename = photo.filename
-    try:
-        image_bytes_io = provider.retrieve(filename)
-        if not image_bytes_io:
-            raise FileNotFoundError
-        image_data = image_bytes_io.read()
-        if not image_data:
-            raise ValueError("Image file is empty")
-    except FileNotFoundError:
-        logging.warning(f"Original image file not found for photo {id}: {filename}")
-        raise HTTPException(status_code=404, detail="Original image file not found")
-    except Exception as exc:
-        logging.error(f"Storage error retrieving {filename} for image: {exc}")
-        raise HTTPException(status_code=500, detail="Storage provider error")
+        return Response(content=cached_image, media_type="image/jpeg", headers=headers)
+
+    # 3b. Check on-disk cache (survives restarts, shared across workers)
+    disk_cache = get_derivative_cache()
+    disk_key = derivative_key(id, IMAGE_TRANSFORM, photo.content_hash)
+    if disk_cache is not None:
+        cached_image = disk_cache.get(disk_key)
+        if cached_image is not None:
+            logging.debug(f"Image disk cache hit for {id}")
+            if cache is not None:
+                try:
+                    cache[cache_key] = cached_image
+                except Exception as exc:
+                    logging.error(f"Failed to cache image for photo {id}: {exc}")
+            return Response(
+                content=cached_image, media_type="image/jpeg", headers=headers
+            )
 
-    # 5. Generate 1024x1024 padded JPEG
-    try:
-        # Ensure pillow_heif is registered (should be via main.py lifespan)
-        if (
-            not pillow_heif.is_supported(io.BytesIO(image_data))
-            and not Image.open(io.BytesIO(image_data)).format
-        ):
-            pillow_heif.register_heif_opener()
-        img = Image.open(io.BytesIO(image_data))
-        # Convert to RGB for JPEG
-        if img.mode != "RGB":
-            img = img.convert("RGB")
-        # Resize so the longest edge is 1024px, preserving aspect ratio
-        img.thumbnail((1024, 1024), Image.Resampling.LANCZOS)
-        # Save the resized image to JPEG in memory (no padding)
-        buffer = io.BytesIO()
-        img.save(buffer, format="JPEG", quality=85)
-        image_bytes = buffer.getvalue()
-    except Exception:
-        logging.exception(f"Error generating fullsize image for photo {id}")
-        raise HTTPException(status_code=500, detail="Image processing failed")
+    # 4-6. Fetch, render and cache, coalescing concurrent misses for this photo
+    def _render() -> bytes:
+        # Another request may have finished rendering since our cache check
+        if cache is not None:
+            rendered = cache.get(cache_key)
+            if rendered is not None:
+                return rendered
+
+        # 4. Get original image from storage
+        provider = request.app.state.get_photo_storage_provider(request.app)
+        filename = photo.filename
+        try:
+            image_bytes_io = provider.retrieve_version(filename, photo.content_hash)
+            if not image_bytes_io:
+                raise FileNotFoundError
+            with image_bytes_io:  # May be an open file (cached original)
+                image_data = image_bytes_io.read()
+            if not image_data:
+                raise ValueError("Image file is empty")
+        except FileNotFoundError:
+            logging.warning(f"Original image file not found for photo {id}: {filename}")
+            raise HTTPException(status_code=404, detail="Original image file not found")
+        except Exception as exc:
+            logging.error(f"Storage error retrieving {filename} for image: {exc}")
+            raise HTTPException(status_code=500, detail="Storage provider error")
 
-    # 6. Cache the result
-    if cache is not None:
+        # 5. Generate the 1024px JPEG (in a worker process if configured)
         try:
-            cache[cache_key] = image_bytes
-            logging.debug(
-                f"Cached 1024x1024 image for photo {id} ({len(image_bytes)/1024:.1f} KB)"
+            image_bytes = run_transform(render_image, image_data)
+        except TransformQueueFull as exc:
+            logging.warning(f"Rejecting image render for photo {id}: {exc}")
+            raise HTTPException(
+                status_code=503,
+                detail="Image processing is busy, retry shortly",
+                headers={"Retry-After": "1"},
             )
-        except Exception as exc:
-            logging.error(f"Failed to cache image for photo {id}: {exc}")
+        except Exception:
+            logging.exception(f"Error generating fullsize image for photo {id}")
+            raise HTTPException(status_code=500, detail="Image processing failed")
+
+        # 6. Cache the result
+        if cache is not None:
+            try:
+                cache[cache_key] = image_bytes
+                logging.debug(
+                    f"Cached 1024x1024 image for photo {id} ({len(image_bytes)/1024:.1f} KB)"
+                )
+            except Exception as exc:
+                logging.error(f"Failed to cache image for photo {id}: {exc}")
+        if disk_cache is not None:
+            try:
+                disk_cache.put(disk_key, image_bytes)
+            except Exception as exc:
+                logging.error(
+                    f"Failed to write image for photo {id} to disk cache: {exc}"
+                )
+
+        return image_bytes
+
+    image_bytes = get_derivative_flights().do(disk_key, _render)
 
     # 7. Return the image
-    return Response(content=image_bytes, media_type="image/jpeg")
+    return Response(content=image_bytes, media_type="image/jpeg", headers=headers)
+
+
+def _provider_rendition(
+    provider: StorageProvider, filename: str, min_size: tuple[int, int]
+) -> Optional[bytes]:
+    """
+    Fetch a provider-rendered image covering min_size, or None if the provider
+    has none (or fails), in which case the caller renders from the original.
+    """
+    max_size = provider.max_rendition_size()
+    if max_size is None or min_size[0] > max_size[0] or min_size[1] > max_size[1]:
+        return None
+    try:
+        return provider.get_rendition(filename, min_size)
+    except Exception as exc:
+        logger.warning(f"Provider rendition of {filename} failed: {exc}")
+        return None
 
 
 @router.get(
@@ -160,6 +273,9 @@ def get_photo_image(
             "content": {"image/webp": {}},
             "description": "A 512x512 WebP thumbnail for the photo.",
         },
+        304: {
+            "description": "Not modified (If-None-Match / If-Modified-Since matched)"
+        },
         404: {
             "description": "Photo, image file, or thumbnail not found/creatable",
             "content": {"application/json": {"example": {"detail": "Not Found"}}},
@@ -197,128 +313,312 @@ def get_photo_thumbnail(
     - **422**: Returned if the ID is not a valid UUID.
     - **500**: Returned if thumbnail generation fails unexpectedly.
     """
+    # 1. Get photo metadata from DB
+    repo = PhotoRepository(db)
+    try:
+        photo = repo.get(id)
+    except Exception as e:
+        logger.error(f"DB error getting photo {id} for thumbnail: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error",
+        )
+    if photo is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Photo metadata not found",
+        )
+
+    # 1a. Answer conditional requests before touching any cache or storage
+    headers = _rendition_headers(photo, THUMBNAIL_TRANSFORM)
+    if _not_modified(request, photo, headers):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
     cache = get_thumbnail_cache()
-    cache_key = f"thumbnail:{id}"
+    cache_key = thumbnail_cache_key(id, photo.content_hash)
 
-    # 1. Check cache
+    # 1b. Check cache
     if cache is not None:
         cached_thumbnail = cache.get(cache_key)
         if cached_thumbnail:
             logger.debug(f"Thumbnail cache HIT for photo_id: {id}")
-            return Response(content=cached_thumbnail, media_type="image/webp")
+            return Response(
+                content=cached_thumbnail, media_type="image/webp", headers=headers
+            )
         else:
             logger.debug(f"Thumbnail cache MISS for photo_id: {id}")
 
-    # 2. Get photo metadata from DB
+    # 1c. Check on-disk cache (survives restarts, shared across workers)
+    disk_cache = get_derivative_cache()
+    disk_key = derivative_key(id, THUMBNAIL_TRANSFORM, photo.content_hash)
+    if disk_cache is not None:
+        cached_thumbnail = disk_cache.get(disk_key)
+        if cached_thumbnail is not None:
+            logger.debug(f"Thumbnail disk cache HIT for photo_id: {id}")
+            if cache is not None:
+                try:
+                    cache[cache_key] = cached_thumbnail
+                except Exception as e:
+                    logger.error(f"Failed to cache thumbnail for photo {id}: {e}")
+            return Response(
+                content=cached_thumbnail, media_type="image/webp", headers=headers
+            )
+
+    # 3-5. Fetch, render and cache, coalescing concurrent misses for this photo
+    def _render() -> bytes:
+        # Another request may have finished rendering since our cache check
+        if cache is not None:
+            rendered = cache.get(cache_key)
+            if rendered is not None:
+                return rendered
+
+        # 3. Get a pre-scaled rendition from the provider if it renders
+        # thumbnails server-side (Dropbox), else the original from storage
+        provider = request.app.state.get_photo_storage_provider(request.app)
+        filename = photo.filename
+        image_data = _provider_rendition(provider, filename, THUMBNAIL_SIZE)
+        if image_data is None:
+            try:
+                image_bytes_io = provider.retrieve_version(filename, photo.content_hash)
+                if not image_bytes_io:
+                    raise FileNotFoundError  # Should be caught below
+                # Read all bytes into memory for Pillow
+                with image_bytes_io:  # May be an open file (cached original)
+                    image_data = image_bytes_io.read()
+                if not image_data:
+                    raise ValueError("Image file is empty")
+
+            except FileNotFoundError:
+                logger.warning(
+                    f"Original image file not found in storage for photo {id}: {filename}"
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Original image file not found",
+                )
+            except Exception as e:
+                logger.error(f"Storage error retrieving {filename} for thumbnail: {e}")
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="Storage provider error",
+                )
+
+        # 4. Generate thumbnail (in a worker process if configured)
+        try:
+            thumbnail_bytes = run_transform(render_thumbnail, image_data)
+        except TransformQueueFull as e:
+            logger.warning(f"Rejecting thumbnail render for photo {id}: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Image processing is busy, retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        except Exception:
+            logger.exception(
+                f"Unexpected error generating thumbnail for photo {id}"
+            )  # Use logger.exception
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Thumbnail generation failed",
+            )
+
+        # 5. Cache the result
+        if cache is not None:
+            try:
+                size_kb = len(thumbnail_bytes) / 1024
+                cache[cache_key] = thumbnail_bytes
+                logger.debug(f"Cached thumbnail for photo {id} ({size_kb:.1f} KB)")
+            except Exception as e:
+                # Log caching errors but don't fail the request
+                logger.error(f"Failed to cache thumbnail for photo {id}: {e}")
+        if disk_cache is not None:
+            try:
+                disk_cache.put(disk_key, thumbnail_bytes)
+            except Exception as e:
+                logger.error(
+                    f"Failed to write thumbnail for photo {id} to disk cache: {e}"
+                )
+
+        return thumbnail_bytes
+
+    thumbnail_bytes = get_derivative_flights().do(disk_key, _render)
+
+    # 6. Return thumbnail
+    return Response(content=thumbnail_bytes, media_type="image/webp", headers=headers)
+
+
+# Originals are streamed in chunks of this size, never read whole
+ORIGINAL_CHUNK_SIZE = 256 * 1024
+
+_BYTE_RANGE = re.compile(r"bytes=(\d*)-(\d*)")
+
+
+def _requested_range(
+    request: Request, size: int, etag: Optional[str]
+) -> Optional[tuple[int, int]]:
+    """
+    The (first, last) byte positions asked for by a single-range Range header,
+    or None to send the whole file: no Range, an If-Range that doesn't match
+    etag, or a range form we don't serve (multiple ranges, other units).
+    Raises:
+        HTTPException: 416 if the range starts beyond the end of the file.
+    """
+    header = request.headers.get("range")
+    if header is None:
+        return None
+    if_range = request.headers.get("if-range")
+    if if_range is not None and if_range != etag:
+        return None  # Changed since the client's partial download
+    match = _BYTE_RANGE.fullmatch(header.strip())
+    if match is None or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = size - 1 if not last else min(int(last), size - 1)
+        if last and int(last) < start:
+            return None  # Invalid, so ignored (RFC 9110)
+    else:
+        # Suffix range: the last N bytes
+        start, end = max(size - int(last), 0), size - 1
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_416_RANGE_NOT_SATISFIABLE,
+            detail="Range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    return start, end
+
+
+def _iter_file(f: BinaryIO, length: int) -> Iterator[bytes]:
+    """Yield up to length bytes from f's current position, then close it."""
+    try:
+        while length > 0:
+            chunk = f.read(min(ORIGINAL_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        f.close()
+
+
+def _stream_original(
+    request: Request, f: BinaryIO, photo: PhotoModel
+) -> StreamingResponse:
+    """Stream an open original file, honouring a single byte Range."""
+    try:
+        size = f.seek(0, io.SEEK_END)
+        etag = f'"{photo.content_hash}"' if photo.content_hash else None
+        byte_range = _requested_range(request, size, etag)
+    except BaseException:
+        f.close()
+        raise
+    headers = {"Accept-Ranges": "bytes"}
+    if etag:
+        headers["ETag"] = etag
+    status_code = status.HTTP_200_OK
+    start, end = 0, size - 1
+    if byte_range is not None:
+        start, end = byte_range
+        status_code = status.HTTP_206_PARTIAL_CONTENT
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    f.seek(start)
+    media_type = mimetypes.guess_type(photo.filename)[0] or "application/octet-stream"
+    return StreamingResponse(
+        _iter_file(f, end - start + 1),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers,
+    )
+
+
+@router.get(
+    "/photos/{id}/original",
+    responses={
+        200: {"description": "The original file, unmodified"},
+        206: {"description": "The requested byte range of the original file"},
+        307: {"description": "Redirect to a temporary link to the original file"},
+        404: {
+            "description": "Photo or original file not found",
+            "content": {"application/json": {"example": {"detail": "Not Found"}}},
+        },
+        416: {"description": "Requested range not satisfiable"},
+        422: {
+            "description": "Invalid UUID supplied",
+            "content": {
+                "application/json": {"example": {"detail": "value is not a valid uuid"}}
+            },
+        },
+    },
+    response_class=Response,
+)
+def get_photo_original(
+    id: UUID,
+    request: Request,
+    db: Session = Depends(get_db),
+    _=Depends(verify_api_key),
+):
+    """
+    Download the photo's original file, at full resolution and unmodified.
+
+    Providers that can link to files (Dropbox temporary links) get a redirect,
+    so the download never passes through this server. Local files are sent
+    with FileResponse (sendfile where the server supports it); anything else
+    is streamed in chunks. Single byte ranges (Range/If-Range) are supported,
+    so interrupted downloads can resume.
+
+    - **id**: UUID of the photo.
+    - **Returns**: The original file (200 or 206), or a 307 redirect to it.
+    - **404**: If the photo or its file is not found.
+    - **416**: If the requested range is beyond the end of the file.
+    - **422**: If ID is not a valid UUID.
+    """
     repo = PhotoRepository(db)
     try:
         photo = repo.get(id)
-        if photo is None:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND, detail="Photo metadata not found"
-            )
     except Exception as e:
-        logger.error(f"DB error getting photo {id} for thumbnail: {e}")
+        logger.error(f"DB error getting photo {id} for original: {e}")
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Database error"
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Database error",
+        )
+    if photo is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Photo metadata not found",
         )
 
-    # 3. Get original image from storage
     provider = request.app.state.get_photo_storage_provider(request.app)
     filename = photo.filename
     try:
-        image_bytes_io = provider.retrieve(filename)
-        if not image_bytes_io:
-            raise FileNotFoundError  # Should be caught below
-        # Read all bytes into memory for Pillow
-        image_data = image_bytes_io.read()
-        if not image_data:
-            raise ValueError("Image file is empty")
-
-    except FileNotFoundError:
-        logger.warning(
-            f"Original image file not found in storage for photo {id}: {filename}"
+        url = provider.get_url(filename, photo.content_hash)
+        if url is not None:
+            # The link expires, so the redirect must not outlive it in caches
+            return RedirectResponse(url, headers={"Cache-Control": "no-store"})
+        path = provider.local_path(filename)
+        if path is not None:
+            # Starlette handles Range/If-Range and validators from the file's stat
+            return FileResponse(path)
+        return _stream_original(
+            request, provider.retrieve_version(filename, photo.content_hash), photo
         )
+    except HTTPException:
+        raise
+    except FileNotFoundError:
+        logger.warning(f"Original file not found for photo {id}: {filename}")
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Original image file not found",
         )
     except Exception as e:
-        logger.error(f"Storage error retrieving {filename} for thumbnail: {e}")
+        logger.error(f"Storage error retrieving original {filename}: {e}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Storage provider error",
         )
 
-    # 4. Generate thumbnail
-    try:
-        # Ensure pillow_heif is registered (should be via main.py lifespan)
-        if (
-            not pillow_heif.is_supported(io.BytesIO(image_data))
-            and not Image.open(io.BytesIO(image_data)).format
-        ):
-            pillow_heif.register_heif_opener()  # Attempt registration again just in case?
-
-        img = Image.open(io.BytesIO(image_data))
-
-        # Ensure image is in RGB mode for WebP saving (no alpha)
-        if img.mode != "RGB":
-            logger.debug(
-                f"Converting image {id} from mode {img.mode} to RGB for thumbnail."
-            )
-            img = img.convert("RGB")
-
-        # Desired thumbnail size
-        target_w, target_h = 512, 384
-
-        # Calculate crop (center crop)
-        img_ratio = img.width / img.height
-        target_ratio = target_w / target_h
-        if img_ratio > target_ratio:
-            # Image is wider than target: crop horizontally
-            new_width = int(target_ratio * img.height)
-            left = (img.width - new_width) // 2
-            right = left + new_width
-            top, bottom = 0, img.height
-        else:
-            # Image is taller than target: crop vertically
-            new_height = int(img.width / target_ratio)
-            top = (img.height - new_height) // 2
-            bottom = top + new_height
-            left, right = 0, img.width
-        img_cropped = img.crop((left, top, right, bottom))
-
-        # Resize to target size
-        img_thumb = img_cropped.resize((target_w, target_h), Image.Resampling.LANCZOS)
-
-        # Save to a bytes buffer as lossy WebP (no transparency)
-        buffer = io.BytesIO()
-        img_thumb.save(buffer, format="WEBP", quality=80, method=4)
-        thumbnail_bytes = buffer.getvalue()
-
-    except Exception:
-        logger.exception(
-            f"Unexpected error generating thumbnail for photo {id}"
-        )  # Use logger.exception
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Thumbnail generation failed",
-        )
-
-    # 5. Cache the result
-    if cache is not None:
-        try:
-            # Estimate size for logging, not for cachetools itself
-            size_kb = len(thumbnail_bytes) / 1024
-            cache[cache_key] = thumbnail_bytes
-            logger.debug(f"Cached thumbnail for photo {id} ({size_kb:.1f} KB)")
-        except Exception as e:
-            # Log caching errors but don't fail the request
-            logger.error(f"Failed to cache thumbnail for photo {id}: {e}")
-
-    # 6. Return thumbnail
-    return Response(content=thumbnail_bytes, media_type="image/webp")
-
 
 @router.patch(
     "/photos/{id}/metadata",
@@ -468,25 +768,47 @@ def list_photos(
     db: Session = Depends(get_db),
     offset: int = 0,
     limit: int = 50,
+    cursor: Optional[str] = None,
     _=Depends(verify_api_key),
 ):
     """
     List photo metadata (paginated).
 
+    Two paging modes are supported:
+    - Offset mode (default): pass **offset**; the response includes **total**.
+    - Cursor mode: pass the **next_cursor** from a previous response as **cursor**.
+      Each page costs O(limit) regardless of depth; **total** is omitted (null).
+
+    Both modes return **next_cursor** when more photos follow, so a client can
+    switch to cursor mode after the first page.
+
     - **limit**: Maximum number of photos to return (1-100, default 50)
-    - **offset**: Number of photos to skip (default 0)
+    - **offset**: Number of photos to skip (default 0; not allowed with cursor)
+    - **cursor**: Opaque cursor returned as next_cursor by a previous page
     - **Returns**: Paginated list of Photo objects
-    - **422**: Returned if limit or offset is out of bounds
+    - **422**: Returned if limit or offset is out of bounds, or cursor is invalid
     """
     # Validate limit and offset
     if limit < 1 or limit > 100:
         raise HTTPException(status_code=422, detail="limit must be between 1 and 100")
     if offset < 0:
         raise HTTPException(status_code=422, detail="offset must be >= 0")
+    if cursor is not None and offset != 0:
+        raise HTTPException(
+            status_code=422, detail="offset cannot be combined with cursor"
+        )
 
     repo = PhotoRepository(db)
-    photos = repo.list()
-    total = len(photos)
+    if cursor is not None:
+        # Fetch one extra row to find out whether another page follows
+        total = None
+        photos = repo.list_after(after=_decode_cursor(cursor), limit=limit + 1)
+        has_more = len(photos) > limit
+        photos = photos[:limit]
+    else:
+        total = repo.count()
+        photos = repo.list_page(offset=offset, limit=limit)
+        has_more = offset + len(photos) < total
     items = [
         Photo(
             id=str(photo.id),
@@ -494,11 +816,28 @@ def list_photos(
             metadata=PhotoMetadataFields(description=photo.description),
             last_modified=photo.updated_at.isoformat(),
         )
-        for photo in photos[offset : offset + limit]
+        for photo in photos
     ]
     return PhotoListResponse(
         total=total,
         limit=limit,
         offset=offset,
         items=items,
+        next_cursor=_encode_cursor(photos[-1]) if has_more and photos else None,
     )
+
+
+def _encode_cursor(photo: PhotoModel) -> str:
+    """Encode the (created_at, id) keyset position of a photo as an opaque string."""
+    payload = json.dumps([photo.created_at.isoformat(), photo.id.hex])
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """Decode a cursor produced by _encode_cursor. Raises 422 if malformed."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, photo_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), UUID(hex=photo_id)
+    except Exception:
+        raise HTTPException(status_code=422, detail="cursor is invalid")
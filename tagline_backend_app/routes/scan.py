@@ -2,89 +2,109 @@
 Rescan API route for Tagline backend.
 """
 
-import asyncio
+from datetime import UTC, datetime
+from uuid import UUID
 
-from fastapi import APIRouter, BackgroundTasks, Depends, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 
-from tagline_backend_app.crud.photo import PhotoRepository
+from tagline_backend_app.crud.scan_job import ScanJobRepository
 from tagline_backend_app.db import get_db
 from tagline_backend_app.deps import verify_api_key
+from tagline_backend_app.models import ScanJob, as_utc
+from tagline_backend_app.scan_jobs import get_scan_job_runner
+from tagline_backend_app.schemas import ScanJobResponse
+from tagline_backend_app.watcher import get_filesystem_watcher
 
 router = APIRouter()
 
 
-# In-memory lock for scan idempotency (attach to app.state on startup)
-def get_scan_lock(app):
-    if not hasattr(app.state, "scan_lock"):
-        app.state.scan_lock = asyncio.Lock()
-    return app.state.scan_lock
+def _job_response(job: ScanJob) -> ScanJobResponse:
+    started_at = as_utc(job.started_at)
+    finished_at = as_utc(job.finished_at) if job.finished_at else None
+    elapsed = ((finished_at or datetime.now(UTC)) - started_at).total_seconds()
+    return ScanJobResponse(
+        id=str(job.id),
+        status=job.status,
+        full=job.full,
+        started_at=started_at,
+        finished_at=finished_at,
+        files_seen=job.files_seen,
+        imported=job.imported,
+        skipped=job.skipped,
+        modified=job.modified,
+        moved=job.moved,
+        deleted=job.deleted,
+        files_per_second=round(job.files_seen / elapsed, 1) if elapsed > 0 else 0.0,
+        error=job.error,
+        resumed_from=str(job.resumed_from) if job.resumed_from else None,
+    )
 
 
-@router.post("/scan", status_code=200)
-def scan_photos(
-    request: Request,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
-    _=Depends(verify_api_key),
+@router.get("/scan/status")
+def scan_status(_=Depends(verify_api_key)):
+    """
+    Live progress of the current or most recent scan in this process (imports
+    and pre-generated renditions), plus the filesystem watcher's queue depth
+    and counters.
+    """
+    runner = get_scan_job_runner()
+    watcher = get_filesystem_watcher()
+    job_id = runner.current_job_id
+    return {
+        **runner.progress.as_dict(),
+        "job_id": str(job_id) if job_id is not None else None,
+        "watcher": watcher.stats() if watcher is not None else None,
+    }
+
+
+@router.get("/scan/latest", response_model=ScanJobResponse)
+def latest_scan_job(db: Session = Depends(get_db), _=Depends(verify_api_key)):
+    """
+    State of the most recently started scan.
+
+    - **404**: If no scan has run yet.
+    """
+    job = ScanJobRepository(db).latest()
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="No scans yet"
+        )
+    return _job_response(job)
+
+
+@router.get("/scan/{job_id}", response_model=ScanJobResponse)
+def get_scan_job(
+    job_id: UUID, db: Session = Depends(get_db), _=Depends(verify_api_key)
 ):
     """
-    Async/idempotent scan endpoint. Starts a scan if not already running.
-    Returns status: "started" or "already_running".
+    State of one scan: status, timestamps, counters and throughput.
+    Counters of a running scan are at most a few seconds old.
+
+    - **404**: If the job does not exist.
+    """
+    job = ScanJobRepository(db).get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Scan job not found"
+        )
+    return _job_response(job)
+
+
+@router.post("/scan", status_code=200)
+def scan_photos(request: Request, full: bool = False, _=Depends(verify_api_key)):
+    """
+    Idempotent scan endpoint. Starts a scan on the scan worker thread if none
+    is running in any worker process, and returns immediately.
+    Providers with a change feed (Dropbox) scan incrementally from the cursor
+    saved by the last scan; pass full=true to list everything instead.
+    Returns status: "started" or "already_running", and the job_id to poll
+    with GET /scan/{job_id}.
     """
     app = request.app
-    scan_lock = get_scan_lock(app)
-    if scan_lock.locked():
-        return {"status": "already_running"}
-
-    def scan_logic():
-        # Real scan logic: import new photos with metadata
-        import logging
-
-        from PIL import Image, UnidentifiedImageError
-
-        provider = app.state.get_photo_storage_provider(app)
-        repo = PhotoRepository(db)
-        try:
-            storage_files = set(f for f in provider.list() if isinstance(f, str))
-            db_photos = repo.list()
-            db_filenames = set(photo.filename for photo in db_photos)
-            new_files = storage_files - db_filenames
-            imported = []
-            for fname in new_files:
-                logging.debug(f"[scan] Processing file: {fname}")
-                width = height = None
-                try:
-                    with provider.retrieve(fname) as f:
-                        with Image.open(f) as img:
-                            width, height = img.width, img.height
-                    logging.debug(
-                        f"[scan] Extracted: {fname} width={width} height={height}"
-                    )
-                except (FileNotFoundError, UnidentifiedImageError, OSError) as e:
-                    logging.warning(
-                        f"[scan] Skipping unreadable/corrupt image '{fname}': {e}"
-                    )
-                    continue
-                # Add more metadata extraction here as needed
-                photo = repo.create(
-                    filename=fname, metadata={"width": width, "height": height}
-                )
-                imported.append(photo.filename)
-                logging.info(
-                    f"[scan] Imported: {fname} (width={width}, height={height})"
-                )
-            # Optionally: store results in app.state for /health, etc.
-        except Exception as e:
-            logging.error(f"Scan failed: {e}")
-            # Optionally: store error in app.state
-        finally:
-            # Release lock if needed (asyncio.Lock auto-releases with context mgr)
-            pass
-
-    async def scan_wrapper():
-        async with scan_lock:
-            scan_logic()
-
-    background_tasks.add_task(scan_wrapper)
-    return {"status": "started"}
+    provider = app.state.get_photo_storage_provider(app)
+    job_id, started = get_scan_job_runner().submit(provider, full=full)
+    return {
+        "status": "started" if started else "already_running",
+        "job_id": str(job_id) if job_id is not None else None,
+    }
@@ -0,0 +1,289 @@
+"""
+scan_jobs.py
+
+Runs storage scans off the event loop. Scans execute one at a time on a
+dedicated thread, each with its own database session, and are recorded as
+ScanJob rows whose counters are saved every few seconds, so
+GET /scan/{job_id} and GET /scan/latest can report on them (from any
+worker process) while request latency stays flat. A cluster-wide scan lock
+(see scan_lock.py) keeps other worker processes from starting a second scan.
+A scan interrupted by a restart is resumed from its checkpoint by the next
+scan, or at startup (see resume_interrupted_scan()); on shutdown, or if the
+scan lock is lost, the running scan stops at its next batch boundary.
+"""
+
+import logging
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from sqlalchemy.orm import Session
+
+from tagline_backend_app.config import get_settings
+from tagline_backend_app.crud.scan_checkpoint import ScanCheckpointRepository
+from tagline_backend_app.crud.scan_job import ScanJobRepository
+from tagline_backend_app.db import get_session_local
+from tagline_backend_app.scan_lock import ScanLock, create_scan_lock
+from tagline_backend_app.scanner import (
+    ScanInterrupted,
+    ScanProgress,
+    checkpoint_scope,
+    create_pregenerator,
+    run_scan,
+)
+from tagline_backend_app.storage.provider import StorageProvider
+
+logger = logging.getLogger(__name__)
+
+
+class ScanJobRunner:
+    """
+    Starts scans on a single worker thread and tracks the running one.
+
+    ``progress`` holds the live counters of the current (or most recent)
+    scan in this process; they are copied to the job's row every
+    ``flush_interval`` seconds and when the scan ends. The scan lock from
+    ``lock_factory`` is held for the whole scan and heartbeated on the same
+    schedule; if a heartbeat finds it lost, or on shutdown(), the scan is
+    interrupted after its current batch (see scanner.ScanInterrupted).
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        flush_interval: float = 2.0,
+        lock_factory: Optional[Callable[[], ScanLock]] = None,
+    ):
+        self._session_factory = session_factory
+        self._flush_interval = flush_interval
+        self._lock_factory = lock_factory or (
+            lambda: create_scan_lock(
+                session_factory, get_settings().SCAN_LOCK_LEASE_SECONDS
+            )
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="scan-job"
+        )
+        self._lock = threading.Lock()
+        self._current_job_id: Optional[uuid.UUID] = None
+        # Set to stop the running scan at its next batch boundary
+        self._interrupt = threading.Event()
+        self.progress = ScanProgress()
+
+    @property
+    def current_job_id(self) -> Optional[uuid.UUID]:
+        """ID of the scan running in this process, or None."""
+        return self._current_job_id
+
+    def submit(
+        self, provider: StorageProvider, full: bool = False
+    ) -> tuple[Optional[uuid.UUID], bool]:
+        """
+        Start a scan unless one is already running, in this process or any
+        other sharing the database.
+        Returns:
+            (job id, True) for a new scan, or (running job's id, False). The
+            id may be None if another process holds the lock but has not
+            recorded its job yet.
+        """
+        with self._lock:
+            if self._current_job_id is not None:
+                return self._current_job_id, False
+            scan_lock = self._lock_factory()
+            db = self._session_factory()
+            try:
+                jobs = ScanJobRepository(db)
+                if not scan_lock.acquire():
+                    running = jobs.running()
+                    return (running.id if running else None), False
+                try:
+                    # We hold the lock, so jobs still marked running were
+                    # orphaned by a worker that died mid-scan (the next scan
+                    # resumes from their checkpoint)
+                    orphaned = jobs.fail_running(
+                        "Interrupted: the scanning worker exited"
+                    )
+                    if orphaned:
+                        logger.warning(
+                            f"[scan] Marked {orphaned} orphaned job(s) failed"
+                        )
+                    job_id = jobs.create(full=full).id
+                except BaseException:
+                    scan_lock.release()
+                    raise
+            finally:
+                db.close()
+            self._current_job_id = job_id
+            interrupt = threading.Event()
+            self._interrupt = interrupt
+            self.progress.start()
+        try:
+            self._executor.submit(
+                self._run, job_id, provider, full, scan_lock, interrupt
+            )
+        except BaseException:
+            self._finish(job_id, scan_lock, "failed", "Scan could not be started")
+            raise
+        return job_id, True
+
+    def resume(self, provider: StorageProvider) -> Optional[uuid.UUID]:
+        """
+        Start a scan if an interrupted one left a checkpoint for provider, so
+        it finishes after a restart without waiting for the next POST /scan.
+        Returns:
+            The new job's id, or None if there was nothing to resume (or a
+            scan is already running).
+        """
+        db = self._session_factory()
+        try:
+            checkpoint = ScanCheckpointRepository(db).get(checkpoint_scope(provider))
+        finally:
+            db.close()
+        if checkpoint is None:
+            return None
+        job_id, started = self.submit(provider)
+        return job_id if started else None
+
+    def _run(
+        self,
+        job_id: uuid.UUID,
+        provider: StorageProvider,
+        full: bool,
+        scan_lock: ScanLock,
+        interrupt: threading.Event,
+    ) -> None:
+        settings = get_settings()
+        stop = threading.Event()
+        flusher = threading.Thread(
+            target=self._flush_loop,
+            args=(job_id, scan_lock, stop, interrupt),
+            daemon=True,
+        )
+        flusher.start()
+        logger.info(f"[scan] Job {job_id} started (full={full})")
+        pregenerator = create_pregenerator(self.progress)
+        error = None
+        db = self._session_factory()
+        try:
+            run_scan(
+                provider,
+                db,
+                self.progress,
+                pregenerator,
+                batch_size=settings.SCAN_BATCH_SIZE,
+                workers=settings.SCAN_WORKERS,
+                extensions=settings.scan_extensions,
+                full=full,
+                job_id=job_id,
+                stop=interrupt,
+            )
+        except ScanInterrupted as e:
+            logger.warning(f"[scan] Job {job_id} interrupted")
+            error = f"Interrupted: {e}"
+        except Exception as e:
+            logger.exception(f"[scan] Job {job_id} failed")
+            error = str(e)
+        finally:
+            db.close()
+            if pregenerator is not None:
+                pregenerator.close()
+            stop.set()
+            flusher.join()
+            status = "failed" if error else "succeeded"
+            self._finish(job_id, scan_lock, status, error)
+
+    def _finish(
+        self,
+        job_id: uuid.UUID,
+        scan_lock: ScanLock,
+        status: str,
+        error: Optional[str],
+    ) -> None:
+        self.progress.finish(error)
+        self._save(job_id, status, error)
+        scan_lock.release()
+        with self._lock:
+            self._current_job_id = None
+        logger.info(f"[scan] Job {job_id} {status}")
+
+    def _flush_loop(
+        self,
+        job_id: uuid.UUID,
+        scan_lock: ScanLock,
+        stop: threading.Event,
+        interrupt: threading.Event,
+    ) -> None:
+        lost = False
+        while not stop.wait(self._flush_interval):
+            if not scan_lock.heartbeat() and not lost:
+                # Another scan may start now: stop at the next batch boundary
+                # (committed batches are checkpointed, so none is lost)
+                lost = True
+                logger.error(f"[scan] Job {job_id} lost the scan lock; stopping")
+                interrupt.set()
+            self._save(job_id)
+
+    def _save(
+        self,
+        job_id: uuid.UUID,
+        status: Optional[str] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        db = self._session_factory()
+        try:
+            ScanJobRepository(db).save_progress(
+                job_id, self.progress.as_dict(), status, error
+            )
+        except Exception as e:
+            logger.warning(f"[scan] Could not save progress of job {job_id}: {e}")
+        finally:
+            db.close()
+
+    def shutdown(self) -> None:
+        """
+        Stop accepting scans, and interrupt a scan in progress after its
+        current batch (the next scan, e.g. at startup, resumes it).
+        """
+        with self._lock:
+            self._interrupt.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# Global scan job runner (created on first use)
+SCAN_JOB_RUNNER: Optional[ScanJobRunner] = None
+_RUNNER_LOCK = threading.Lock()
+
+
+def get_scan_job_runner() -> ScanJobRunner:
+    """Returns the global scan job runner, creating it on first use."""
+    global SCAN_JOB_RUNNER
+    with _RUNNER_LOCK:
+        if SCAN_JOB_RUNNER is None:
+            SCAN_JOB_RUNNER = ScanJobRunner(get_session_local())
+        return SCAN_JOB_RUNNER
+
+
+def resume_interrupted_scan(provider: StorageProvider) -> None:
+    """
+    Resume a scan left unfinished by a previous process, if any. Called at
+    startup; with several workers, the scan lock lets only one of them
+    resume it. Failures are logged, never raised.
+    """
+    try:
+        job_id = get_scan_job_runner().resume(provider)
+    except Exception as e:
+        logger.warning(f"[scan] Could not check for an interrupted scan: {e}")
+        return
+    if job_id is not None:
+        logger.info(f"[scan] Resuming an interrupted scan as job {job_id}")
+
+
+def shutdown_scan_job_runner() -> None:
+    """Shuts down the global scan job runner, if any."""
+    global SCAN_JOB_RUNNER
+    with _RUNNER_LOCK:
+        if SCAN_JOB_RUNNER is not None:
+            SCAN_JOB_RUNNER.shutdown()
+            SCAN_JOB_RUNNER = None
+            logger.info("Scan job runner shut down.")
@@ -0,0 +1,209 @@
+"""
+scan_lock.py
+
+Cluster-wide mutual exclusion for storage scans, so that with several uvicorn
+or gunicorn workers (or hosts) sharing one database, exactly one scan runs at
+a time.
+
+On PostgreSQL this is a session-level advisory lock held on a dedicated
+connection: the server drops it as soon as that connection goes away, so a
+crashed worker cannot wedge scanning. Other databases (SQLite) use a lease
+row with an expiry that the holder renews on every heartbeat; if the holder
+dies, the lease lapses and the next scan takes it over.
+"""
+
+import logging
+import os
+import socket
+import uuid
+from datetime import UTC, datetime, timedelta
+from typing import Callable, Optional
+
+from sqlalchemy import delete, func, select, text, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from tagline_backend_app.db import rowcount
+from tagline_backend_app.models import ScanLease
+
+logger = logging.getLogger(__name__)
+
+SCAN_LOCK_NAME = "scan"
+# Advisory lock key for scans (arbitrary, but must be the same for every worker)
+SCAN_ADVISORY_LOCK_KEY = 0x7467_6C6E_7363_616E  # "tglnscan"
+
+
+class ScanLock:
+    """
+    A lock that at most one process holds at a time.
+    acquire() never blocks; heartbeat() must be called periodically while the
+    lock is held and returns False once the lock has been lost.
+    """
+
+    def acquire(self) -> bool:
+        raise NotImplementedError
+
+    def heartbeat(self) -> bool:
+        raise NotImplementedError
+
+    def release(self) -> None:
+        raise NotImplementedError
+
+
+class AdvisoryScanLock(ScanLock):
+    """PostgreSQL pg_try_advisory_lock held on its own connection."""
+
+    def __init__(self, engine: Engine, key: int = SCAN_ADVISORY_LOCK_KEY):
+        self._engine = engine
+        self._key = key
+        self._conn: Optional[Connection] = None
+
+    def acquire(self) -> bool:
+        conn = self._engine.connect()
+        try:
+            locked = conn.scalar(select(func.pg_try_advisory_lock(self._key)))
+            # The lock belongs to the session, not the transaction; don't sit
+            # idle in a transaction while the scan runs
+            conn.commit()
+        except Exception:
+            conn.close()
+            raise
+        if not locked:
+            conn.close()
+            return False
+        self._conn = conn
+        return True
+
+    def heartbeat(self) -> bool:
+        if self._conn is None:
+            return False
+        try:
+            self._conn.execute(text("SELECT 1"))
+            self._conn.commit()
+            return True
+        except Exception as e:
+            # The connection, and with it the lock, is gone
+            logger.error(f"[scan] Lost the scan advisory lock: {e}")
+            return False
+
+    def release(self) -> None:
+        if self._conn is None:
+            return
+        try:
+            self._conn.scalar(select(func.pg_advisory_unlock(self._key)))
+            self._conn.commit()
+        except Exception as e:
+            logger.warning(f"[scan] Could not release the scan advisory lock: {e}")
+        finally:
+            # Closing the connection releases the lock regardless
+            self._conn.close()
+            self._conn = None
+
+
+class LeaseScanLock(ScanLock):
+    """
+    Lease row in scan_leases, taken with conditional INSERT/UPDATE statements
+    so two processes can never both succeed. The lease expires lease_seconds
+    after the last heartbeat.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        lease_seconds: float = 60,
+        name: str = SCAN_LOCK_NAME,
+    ):
+        self._session_factory = session_factory
+        self._lease = timedelta(seconds=lease_seconds)
+        self._name = name
+        self.holder = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def acquire(self) -> bool:
+        db = self._session_factory()
+        try:
+            now = datetime.now(UTC)
+            # Take over an expired lease (or refresh our own)
+            taken = rowcount(
+                db.execute(
+                    update(ScanLease)
+                    .where(ScanLease.name == self._name)
+                    .where(
+                        (ScanLease.expires_at < now) | (ScanLease.holder == self.holder)
+                    )
+                    .values(
+                        holder=self.holder,
+                        acquired_at=now,
+                        expires_at=now + self._lease,
+                    )
+                )
+            )
+            if not taken:
+                try:
+                    db.add(
+                        ScanLease(
+                            name=self._name,
+                            holder=self.holder,
+                            acquired_at=now,
+                            expires_at=now + self._lease,
+                        )
+                    )
+                    db.flush()
+                except IntegrityError:
+                    db.rollback()
+                    return False  # Someone else holds an unexpired lease
+            db.commit()
+            return True
+        finally:
+            db.close()
+
+    def heartbeat(self) -> bool:
+        db = self._session_factory()
+        try:
+            renewed = rowcount(
+                db.execute(
+                    update(ScanLease)
+                    .where(
+                        ScanLease.name == self._name, ScanLease.holder == self.holder
+                    )
+                    .values(expires_at=datetime.now(UTC) + self._lease)
+                )
+            )
+            db.commit()
+        except Exception as e:
+            logger.warning(f"[scan] Could not renew the scan lease: {e}")
+            return True  # Not lost yet; the lease may still be ours
+        finally:
+            db.close()
+        if not renewed:
+            logger.error("[scan] Lost the scan lease to another process")
+        return bool(renewed)
+
+    def release(self) -> None:
+        db = self._session_factory()
+        try:
+            db.execute(
+                delete(ScanLease).where(
+                    ScanLease.name == self._name, ScanLease.holder == self.holder
+                )
+            )
+            db.commit()
+        except Exception as e:
+            # Left to expire
+            logger.warning(f"[scan] Could not release the scan lease: {e}")
+        finally:
+            db.close()
+
+
+def create_scan_lock(
+    session_factory: Callable[[], Session], lease_seconds: float = 60
+) -> ScanLock:
+    """Advisory lock on PostgreSQL, lease row on anything else."""
+    db = session_factory()
+    try:
+        engine = db.get_bind()
+    finally:
+        db.close()
+    if isinstance(engine, Engine) and engine.dialect.name == "postgresql":
+        return AdvisoryScanLock(engine)
+    return LeaseScanLock(session_factory, lease_seconds)
@@ -0,0 +1,961 @@
+"""
+scanner.py
+
+Storage scan: keeps Photo rows in line with the storage provider. New files
+are imported with their width/height, and edits, moves and deletions are
+detected by content hash (with size/mtime to skip files that did not change).
+Providers with a change feed (Dropbox) are scanned incrementally from a saved
+cursor. Each scan's plan is checkpointed in the database and applied in
+committed batches, so a scan interrupted by a restart resumes where it
+stopped. Optionally pre-generates renditions into the on-disk derivative
+cache while the original is already in hand (or, for thumbnails only, from
+batches of thumbnails the provider renders itself), so the first view of a
+freshly imported album is warm.
+"""
+
+import io
+import itertools
+import logging
+import threading
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
+from datetime import UTC, datetime
+from typing import Any, Callable, Collection, Iterable, Iterator, Optional, TypeVar
+
+from PIL import Image, UnidentifiedImageError
+from sqlalchemy.orm import Session
+
+from tagline_backend_app.caching import (
+    derivative_key,
+    get_derivative_cache,
+    invalidate_renditions,
+)
+from tagline_backend_app.config import get_settings
+from tagline_backend_app.crud.photo import PhotoRepository
+from tagline_backend_app.crud.scan_checkpoint import ScanCheckpointRepository
+from tagline_backend_app.crud.storage_cursor import StorageCursorRepository
+from tagline_backend_app.disk_cache import DiskCache
+from tagline_backend_app.imaging import (
+    IMAGE_TRANSFORM,
+    THUMBNAIL_SIZE,
+    THUMBNAIL_TRANSFORM,
+    render_image,
+    render_thumbnail,
+)
+from tagline_backend_app.models import Photo
+from tagline_backend_app.storage.provider import (
+    StorageChanges,
+    StorageCursorReset,
+    StorageEntry,
+    StorageProvider,
+    matches_extensions,
+)
+from tagline_backend_app.transform_pool import run_transform
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Serializes scans and watcher updates within this process, so two writers
+# never import the same new file twice
+_WRITE_LOCK = threading.Lock()
+
+
+class ScanInterrupted(Exception):
+    """
+    Raised by run_scan() when its stop event is set. The scan stops after
+    committing (and checkpointing) its current batch, so the next scan
+    resumes where it left off.
+    """
+
+
+class ScanProgress:
+    """
+    Counters for the current (or most recent) scan.
+    Updated from the scan thread and the pre-generation workers.
+    """
+
+    _COUNTERS = (
+        "files_seen",
+        "files_found",
+        "imported",
+        "skipped",
+        "modified",
+        "moved",
+        "deleted",
+        "thumbnails_generated",
+        "images_generated",
+        "pregenerate_failed",
+    )
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.running = False
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.error: Optional[str] = None
+        self.resumed_from: Optional[uuid.UUID] = None
+        self.counts: dict[str, int] = dict.fromkeys(self._COUNTERS, 0)
+
+    def start(self) -> None:
+        """Reset the counters for a new scan."""
+        with self._lock:
+            self.running = True
+            self.started_at = datetime.now(UTC)
+            self.finished_at = None
+            self.error = None
+            self.resumed_from = None
+            self.counts = dict.fromkeys(self._COUNTERS, 0)
+
+    def resume(self, job_id: Optional[uuid.UUID]) -> None:
+        """Record that this scan picked up the checkpoint of job_id."""
+        with self._lock:
+            self.resumed_from = job_id
+
+    def finish(self, error: Optional[str] = None) -> None:
+        with self._lock:
+            self.running = False
+            self.finished_at = datetime.now(UTC)
+            self.error = error
+
+    def increment(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counts[counter] += amount
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return a snapshot of the scan state and counters."""
+        with self._lock:
+            return {
+                "running": self.running,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "error": self.error,
+                "resumed_from": self.resumed_from,
+                **self.counts,
+            }
+
+
+class Pregenerator:
+    """
+    Renders renditions of newly imported photos on a small thread pool and
+    stores them in the on-disk derivative cache.
+
+    Transforms go through run_transform(), so they use the image worker pool
+    when one is configured. At most ``2 * concurrency`` originals are held in
+    memory at once; submit() blocks the scan until a slot frees up.
+    """
+
+    def __init__(
+        self,
+        cache: DiskCache,
+        progress: ScanProgress,
+        thumbnails: bool = True,
+        images: bool = False,
+        concurrency: int = 2,
+    ):
+        concurrency = max(1, concurrency)
+        self._cache = cache
+        self._progress = progress
+        self._renditions: list[tuple[str, Callable[[bytes], bytes], str]] = []
+        if thumbnails:
+            self._renditions.append(
+                (THUMBNAIL_TRANSFORM, render_thumbnail, "thumbnails_generated")
+            )
+        if images:
+            self._renditions.append((IMAGE_TRANSFORM, render_image, "images_generated"))
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="scan-pregenerate"
+        )
+        self._slots = threading.BoundedSemaphore(2 * concurrency)
+
+    @property
+    def thumbnails_only(self) -> bool:
+        """True if thumbnails are the only rendition pre-generated."""
+        return [transform for transform, _, _ in self._renditions] == [
+            THUMBNAIL_TRANSFORM
+        ]
+
+    def submit(
+        self,
+        photo_id: uuid.UUID,
+        image_data: bytes,
+        content_hash: Optional[str] = None,
+    ) -> None:
+        """Queue the renditions for photo_id, waiting if too many are pending."""
+        self._slots.acquire()
+        try:
+            self._executor.submit(self._render, photo_id, image_data, content_hash)
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _render(
+        self, photo_id: uuid.UUID, image_data: bytes, content_hash: Optional[str]
+    ) -> None:
+        try:
+            for transform, render, counter in self._renditions:
+                key = derivative_key(photo_id, transform, content_hash)
+                try:
+                    self._cache.put(key, run_transform(render, image_data))
+                except Exception as e:
+                    logger.warning(
+                        f"[scan] Could not pre-generate {transform} for {photo_id}: {e}"
+                    )
+                    self._progress.increment("pregenerate_failed")
+                    continue
+                self._progress.increment(counter)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        """Wait for pending renditions to finish."""
+        self._executor.shutdown(wait=True)
+
+
+def create_pregenerator(progress: ScanProgress) -> Optional[Pregenerator]:
+    """Build a Pregenerator from settings, or None if pre-generation is off."""
+    settings = get_settings()
+    thumbnails = settings.SCAN_PREGENERATE_THUMBNAILS
+    images = settings.SCAN_PREGENERATE_IMAGES
+    if not (thumbnails or images):
+        return None
+    cache = get_derivative_cache()
+    if cache is None:
+        logger.warning(
+            "[scan] Pre-generation is enabled but the on-disk derivative cache is "
+            "disabled (set DERIVATIVE_CACHE_DIR). Skipping pre-generation."
+        )
+        return None
+    return Pregenerator(
+        cache,
+        progress,
+        thumbnails=thumbnails,
+        images=images,
+        concurrency=settings.SCAN_PREGENERATE_CONCURRENCY,
+    )
+
+
+# Header probing reads this much first, then grows 4x per retry up to the max.
+# JPEG EXIF/APP segments can push the SOF marker past the first few KB.
+PROBE_INITIAL_BYTES = 64 * 1024
+PROBE_MAX_BYTES = 1024 * 1024
+
+
+def probe_dimensions(
+    provider: StorageProvider,
+    key: str,
+    initial_bytes: int = PROBE_INITIAL_BYTES,
+    max_bytes: int = PROBE_MAX_BYTES,
+) -> tuple[int, int]:
+    """
+    Read an image's width/height from as few leading bytes as possible.
+    Pillow only parses headers on open, so a prefix is enough for JPEG, PNG,
+    TIFF and HEIF. The prefix grows while the header is cut off, and formats
+    that need the whole file to open (e.g. WebP) fall back to a full download.
+    Raises:
+        FileNotFoundError, UnidentifiedImageError, OSError: As for retrieve()
+            and Image.open().
+    """
+    length = initial_bytes
+    while True:
+        data = provider.read_prefix(key, length)
+        try:
+            with Image.open(io.BytesIO(data)) as img:
+                return img.width, img.height
+        except (OSError, EOFError):  # UnidentifiedImageError is an OSError
+            if len(data) < length:
+                raise  # Already had the whole file: it's really unreadable
+        if length >= max_bytes:
+            break
+        length = min(length * 4, max_bytes)
+    logger.debug(f"[scan] Header of '{key}' not in first {max_bytes} bytes")
+    with provider.retrieve(key) as f:
+        with Image.open(f) as img:
+            return img.width, img.height
+
+
+def _probe(
+    provider: StorageProvider, fname: str, keep_bytes: bool
+) -> tuple[int, int, Optional[bytes]]:
+    """
+    Read a file's dimensions (runs on a scan worker thread).
+    Only the header is fetched, unless keep_bytes asks for the whole original.
+    Returns:
+        (width, height, image bytes if keep_bytes else None)
+    """
+    if not keep_bytes:
+        width, height = probe_dimensions(provider, fname)
+        return width, height, None
+    with provider.retrieve(fname) as f:
+        # Keep the bytes so the renditions don't need a second download
+        image_data = f.read()
+    with Image.open(io.BytesIO(image_data)) as img:
+        return img.width, img.height, image_data
+
+
+def _parallel(
+    files: Iterable[str],
+    task: Callable[[str], T],
+    progress: ScanProgress,
+    workers: int,
+) -> Iterator[tuple[str, T]]:
+    """
+    Run task(filename) on ``workers`` threads, with at most ``2 * workers`` in
+    flight, so a remote provider is not waiting on one round-trip at a time.
+    Yields (filename, result) in completion order, on the calling thread.
+    Unreadable or corrupt files are logged, counted as skipped and not yielded.
+    """
+    workers = max(1, workers)
+    window = 2 * workers
+    files = iter(files)
+    in_flight: dict[Future, str] = {}
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="scan-probe"
+    ) as executor:
+        try:
+            while True:
+                for fname in itertools.islice(files, window - len(in_flight)):
+                    logger.debug(f"[scan] Processing file: {fname}")
+                    in_flight[executor.submit(task, fname)] = fname
+                if not in_flight:
+                    break
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    fname = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                    except (FileNotFoundError, UnidentifiedImageError, OSError) as e:
+                        logger.warning(
+                            f"[scan] Skipping unreadable/corrupt image '{fname}': {e}"
+                        )
+                        progress.increment("skipped")
+                        continue
+                    yield fname, result
+        finally:
+            # On failure, don't start tasks that are still queued
+            for future in in_flight:
+                future.cancel()
+
+
+def _probe_files(
+    provider: StorageProvider,
+    files: Iterable[str],
+    progress: ScanProgress,
+    workers: int,
+    keep_bytes: bool,
+) -> Iterator[tuple[str, int, int, Optional[bytes]]]:
+    """
+    Probe files in parallel (see _parallel()).
+    Yields (filename, width, height, bytes or None) in completion order.
+    """
+    probed = _parallel(
+        files, lambda fname: _probe(provider, fname, keep_bytes), progress, workers
+    )
+    for fname, (width, height, image_data) in probed:
+        logger.debug(f"[scan] Extracted: {fname} width={width} height={height}")
+        yield fname, width, height, image_data
+
+
+def _hash_files(
+    provider: StorageProvider,
+    entries: Iterable[StorageEntry],
+    progress: ScanProgress,
+    workers: int,
+) -> dict[str, StorageEntry]:
+    """
+    Fill in each entry's content hash, reading files in parallel only when
+    the listing did not already provide one. Unreadable files are left out.
+    """
+    hashed: dict[str, StorageEntry] = {}
+    pending: dict[str, StorageEntry] = {}
+    for entry in entries:
+        if entry.content_hash:
+            hashed[entry.key] = entry
+        else:
+            pending[entry.key] = entry
+    for key, digest in _parallel(pending, provider.content_hash, progress, workers):
+        hashed[key] = replace(pending[key], content_hash=digest)
+    return hashed
+
+
+def _uses_renditions(
+    provider: StorageProvider, pregenerator: Optional[Pregenerator]
+) -> bool:
+    """
+    True if pre-generation can start from thumbnails the provider renders
+    (Dropbox), fetched in batches, instead of downloading every original.
+    """
+    if pregenerator is None or not pregenerator.thumbnails_only:
+        return False
+    max_size = provider.max_rendition_size()
+    return (
+        max_size is not None
+        and max_size[0] >= THUMBNAIL_SIZE[0]
+        and max_size[1] >= THUMBNAIL_SIZE[1]
+    )
+
+
+def _pregenerate_from_renditions(
+    provider: StorageProvider,
+    pregenerator: Pregenerator,
+    photos: list[tuple[uuid.UUID, str, Optional[str]]],
+) -> None:
+    """
+    Queue thumbnails for (photo id, key, content hash) from provider
+    renditions fetched in batches. Files the provider can't render are left
+    to be rendered on first view.
+    """
+    try:
+        renditions = provider.get_renditions(
+            [key for _, key, _ in photos], THUMBNAIL_SIZE
+        )
+    except Exception as e:
+        logger.warning(f"[scan] Could not fetch provider renditions: {e}")
+        return
+    for photo_id, key, content_hash in photos:
+        data = renditions.get(key)
+        if data is not None:
+            pregenerator.submit(photo_id, data, content_hash)
+
+
+def _import_files(
+    provider: StorageProvider,
+    repo: PhotoRepository,
+    files: dict[str, StorageEntry],
+    progress: ScanProgress,
+    pregenerator: Optional[Pregenerator],
+    batch_size: int,
+    workers: int,
+) -> list[str]:
+    """
+    Probe new (hashed) files and insert them as Photos in batches of
+    batch_size (one INSERT and one commit per batch). Returns the imported
+    filenames.
+    """
+    imported: list[str] = []
+    pending: list[dict[str, object]] = []
+    from_renditions = _uses_renditions(provider, pregenerator)
+
+    def flush() -> None:
+        repo.bulk_create(pending, batch_size=batch_size)
+        if from_renditions and pregenerator is not None:
+            _pregenerate_from_renditions(
+                provider,
+                pregenerator,
+                [
+                    (row["id"], row["filename"], row["content_hash"])  # type: ignore[misc]
+                    for row in pending
+                ],
+            )
+        imported.extend(row["filename"] for row in pending)  # type: ignore[misc]
+        progress.increment("imported", len(pending))
+        logger.info(f"[scan] Imported {len(pending)} photos ({len(imported)} total)")
+        pending.clear()
+
+    keep_bytes = pregenerator is not None and not from_renditions
+    probed = _probe_files(provider, files, progress, workers, keep_bytes)
+    for fname, width, height, image_data in probed:
+        entry = files[fname]
+        # Add more metadata extraction here as needed
+        # The id is assigned up front so renditions can be keyed before the insert
+        photo_id = uuid.uuid4()
+        pending.append(
+            {
+                "id": photo_id,
+                "filename": fname,
+                "width": width,
+                "height": height,
+                "content_hash": entry.content_hash,
+                "size": entry.size,
+                "mtime": entry.mtime,
+            }
+        )
+        if pregenerator is not None and image_data is not None:
+            pregenerator.submit(photo_id, image_data, entry.content_hash)
+        if len(pending) >= batch_size:
+            flush()
+    if pending:
+        flush()
+    return imported
+
+
+def _refresh_files(
+    provider: StorageProvider,
+    repo: PhotoRepository,
+    modified: list[tuple[Photo, StorageEntry]],
+    progress: ScanProgress,
+    pregenerator: Optional[Pregenerator],
+    workers: int,
+) -> None:
+    """
+    Re-probe files whose content changed, update their rows and drop the
+    renditions cached under the old content hash. updated_at is always
+    bumped, even when the dimensions did not change.
+    """
+    by_name = {photo.filename: (photo, entry) for photo, entry in modified}
+    from_renditions = _uses_renditions(provider, pregenerator)
+    keep_bytes = pregenerator is not None and not from_renditions
+    refreshed: list[tuple[uuid.UUID, str, Optional[str]]] = []
+    probed = _probe_files(provider, by_name, progress, workers, keep_bytes)
+    for fname, width, height, image_data in probed:
+        photo, entry = by_name[fname]
+        invalidate_renditions(photo.id, photo.content_hash)
+        photo.width, photo.height = width, height
+        photo.content_hash = entry.content_hash
+        photo.size, photo.mtime = entry.size, entry.mtime
+        photo.updated_at = datetime.now(UTC)
+        if pregenerator is not None and image_data is not None:
+            pregenerator.submit(photo.id, image_data, entry.content_hash)
+        refreshed.append((photo.id, fname, entry.content_hash))
+        progress.increment("modified")
+    repo.db.commit()
+    if from_renditions and pregenerator is not None and refreshed:
+        _pregenerate_from_renditions(provider, pregenerator, refreshed)
+
+
+def _unchanged(photo: Photo, entry: StorageEntry) -> bool:
+    """
+    True if the listing shows a file is the one its row was built from,
+    without reading it: same size and mtime (and hash, if listed). Rows from
+    before content hashing are never unchanged, so they get backfilled.
+    """
+    if photo.content_hash is None or entry.size is None or entry.mtime is None:
+        return False
+    if entry.content_hash is not None and entry.content_hash != photo.content_hash:
+        return False
+    return (photo.size, photo.mtime) == (entry.size, entry.mtime)
+
+
+@dataclass(frozen=True)
+class _WorkItem:
+    """
+    One unit of a scan plan: a listed file to check or import, or (with
+    photo_id set) a row whose file is gone, with the filename and hash the
+    row had when the plan was made.
+    """
+
+    entry: StorageEntry
+    photo_id: Optional[uuid.UUID] = None
+    item_id: Optional[int] = None  # ScanCheckpointItem id, once checkpointed
+
+
+def _plan(
+    listed: dict[str, StorageEntry],
+    known: dict[str, Photo],
+    gone: list[Photo],
+    progress: ScanProgress,
+) -> list[_WorkItem]:
+    """
+    Work out what a scan has to do, without reading any file.
+
+    Args:
+        listed: Storage entries to reconcile (every file on a full scan, the
+            updated files on a delta).
+        known: Existing rows for keys in listed, by filename.
+        gone: Rows whose file is no longer in storage.
+
+    Known files whose size/mtime match their row need nothing and are left
+    out. Returns the other known files, then the new ones, then the gone rows.
+    """
+    new = [key for key in listed if key not in known]
+    progress.increment("files_seen", len(listed))
+    progress.increment("files_found", len(new))
+    items = [
+        _WorkItem(listed[key])
+        for key, photo in known.items()
+        if not _unchanged(photo, listed[key])
+    ]
+    items.extend(_WorkItem(listed[key]) for key in new)
+    items.extend(
+        _WorkItem(
+            StorageEntry(key=photo.filename, content_hash=photo.content_hash),
+            photo_id=photo.id,
+        )
+        for photo in gone
+    )
+    return items
+
+
+def _plan_all(
+    repo: PhotoRepository,
+    listed: dict[str, StorageEntry],
+    progress: ScanProgress,
+    extensions: Optional[Collection[str]],
+) -> list[_WorkItem]:
+    """Full scan: plan every row against a complete storage listing."""
+    photos = repo.list()
+    known = {photo.filename: photo for photo in photos if photo.filename in listed}
+    # Rows for files the extension filter hides are out of scope, not gone
+    gone = [
+        photo
+        for photo in photos
+        if photo.filename not in listed
+        and matches_extensions(photo.filename, extensions)
+    ]
+    if gone and not listed:
+        # An unmounted share lists as empty; don't take every row with it
+        logger.warning(
+            f"[scan] Storage listed no files; keeping {len(gone)} existing photos"
+        )
+        gone = []
+    return _plan(listed, known, gone, progress)
+
+
+def _plan_changes(
+    repo: PhotoRepository,
+    changes: StorageChanges,
+    progress: ScanProgress,
+    extensions: Optional[Collection[str]],
+) -> list[_WorkItem]:
+    """Plan a provider change set: deletions, moves, modifications, imports."""
+    listed = {
+        key: changes.entries.get(key) or StorageEntry(key=key)
+        for key in changes.updated
+        if matches_extensions(key, extensions)
+    }
+    known = {photo.filename: photo for photo in repo.list_by_filenames(listed)}
+    gone = [
+        photo
+        for photo in repo.list_under(changes.deleted)
+        if photo.filename not in listed
+    ]
+    return _plan(listed, known, gone, progress)
+
+
+def _reconcile_batch(
+    provider: StorageProvider,
+    repo: PhotoRepository,
+    batch: list[_WorkItem],
+    gone_by_hash: dict[str, list[_WorkItem]],
+    progress: ScanProgress,
+    pregenerator: Optional[Pregenerator],
+    workers: int,
+) -> tuple[list[str], list[_WorkItem]]:
+    """
+    Apply one batch of listed files, committing the result.
+
+    Rows are looked up afresh, so a file imported or refreshed before a
+    resumed plan was interrupted is found up to date and not read again. The
+    rest are hashed: an unchanged hash only refreshes size/mtime, a new one
+    re-probes the file and invalidates its renditions. A new file whose hash
+    matches a gone row is a move: the row is renamed, keeping its id,
+    description and cached renditions. Other new files are imported.
+    Returns:
+        (imported filenames, gone items consumed by moves)
+    """
+    rows = {
+        photo.filename: photo
+        for photo in repo.list_by_filenames(item.entry.key for item in batch)
+    }
+    pending = [
+        item.entry
+        for item in batch
+        if item.entry.key not in rows
+        or not _unchanged(rows[item.entry.key], item.entry)
+    ]
+    hashed = _hash_files(provider, pending, progress, workers)
+
+    modified: list[tuple[Photo, StorageEntry]] = []
+    moved: list[_WorkItem] = []
+    to_import: dict[str, StorageEntry] = {}
+    for key, entry in hashed.items():
+        photo = rows.get(key)
+        if photo is not None:
+            if entry.content_hash == photo.content_hash:
+                photo.size, photo.mtime = entry.size, entry.mtime
+            else:
+                modified.append((photo, entry))
+            continue
+        candidates = gone_by_hash.get(entry.content_hash or "", [])
+        while candidates:
+            gone_item = candidates.pop()
+            photo = repo.get(gone_item.photo_id)  # type: ignore[arg-type]
+            # A resumed plan may name a row that was deleted or moved since
+            if photo is None or photo.filename != gone_item.entry.key:
+                continue
+            logger.info(f"[scan] Moved: {photo.filename} -> {key}")
+            photo.filename = key
+            photo.size, photo.mtime = entry.size, entry.mtime
+            moved.append(gone_item)
+            progress.increment("moved")
+            break
+        else:
+            to_import[key] = entry
+    repo.db.commit()
+
+    _refresh_files(provider, repo, modified, progress, pregenerator, workers)
+    imported = _import_files(
+        provider, repo, to_import, progress, pregenerator, len(batch), workers
+    )
+    return imported, moved
+
+
+def _reconcile(
+    provider: StorageProvider,
+    repo: PhotoRepository,
+    items: list[_WorkItem],
+    progress: ScanProgress,
+    pregenerator: Optional[Pregenerator],
+    batch_size: int,
+    workers: int,
+    on_batch: Optional[Callable[[list[_WorkItem]], None]] = None,
+    stop: Optional[threading.Event] = None,
+) -> list[str]:
+    """
+    Bring Photo rows in line with storage by applying a plan (see _plan()).
+
+    Files are applied in batches of batch_size, each committed before the
+    next is read (see _reconcile_batch()), and on_batch is called with the
+    items each batch completed. Gone rows not claimed by a move are deleted
+    last, since any new file could still turn out to be one of them.
+    Raises:
+        ScanInterrupted: If stop is set; checked after each batch.
+    Returns:
+        The filenames that were imported.
+    """
+    batch_size = max(1, batch_size)
+    files: list[_WorkItem] = []
+    gone: dict[uuid.UUID, _WorkItem] = {}
+    for item in items:
+        if item.photo_id is None:
+            files.append(item)
+        else:
+            gone[item.photo_id] = item
+    gone_by_hash: dict[str, list[_WorkItem]] = {}
+    for item in gone.values():
+        if item.entry.content_hash:
+            gone_by_hash.setdefault(item.entry.content_hash, []).append(item)
+
+    imported: list[str] = []
+    for start in range(0, len(files), batch_size):
+        batch = files[start : start + batch_size]
+        batch_imported, moved = _reconcile_batch(
+            provider, repo, batch, gone_by_hash, progress, pregenerator, workers
+        )
+        imported.extend(batch_imported)
+        for item in moved:
+            if item.photo_id is not None:
+                del gone[item.photo_id]
+        if on_batch is not None:
+            on_batch(batch + moved)
+        if stop is not None and stop.is_set():
+            raise ScanInterrupted("the next scan resumes from the checkpoint")
+
+    # Only rows still at their planned filename (a resumed plan may name rows
+    # that were moved before the interruption)
+    deleted = [
+        photo
+        for photo in repo.list_by_ids(gone)
+        if photo.filename == gone[photo.id].entry.key
+    ]
+    repo.delete_by_ids([photo.id for photo in deleted])
+    for photo in deleted:
+        invalidate_renditions(photo.id, photo.content_hash)
+    progress.increment("deleted", len(deleted))
+    if on_batch is not None and gone:
+        on_batch(list(gone.values()))
+    return imported
+
+
+def checkpoint_scope(provider: StorageProvider) -> str:
+    """Key of the scan checkpoint for provider (see ScanCheckpoint)."""
+    return provider.cursor_scope() or type(provider).__name__
+
+
+def run_scan(
+    provider: StorageProvider,
+    db: Session,
+    progress: ScanProgress,
+    pregenerator: Optional[Pregenerator] = None,
+    batch_size: int = 500,
+    workers: int = 8,
+    full: bool = False,
+    extensions: Optional[Collection[str]] = None,
+    job_id: Optional[uuid.UUID] = None,
+    stop: Optional[threading.Event] = None,
+) -> list[str]:
+    """
+    Bring the Photo table up to date with storage: import new files, update
+    modified ones, follow moves and remove rows for deleted files (see
+    _reconcile()).
+
+    Providers that support incremental listing (cursor_scope() is not None)
+    get a delta scan: only files added, modified or deleted since the cursor
+    saved by the previous scan are applied, so a routine rescan costs
+    O(changes). Otherwise, or with full=True, or when there is no usable
+    cursor, the whole listing is reconciled. The new cursor is saved only
+    after the scan's changes are committed.
+
+    The scan's plan (the files to check or import and the rows to delete,
+    plus that cursor) is checkpointed before any file is read, and each
+    committed batch is ticked off. If the process dies mid-scan, the next
+    scan resumes the remaining plan without listing storage again and
+    records the interrupted job_id in progress.resumed_from; full=True
+    discards the checkpoint and starts over. Setting ``stop`` ends the scan
+    the same way, but cleanly: after the batch in hand is committed,
+    ScanInterrupted is raised.
+
+    Files are read in parallel by ``workers`` threads; results are written
+    by the calling thread only (the Session is not shared). If
+    ``extensions`` is given, only keys with one of those suffixes are
+    considered.
+    Returns:
+        The filenames that were imported.
+    """
+    with _WRITE_LOCK:
+        return _run_scan(
+            provider,
+            db,
+            progress,
+            pregenerator,
+            batch_size,
+            workers,
+            full,
+            extensions,
+            job_id,
+            stop,
+        )
+
+
+def apply_changes(
+    provider: StorageProvider,
+    db: Session,
+    changes: StorageChanges,
+    progress: ScanProgress,
+    pregenerator: Optional[Pregenerator] = None,
+    batch_size: int = 500,
+    workers: int = 8,
+    extensions: Optional[Collection[str]] = None,
+) -> list[str]:
+    """
+    Apply a known set of storage changes (e.g. from a filesystem watcher)
+    without listing storage: delete removed files' rows, follow moves,
+    update modified files and import new ones.
+    Returns:
+        The filenames that were imported.
+    """
+    with _WRITE_LOCK:
+        repo = PhotoRepository(db)
+        items = _plan_changes(repo, changes, progress, extensions)
+        return _reconcile(
+            provider, repo, items, progress, pregenerator, batch_size, workers
+        )
+
+
+def _list_plan(
+    provider: StorageProvider,
+    db: Session,
+    progress: ScanProgress,
+    full: bool,
+    extensions: Optional[Collection[str]],
+) -> tuple[list[_WorkItem], Optional[str]]:
+    """List storage and plan the scan. Returns (plan, cursor to save after it)."""
+    repo = PhotoRepository(db)
+    scope = provider.cursor_scope()
+    if scope is None:
+        listed = {
+            entry.key: entry for entry in provider.list_entries(extensions=extensions)
+        }
+        return _plan_all(repo, listed, progress, extensions), None
+
+    cursor = None if full else StorageCursorRepository(db).get(scope)
+    if cursor is not None:
+        try:
+            changes = provider.list_changes(cursor)
+        except StorageCursorReset as e:
+            logger.warning(f"[scan] {e}; falling back to a full scan")
+        else:
+            logger.info(
+                f"[scan] Delta scan: {len(changes.updated)} updated, "
+                f"{len(changes.deleted)} deleted"
+            )
+            return _plan_changes(repo, changes, progress, extensions), changes.cursor
+
+    entries, cursor = provider.list_with_cursor()
+    listed = {
+        entry.key: entry
+        for entry in entries
+        if matches_extensions(entry.key, extensions)
+    }
+    return _plan_all(repo, listed, progress, extensions), cursor
+
+
+def _run_scan(
+    provider: StorageProvider,
+    db: Session,
+    progress: ScanProgress,
+    pregenerator: Optional[Pregenerator],
+    batch_size: int,
+    workers: int,
+    full: bool,
+    extensions: Optional[Collection[str]],
+    job_id: Optional[uuid.UUID],
+    stop: Optional[threading.Event],
+) -> list[str]:
+    scope = checkpoint_scope(provider)
+    checkpoints = ScanCheckpointRepository(db)
+    # A full scan starts over; create() replaces any old checkpoint
+    checkpoint = None if full else checkpoints.get(scope)
+    resumed = checkpoint is not None
+    if checkpoint is not None:
+        progress.resume(checkpoint.job_id)
+        logger.info(
+            f"[scan] Resuming scan {checkpoint.job_id}: "
+            f"{checkpoint.processed} of {checkpoint.planned} items done"
+        )
+    else:
+        items, cursor = _list_plan(provider, db, progress, full, extensions)
+        checkpoint = checkpoints.create(
+            scope,
+            job_id,
+            cursor,
+            (
+                {
+                    "kind": "file" if item.photo_id is None else "gone",
+                    "key": item.entry.key,
+                    "size": item.entry.size,
+                    "mtime": item.entry.mtime,
+                    "content_hash": item.entry.content_hash,
+                    "photo_id": item.photo_id,
+                }
+                for item in items
+            ),
+        )
+    cursor = checkpoint.cursor
+    items = [
+        _WorkItem(
+            StorageEntry(
+                key=row.key,
+                size=row.size,
+                mtime=row.mtime,
+                content_hash=row.content_hash,
+            ),
+            photo_id=row.photo_id,
+            item_id=row.id,
+        )
+        for row in checkpoints.remaining(scope)
+    ]
+    if resumed:
+        progress.increment(
+            "files_seen", sum(1 for item in items if item.photo_id is None)
+        )
+
+    imported = _reconcile(
+        provider,
+        PhotoRepository(db),
+        items,
+        progress,
+        pregenerator,
+        batch_size,
+        workers,
+        on_batch=lambda done: checkpoints.advance(
+            scope, [item.item_id for item in done if item.item_id is not None]
+        ),
+        stop=stop,
+    )
+    cursor_scope = provider.cursor_scope()
+    if cursor_scope is not None and cursor is not None:
+        StorageCursorRepository(db).save(cursor_scope, cursor)
+    checkpoints.delete(scope)
+    return imported
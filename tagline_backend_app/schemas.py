@@ -1,9 +1,12 @@
 """
 schemas.py
 
-Pydantic models for authentication endpoints (login, tokens).
+Pydantic models for authentication endpoints (login, tokens), photos and
+scan jobs.
 """
 
+from datetime import datetime
+
 from pydantic import BaseModel, Field
 
 
@@ -69,12 +72,22 @@ class Photo(BaseModel):
 
 
 class PhotoListResponse(BaseModel):
-    """Paginated list of photos (spec-compliant)."""
+    """
+    Paginated list of photos (spec-compliant).
+    Supports offset pagination (offset/total) and cursor pagination (next_cursor).
+    In cursor mode total is None, since counting every row would defeat the point.
+    """
 
-    total: int
+    total: int | None
     limit: int
     offset: int
     items: list[Photo]
+    next_cursor: str | None = Field(
+        default=None,
+        description=(
+            "Opaque cursor for the next page; None when there are no more photos"
+        ),
+    )
 
 
 class UpdateMetadataRequest(BaseModel):
@@ -88,3 +101,26 @@ class UpdateMetadataRequest(BaseModel):
         ...,
         description="Dictionary of metadata fields (must include non-empty description; may include last_modified as RFC3339/ISO8601 string)",
     )
+
+
+class ScanJobResponse(BaseModel):
+    """State of one scan, as returned by GET /scan/{job_id} and GET /scan/latest."""
+
+    id: str = Field(..., description="Scan job ID (UUID)")
+    status: str = Field(..., description="'running', 'succeeded' or 'failed'")
+    full: bool = Field(..., description="Whether a full listing was requested")
+    started_at: datetime
+    finished_at: datetime | None = None
+    files_seen: int = Field(..., description="Storage files reconciled so far")
+    imported: int
+    skipped: int
+    modified: int
+    moved: int
+    deleted: int
+    files_per_second: float = Field(
+        ..., description="files_seen divided by the time the scan has run so far"
+    )
+    error: str | None = None
+    resumed_from: str | None = Field(
+        None, description="ID of the interrupted scan this one resumed, if any"
+    )
@@ -0,0 +1,130 @@
+"""
+Read-through local disk cache for originals held by a remote provider.
+"""
+
+import logging
+from io import BytesIO
+from pathlib import Path
+from typing import BinaryIO, Collection, Iterable, List, Optional, Tuple
+
+from tagline_backend_app.disk_cache import DiskCache
+from tagline_backend_app.singleflight import SingleFlight
+from tagline_backend_app.storage.provider import (
+    StorageChanges,
+    StorageEntry,
+    StorageProvider,
+    content_hash_stream,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class CachedStorageProvider(StorageProvider):
+    """
+    Wraps a provider (Dropbox) and keeps downloaded originals in a
+    size-bounded, LRU-evicted DiskCache, so renditions that fall out of the
+    derivative caches are rebuilt from a local file instead of a download.
+
+    Only retrieve_version() goes through the cache: entries are keyed by
+    storage key and content hash, so an edited file is a miss rather than a
+    stale hit. A download is checked against the expected hash before it is
+    cached, and concurrent misses for the same original share one download.
+    Everything else, including plain retrieve(), goes straight to the
+    wrapped provider.
+    """
+
+    def __init__(self, inner: StorageProvider, cache: DiskCache):
+        self.inner = inner
+        self._cache = cache
+        self._flights = SingleFlight()
+
+    @staticmethod
+    def _cache_key(key: str, content_hash: str) -> str:
+        return f"original:{content_hash}:{key}"
+
+    def retrieve_version(self, key: str, content_hash: Optional[str]) -> BinaryIO:
+        """
+        Return the cached original if there is one for this content hash
+        (an open local file), else download, validate and cache it.
+        Raises FileNotFoundError as the wrapped provider does.
+        """
+        if not content_hash:
+            return self.inner.retrieve(key)  # Legacy row: nothing to validate by
+        cache_key = self._cache_key(key, content_hash)
+        cached = self._cache.open(cache_key)
+        if cached is not None:
+            return cached
+        data = self._flights.do(cache_key, lambda: self._fetch(key, content_hash))
+        return BytesIO(data)
+
+    def _fetch(self, key: str, content_hash: str) -> bytes:
+        with self.inner.retrieve(key) as f:
+            data = f.read()
+        actual = content_hash_stream(BytesIO(data))
+        if actual != content_hash:
+            # Changed since the last scan: serve it, but don't cache it under
+            # a hash it doesn't have
+            logger.debug(f"Original '{key}' changed since it was scanned; not cached")
+            return data
+        try:
+            self._cache.put(self._cache_key(key, content_hash), data)
+        except Exception as e:
+            logger.warning(f"Could not cache original '{key}': {e}")
+        return data
+
+    def stats(self) -> dict:
+        """Cache size and counters, plus downloads coalesced by concurrent misses."""
+        return {**self._cache.stats(), "coalesced": self._flights.coalesced}
+
+    # Everything else is delegated to the wrapped provider
+
+    def list(self, prefix: Optional[str] = None) -> Iterable[str]:
+        return self.inner.list(prefix)
+
+    def list_entries(
+        self,
+        prefix: Optional[str] = None,
+        extensions: Optional[Collection[str]] = None,
+    ) -> Iterable[StorageEntry]:
+        return self.inner.list_entries(prefix, extensions)
+
+    def retrieve(self, key: str) -> BinaryIO:
+        return self.inner.retrieve(key)
+
+    def read_prefix(self, key: str, length: int) -> bytes:
+        return self.inner.read_prefix(key, length)
+
+    def content_hash(self, key: str) -> str:
+        return self.inner.content_hash(key)
+
+    def max_rendition_size(self) -> Optional[Tuple[int, int]]:
+        return self.inner.max_rendition_size()
+
+    def get_rendition(self, key: str, min_size: Tuple[int, int]) -> Optional[bytes]:
+        return self.inner.get_rendition(key, min_size)
+
+    def get_renditions(
+        self, keys: Iterable[str], min_size: Tuple[int, int]
+    ) -> dict[str, bytes]:
+        return self.inner.get_renditions(keys, min_size)
+
+    def cursor_scope(self) -> Optional[str]:
+        return self.inner.cursor_scope()
+
+    def list_with_cursor(self) -> Tuple[List[StorageEntry], str]:
+        return self.inner.list_with_cursor()
+
+    def list_changes(self, cursor: str) -> StorageChanges:
+        return self.inner.list_changes(cursor)
+
+    def check_health(self) -> None:
+        self.inner.check_health()
+
+    def close(self) -> None:
+        self.inner.close()
+
+    def get_url(self, key: str, content_hash: Optional[str] = None) -> Optional[str]:
+        return self.inner.get_url(key, content_hash)
+
+    def local_path(self, key: str) -> Optional[Path]:
+        return self.inner.local_path(key)
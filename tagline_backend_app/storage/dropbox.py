@@ -3,18 +3,61 @@ Dropbox implementation of StorageProvider (stub).
 All methods raise NotImplementedError. This is a placeholder for future Dropbox integration.
 """
 
+import base64
+import logging
+import threading
+from datetime import timezone
 from io import BytesIO
-from typing import Optional
+from typing import Any, Collection, Iterable, List, Optional, Tuple, cast
 
 import dropbox
-from dropbox.exceptions import ApiError
-from dropbox.files import FileMetadata
+from cachetools import TTLCache
+from dropbox.exceptions import ApiError, HttpError
+from dropbox.files import (
+    DeletedMetadata,
+    FileMetadata,
+    GetTemporaryLinkResult,
+    GetThumbnailBatchResult,
+    ListFolderContinueError,
+    ListFolderResult,
+    PathOrLink,
+    PreviewResult,
+    ThumbnailArg,
+    ThumbnailFormat,
+    ThumbnailMode,
+    ThumbnailSize,
+)
 
 from tagline_backend_app.storage.provider import (
+    StorageChanges,
+    StorageCursorReset,
+    StorageEntry,
     StorageProvider,
     StorageProviderMisconfigured,
+    matches_extensions,
 )
 
+logger = logging.getLogger(__name__)
+
+# Dropbox thumbnail sizes, smallest first
+_THUMBNAIL_SIZES = [
+    ((32, 32), ThumbnailSize.w32h32),
+    ((64, 64), ThumbnailSize.w64h64),
+    ((128, 128), ThumbnailSize.w128h128),
+    ((256, 256), ThumbnailSize.w256h256),
+    ((480, 320), ThumbnailSize.w480h320),
+    ((640, 480), ThumbnailSize.w640h480),
+    ((960, 640), ThumbnailSize.w960h640),
+    ((1024, 768), ThumbnailSize.w1024h768),
+    ((2048, 1536), ThumbnailSize.w2048h1536),
+]
+# files_get_thumbnail_batch accepts at most this many files per call
+THUMBNAIL_BATCH_SIZE = 25
+# Temporary links expire after four hours; reuse them until 15 minutes before
+# that, so a client following one always has time to start the download
+TEMPORARY_LINK_TTL = 4 * 3600 - 15 * 60
+TEMPORARY_LINK_CACHE_SIZE = 10_000
+
 
 class DropboxStorageProvider(StorageProvider):
     """
@@ -31,6 +74,7 @@ class DropboxStorageProvider(StorageProvider):
         app_secret: Optional[str] = None,
         access_token: Optional[str] = None,
         root_path: Optional[str] = None,
+        max_connections: int = 16,
     ):
         """
         Initialize DropboxStorageProvider.
@@ -40,16 +84,26 @@ class DropboxStorageProvider(StorageProvider):
             app_secret: Dropbox app secret (required for refresh token auth).
             access_token: [DEPRECATED] Long-lived Dropbox access token (legacy/testing only).
             root_path: Root path in Dropbox (all keys are relative to this path).
+            max_connections: Size of the HTTP connection pool shared by this
+                client and its clones (see read_prefix()).
         Raises:
             StorageProviderMisconfigured: If required credentials are missing or invalid.
         """
         self.root_path = root_path or "/"
+        self._links: TTLCache = TTLCache(
+            maxsize=TEMPORARY_LINK_CACHE_SIZE, ttl=TEMPORARY_LINK_TTL
+        )
+        self._links_lock = threading.Lock()
+        # Keep-alive connections reused across calls (the SDK's default
+        # session is not shared between clients)
+        session = dropbox.create_session(max_connections=max_connections)
         if refresh_token and app_key and app_secret:
             try:
                 self.dbx = dropbox.Dropbox(
                     oauth2_refresh_token=refresh_token,
                     app_key=app_key,
                     app_secret=app_secret,
+                    session=session,
                 )
             except Exception as e:
                 raise StorageProviderMisconfigured(
@@ -58,7 +112,7 @@ class DropboxStorageProvider(StorageProvider):
         elif access_token:
             # Legacy/DEPRECATED path
             try:
-                self.dbx = dropbox.Dropbox(access_token)
+                self.dbx = dropbox.Dropbox(access_token, session=session)
             except Exception as e:
                 raise StorageProviderMisconfigured(
                     f"Dropbox access token auth failed: {e}"
@@ -68,6 +122,18 @@ class DropboxStorageProvider(StorageProvider):
                 "Missing Dropbox credentials: must provide refresh_token, app_key, and app_secret (recommended), or access_token (legacy/testing)."
             )
 
+    def check_health(self) -> None:
+        """
+        Refresh the access token if needed and list one entry of the root,
+        so bad credentials or a missing root path raise.
+        """
+        self.dbx.check_and_refresh_access_token()
+        self.dbx.files_list_folder(self.root_path, limit=1)
+
+    def close(self) -> None:
+        """Close the client's pooled HTTP connections."""
+        self.dbx.close()
+
     def _full_path(self, key: str) -> str:
         # Compose a Dropbox path under root_path, normalizing slashes
         if key.startswith("/"):
@@ -75,6 +141,9 @@ class DropboxStorageProvider(StorageProvider):
         root = self.root_path.rstrip("/")
         return f"{root}/{key}" if root else f"/{key}"
 
+    def _relative_key(self, path_display: str) -> str:
+        return path_display[len(self.root_path) :].lstrip("/")
+
     def _process_entries(
         self, entries: list, prefix: Optional[str] = None
     ) -> list[str]:
@@ -82,32 +151,263 @@ class DropboxStorageProvider(StorageProvider):
         result: list[str] = []
         for entry in entries:
             if isinstance(entry, FileMetadata):
-                rel_path = entry.path_display[len(self.root_path) :].lstrip("/")
+                rel_path = self._relative_key(entry.path_display)
                 if not prefix or rel_path.startswith(prefix):
                     result.append(rel_path)
         return result
 
+    def _list_folder(self) -> Tuple[List, Optional[str]]:
+        """Recursively list the root path. Returns (entries, final cursor)."""
+        path = self.root_path
+        res = self.dbx.files_list_folder(path, recursive=True)
+        entries = list(getattr(res, "entries", []))
+        # Handle Dropbox pagination: fetch all pages using files_list_folder_continue
+        while getattr(res, "has_more", False):
+            cursor = getattr(res, "cursor", None)
+            if not cursor:
+                break  # Defensive: can't continue without a cursor
+            res = self.dbx.files_list_folder_continue(cursor)
+            entries.extend(getattr(res, "entries", []))
+        return entries, getattr(res, "cursor", None)
+
     def list(self, prefix: Optional[str] = None) -> list[str]:
         """
         List all file keys under the root path, optionally filtered by prefix.
         Returns:
             List of keys (relative to root_path).
         """
-        path = self.root_path
         try:
-            res = self.dbx.files_list_folder(path, recursive=True)
-            entries = list(getattr(res, "entries", []))
-            # Handle Dropbox pagination: fetch all pages using files_list_folder_continue
-            while getattr(res, "has_more", False):
-                cursor = getattr(res, "cursor", None)
-                if not cursor:
-                    break  # Defensive: can't continue without a cursor
-                res = self.dbx.files_list_folder_continue(cursor)
-                entries.extend(getattr(res, "entries", []))
+            entries, _ = self._list_folder()
             return self._process_entries(entries, prefix)
         except ApiError as e:
             raise FileNotFoundError(f"Dropbox listing failed: {e}")
 
+    def list_entries(
+        self,
+        prefix: Optional[str] = None,
+        extensions: Optional[Collection[str]] = None,
+    ) -> List[StorageEntry]:
+        """
+        List files under the root path with size and server modification time
+        (both come with the listing, so this costs no extra API calls).
+        """
+        try:
+            entries, _ = self._list_folder()
+        except ApiError as e:
+            raise FileNotFoundError(f"Dropbox listing failed: {e}")
+        result: List[StorageEntry] = []
+        for entry in entries:
+            if not isinstance(entry, FileMetadata):
+                continue
+            key = self._relative_key(entry.path_display)
+            if prefix and not key.startswith(prefix):
+                continue
+            if matches_extensions(key, extensions):
+                result.append(self._entry(entry))
+        return result
+
+    def _entry(self, metadata: FileMetadata) -> StorageEntry:
+        """StorageEntry for a listed file, including Dropbox's content hash."""
+        modified = metadata.server_modified.replace(tzinfo=timezone.utc)
+        return StorageEntry(
+            key=self._relative_key(metadata.path_display),
+            size=metadata.size,
+            mtime=modified.timestamp(),
+            content_hash=metadata.content_hash,
+        )
+
+    def content_hash(self, key: str) -> str:
+        """
+        Return the content hash Dropbox stores for a file (one metadata call,
+        no download). Raises FileNotFoundError if not found.
+        """
+        try:
+            metadata = self.dbx.files_get_metadata(self._full_path(key))
+        except ApiError as e:
+            raise FileNotFoundError(f"Dropbox file not found: {key} ({e})")
+        if not isinstance(metadata, FileMetadata) or not metadata.content_hash:
+            raise FileNotFoundError(f"Dropbox item is not a file: {key}")
+        return metadata.content_hash
+
+    def max_rendition_size(self) -> Optional[Tuple[int, int]]:
+        _, shorter = _THUMBNAIL_SIZES[-1][0]
+        return shorter, shorter
+
+    @staticmethod
+    def _thumbnail_size(min_size: Tuple[int, int]) -> Optional[ThumbnailSize]:
+        """
+        Smallest Dropbox thumbnail size covering min_size, or None if too large.
+        'fitone_bestfit' fits either the size or its transpose (portrait photos
+        come back as e.g. 480x640 for w640h480), so the shorter edge of the
+        size must cover the longer edge of min_size.
+        """
+        for (_, shorter), size in _THUMBNAIL_SIZES:
+            if shorter >= max(min_size):
+                return size
+        return None
+
+    def get_rendition(self, key: str, min_size: Tuple[int, int]) -> Optional[bytes]:
+        """
+        Return a Dropbox-rendered JPEG thumbnail covering min_size in either
+        orientation (files_get_thumbnail_v2, 'fitone_bestfit' so it can be
+        center-cropped; Dropbox applies the EXIF orientation), or None if
+        Dropbox can't thumbnail the file (unsupported type, too large) or
+        min_size is beyond the largest thumbnail size.
+        """
+        size = self._thumbnail_size(min_size)
+        if size is None:
+            return None
+        try:
+            # Download-style route: (PreviewResult, requests.Response)
+            result = cast(
+                Optional[Tuple[PreviewResult, Any]],
+                self.dbx.files_get_thumbnail_v2(
+                    PathOrLink.path(self._full_path(key)),
+                    format=ThumbnailFormat.jpeg,
+                    size=size,
+                    mode=ThumbnailMode.fitone_bestfit,
+                ),
+            )
+        except ApiError as e:
+            logger.debug(f"No Dropbox thumbnail for {key}: {e}")
+            return None
+        if result is None:
+            return None
+        _, res = result
+        try:
+            return res.content
+        finally:
+            res.close()
+
+    def get_renditions(
+        self, keys: Iterable[str], min_size: Tuple[int, int]
+    ) -> dict[str, bytes]:
+        """
+        Batch form of get_rendition(), using files_get_thumbnail_batch for up
+        to THUMBNAIL_BATCH_SIZE files per call. Files Dropbox can't thumbnail
+        are left out.
+        """
+        size = self._thumbnail_size(min_size)
+        if size is None:
+            return {}
+        keys = list(keys)
+        renditions: dict[str, bytes] = {}
+        for i in range(0, len(keys), THUMBNAIL_BATCH_SIZE):
+            chunk = keys[i : i + THUMBNAIL_BATCH_SIZE]
+            args = [
+                ThumbnailArg(
+                    path=self._full_path(key),
+                    format=ThumbnailFormat.jpeg,
+                    size=size,
+                    mode=ThumbnailMode.fitone_bestfit,
+                )
+                for key in chunk
+            ]
+            try:
+                result = cast(
+                    Optional[GetThumbnailBatchResult],
+                    self.dbx.files_get_thumbnail_batch(args),
+                )
+            except ApiError as e:
+                logger.warning(f"Dropbox thumbnail batch failed: {e}")
+                continue
+            if result is None:
+                continue
+            for key, entry in zip(chunk, result.entries):
+                if entry.is_success():
+                    renditions[key] = base64.b64decode(entry.get_success().thumbnail)
+        return renditions
+
+    def get_url(self, key: str, content_hash: Optional[str] = None) -> Optional[str]:
+        """
+        Return a temporary direct-download link for a file
+        (files_get_temporary_link), so clients fetch originals from Dropbox
+        rather than through us. Links are cached per (key, content_hash)
+        until shortly before they expire, so a replaced file gets a new link
+        once its new hash is known. Raises FileNotFoundError if not found.
+        """
+        cache_key = (key, content_hash)
+        with self._links_lock:
+            link = self._links.get(cache_key)
+        if link is not None:
+            return link
+        try:
+            result = cast(
+                Optional[GetTemporaryLinkResult],
+                self.dbx.files_get_temporary_link(self._full_path(key)),
+            )
+        except ApiError as e:
+            raise FileNotFoundError(f"Dropbox file not found: {key} ({e})")
+        if result is None:
+            raise FileNotFoundError(f"Dropbox returned no link for {key}")
+        link = result.link
+        with self._links_lock:
+            self._links[cache_key] = link
+        return link
+
+    def cursor_scope(self) -> Optional[str]:
+        return f"dropbox:{self.root_path}"
+
+    def list_with_cursor(self) -> Tuple[List[StorageEntry], str]:
+        """
+        List all files under the root path (as for list_entries()), plus the
+        cursor at the end of the listing (pass it to list_changes() on the
+        next scan).
+        """
+        try:
+            entries, cursor = self._list_folder()
+        except ApiError as e:
+            raise FileNotFoundError(f"Dropbox listing failed: {e}")
+        if not cursor:
+            raise FileNotFoundError("Dropbox listing returned no cursor")
+        files = [self._entry(e) for e in entries if isinstance(e, FileMetadata)]
+        return files, cursor
+
+    def list_changes(self, cursor: str) -> StorageChanges:
+        """
+        Return the files added, modified or deleted since cursor, using
+        files_list_folder_continue. Entries are applied in order, so a file
+        deleted and re-added within the window is reported as updated.
+        Raises:
+            StorageCursorReset: If Dropbox reset the cursor (a full listing is needed).
+            FileNotFoundError: If the listing fails otherwise.
+        """
+        updated: dict[str, StorageEntry] = {}
+        deleted: dict[str, None] = {}
+        try:
+            while True:
+                # The SDK's routes are untyped; this one returns a ListFolderResult
+                res = cast(
+                    Optional[ListFolderResult],
+                    self.dbx.files_list_folder_continue(cursor),
+                )
+                if res is None:
+                    raise FileNotFoundError("Dropbox listing returned no result")
+                for entry in res.entries:
+                    if isinstance(entry, FileMetadata):
+                        file = self._entry(entry)
+                        deleted.pop(file.key, None)
+                        updated[file.key] = file
+                    elif isinstance(entry, DeletedMetadata):
+                        key = self._relative_key(entry.path_display)
+                        # May be a folder: drop earlier updates underneath it too
+                        for k in [
+                            k for k in updated if k == key or k.startswith(key + "/")
+                        ]:
+                            del updated[k]
+                        deleted[key] = None
+                cursor = res.cursor
+                if not res.has_more:
+                    break
+        except ApiError as e:
+            error = getattr(e, "error", None)
+            if isinstance(error, ListFolderContinueError) and error.is_reset():
+                raise StorageCursorReset(f"Dropbox listing cursor was reset: {e}")
+            raise FileNotFoundError(f"Dropbox listing failed: {e}")
+        return StorageChanges(
+            updated=list(updated), deleted=list(deleted), cursor=cursor, entries=updated
+        )
+
     def retrieve(self, key: str) -> BytesIO:
         """
         Retrieve a file by key (relative to root_path).
@@ -123,3 +423,28 @@ class DropboxStorageProvider(StorageProvider):
             # fmt: on
         except ApiError as e:
             raise FileNotFoundError(f"Dropbox file not found: {key} ({e})")
+
+    def read_prefix(self, key: str, length: int) -> bytes:
+        """
+        Download only the first `length` bytes of a file using an HTTP Range request.
+        Raises FileNotFoundError if not found or outside root.
+        """
+        path = self._full_path(key)
+        # Refresh here so the clone below inherits a valid access token instead
+        # of refreshing on its own for every call
+        self.dbx.check_and_refresh_access_token()
+        ranged = self.dbx.clone(headers={"Range": f"bytes=0-{length - 1}"})
+        try:
+            md, res = ranged.files_download(path)  # type: ignore
+        except ApiError as e:
+            raise FileNotFoundError(f"Dropbox file not found: {key} ({e})")
+        except HttpError as e:
+            if e.status_code == 416:  # Range not satisfiable: empty file
+                return b""
+            raise
+        try:
+            # Servers may ignore Range and send the whole body; stop reading early
+            data = res.raw.read(length, decode_content=True)  # type: ignore
+        finally:
+            res.close()  # type: ignore
+        return data
@@ -4,12 +4,16 @@ All file operations are sandboxed to a configured root directory.
 This provider is read-only: upload and delete are not supported.
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import BinaryIO, Iterable, Optional
+from typing import BinaryIO, Collection, Iterable, Iterator, List, Optional, Tuple
 
 from tagline_backend_app.storage.provider import (
+    StorageEntry,
     StorageProvider,
     StorageProviderMisconfigured,
+    matches_extensions,
 )
 
 
@@ -39,6 +43,18 @@ class FilesystemStorageProvider(StorageProvider):
             )
         self._root = root
 
+    @property
+    def root(self) -> Path:
+        """The resolved storage root directory."""
+        return self._root
+
+    def check_health(self) -> None:
+        """Raise StorageProviderMisconfigured if the root is no longer a directory."""
+        if not self._root.is_dir():
+            raise StorageProviderMisconfigured(
+                f"Photo storage root does not exist or is not a directory: {self._root}"
+            )
+
     def list(self, prefix: Optional[str] = None) -> Iterable[str]:
         """
         List all item keys (relative paths) in the root directory, optionally filtered by prefix.
@@ -47,11 +63,97 @@ class FilesystemStorageProvider(StorageProvider):
         Returns:
             Iterable of keys (relative paths from root).
         """
-        for file in self._root.rglob("*"):
-            if file.is_file():
-                rel_path = str(file.relative_to(self._root))
-                if prefix is None or rel_path.startswith(prefix):
-                    yield rel_path
+        for entry in self.list_entries(prefix):
+            yield entry.key
+
+    def list_entries(
+        self,
+        prefix: Optional[str] = None,
+        extensions: Optional[Collection[str]] = None,
+        workers: int = 8,
+    ) -> Iterator[StorageEntry]:
+        """
+        List files with size, mtime and inode, walking the tree with os.scandir.
+        Top-level subdirectories are walked in parallel by up to `workers`
+        threads (useful on network mounts, where each directory read is a
+        round-trip). Symlinked directories are not followed, as with rglob().
+        Args:
+            prefix: Optional string to filter returned keys; directories that
+                cannot contain a match are not descended into.
+            extensions: Optional set of lowercase extensions with leading dot.
+            workers: Maximum threads walking top-level subdirectories.
+        Returns:
+            Iterator of StorageEntry, in no particular order.
+        """
+        top_dirs: List[Tuple[str, str]] = []
+        yield from self._scan_dir(str(self._root), "", prefix, extensions, top_dirs)
+        if not top_dirs:
+            return
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(workers, len(top_dirs))),
+            thread_name_prefix="fs-walk",
+        ) as executor:
+            walks = [
+                executor.submit(self._walk, path, rel, prefix, extensions)
+                for path, rel in top_dirs
+            ]
+            for walk in as_completed(walks):
+                yield from walk.result()
+
+    def _walk(
+        self,
+        path: str,
+        rel: str,
+        prefix: Optional[str],
+        extensions: Optional[Collection[str]],
+    ) -> List[StorageEntry]:
+        """Walk one subtree depth-first and return its file entries."""
+        entries: List[StorageEntry] = []
+        stack = [(path, rel)]
+        while stack:
+            dir_path, dir_rel = stack.pop()
+            entries.extend(self._scan_dir(dir_path, dir_rel, prefix, extensions, stack))
+        return entries
+
+    @staticmethod
+    def _scan_dir(
+        dir_path: str,
+        dir_rel: str,
+        prefix: Optional[str],
+        extensions: Optional[Collection[str]],
+        subdirs: List[Tuple[str, str]],
+    ) -> Iterator[StorageEntry]:
+        """
+        Yield the file entries of one directory and append its subdirectories
+        (path, relative key) to subdirs. Unreadable directories are skipped.
+        """
+        try:
+            scan = os.scandir(dir_path)
+        except OSError:
+            return
+        with scan:
+            for entry in scan:
+                rel = f"{dir_rel}{os.sep}{entry.name}" if dir_rel else entry.name
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        # Descend only if keys under it can still match prefix
+                        if prefix is None or (
+                            rel.startswith(prefix) or prefix.startswith(rel + os.sep)
+                        ):
+                            subdirs.append((entry.path, rel))
+                        continue
+                    if not entry.is_file():
+                        continue
+                    if prefix is not None and not rel.startswith(prefix):
+                        continue
+                    if not matches_extensions(entry.name, extensions):
+                        continue
+                    st = entry.stat()
+                except OSError:
+                    continue  # Vanished or unreadable while listing
+                yield StorageEntry(
+                    key=rel, size=st.st_size, mtime=st.st_mtime, inode=entry.inode()
+                )
 
     def retrieve(self, key: str) -> BinaryIO:
         """
@@ -63,6 +165,14 @@ class FilesystemStorageProvider(StorageProvider):
         Raises:
             FileNotFoundError: If the file does not exist or is outside the root.
         """
+        return self.local_path(key).open("rb")
+
+    def local_path(self, key: str) -> Path:
+        """
+        Resolve a key to its file under root.
+        Raises:
+            FileNotFoundError: If the file does not exist or is outside the root.
+        """
         # Compose the path and resolve it
         file_path = (self._root / key).resolve()
         try:
@@ -71,6 +181,6 @@ class FilesystemStorageProvider(StorageProvider):
             raise FileNotFoundError(f"Access denied: {key}")
         if not file_path.is_file():
             raise FileNotFoundError(f"Item not found: {key}")
-        return file_path.open("rb")
+        return file_path
 
     # upload and delete are inherited (NotImplementedError)
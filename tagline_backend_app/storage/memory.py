@@ -14,6 +14,7 @@ class InMemoryStorageProvider(StorageProvider):
     In-memory provider: stores files in a dict, lost on process exit.
     - list: returns all stored keys
     - retrieve: returns BytesIO for stored key, raises FileNotFoundError if missing
+    - read_prefix: returns the first bytes of a stored key
     - upload: stores bytes under key
     - delete: removes key if present
     - get_url: always None
@@ -32,11 +33,16 @@ class InMemoryStorageProvider(StorageProvider):
             raise FileNotFoundError(f"In-memory provider: '{key}' not found")
         return BytesIO(self._store[key])
 
+    def read_prefix(self, key: str, length: int) -> bytes:
+        if key not in self._store:
+            raise FileNotFoundError(f"In-memory provider: '{key}' not found")
+        return self._store[key][:length]
+
     def upload(self, key: str, data: BinaryIO) -> None:
         self._store[key] = data.read()
 
     def delete(self, key: str) -> None:
         self._store.pop(key, None)
 
-    def get_url(self, key: str) -> Optional[str]:
+    def get_url(self, key: str, content_hash: Optional[str] = None) -> Optional[str]:
         return None
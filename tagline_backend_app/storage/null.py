@@ -30,5 +30,5 @@ class NullStorageProvider(StorageProvider):
     def delete(self, key: str) -> None:
         pass  # No-op
 
-    def get_url(self, key: str) -> Optional[str]:
+    def get_url(self, key: str, content_hash: Optional[str] = None) -> Optional[str]:
         return None
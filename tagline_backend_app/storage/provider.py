@@ -4,8 +4,11 @@ This interface is agnostic to backend details (filesystem, cloud, etc).
 Providers should be configured via their constructor and/or environment/config.
 """
 
+import hashlib
 from abc import ABC, abstractmethod
-from typing import BinaryIO, Iterable, Optional
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Collection, Iterable, List, Optional, Tuple
 
 
 class StorageProviderMisconfigured(Exception):
@@ -16,6 +19,87 @@ class StorageProviderMisconfigured(Exception):
     pass
 
 
+class StorageCursorReset(Exception):
+    """
+    Raised by list_changes() when a listing cursor is no longer valid and the
+    caller must start over with a full listing.
+    """
+
+    pass
+
+
+@dataclass
+class StorageChanges:
+    """
+    Changes since a listing cursor, as returned by StorageProvider.list_changes().
+
+    Attributes:
+        updated: Keys of files added or modified since the cursor.
+        deleted: Keys of files or folders removed since the cursor. A deleted
+            folder removes every key under it.
+        cursor: Cursor to pass to the next list_changes() call.
+        entries: Listing metadata for updated keys, where the change feed
+            provides it (keys without an entry are treated as unknown).
+    """
+
+    updated: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+    cursor: str = ""
+    entries: dict[str, "StorageEntry"] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class StorageEntry:
+    """
+    A stored item plus the metadata the provider's listing returns with it.
+
+    Attributes:
+        key: Item key, as accepted by retrieve().
+        size: Size in bytes, if known.
+        mtime: Last modification time (seconds since the epoch), if known.
+        inode: Inode number (filesystem provider only).
+        content_hash: Content hash (see content_hash_stream()), if the
+            backend returns it with the listing (Dropbox).
+    """
+
+    key: str
+    size: Optional[int] = None
+    mtime: Optional[float] = None
+    inode: Optional[int] = None
+    content_hash: Optional[str] = None
+
+
+# Block size of the Dropbox content hash
+CONTENT_HASH_BLOCK_SIZE = 4 * 1024 * 1024
+
+
+def content_hash_stream(f: BinaryIO) -> str:
+    """
+    Hash a stream the way Dropbox computes FileMetadata.content_hash: SHA-256
+    of the concatenated SHA-256 digests of each 4 MiB block. Using the same
+    algorithm everywhere keeps hashes comparable across providers, and the
+    file is read one block at a time.
+    """
+    overall = hashlib.sha256()
+    while True:
+        block = f.read(CONTENT_HASH_BLOCK_SIZE)
+        if not block:
+            break
+        overall.update(hashlib.sha256(block).digest())
+    return overall.hexdigest()
+
+
+def matches_extensions(key: str, extensions: Optional[Collection[str]]) -> bool:
+    """
+    True if key ends with one of extensions (lowercase, with leading dot),
+    or if extensions is None (no filtering).
+    """
+    if extensions is None:
+        return True
+    dot = key.rfind(".")
+    return dot != -1 and key[dot:].lower() in extensions
+
+
 class StorageProvider(ABC):
     """
     Abstract interface for item storage providers.
@@ -30,6 +114,21 @@ class StorageProvider(ABC):
         """
         pass
 
+    def list_entries(
+        self,
+        prefix: Optional[str] = None,
+        extensions: Optional[Collection[str]] = None,
+    ) -> Iterable[StorageEntry]:
+        """
+        List items with whatever size/mtime metadata the backend provides,
+        optionally filtered by key prefix and by extension (lowercase, with
+        leading dot, e.g. {".jpg", ".heic"}).
+        Default: wraps list(), without metadata.
+        """
+        for key in self.list(prefix):
+            if matches_extensions(key, extensions):
+                yield StorageEntry(key=key)
+
     @abstractmethod
     def retrieve(self, key: str) -> BinaryIO:
         """
@@ -38,6 +137,102 @@ class StorageProvider(ABC):
         """
         pass
 
+    def retrieve_version(self, key: str, content_hash: Optional[str]) -> BinaryIO:
+        """
+        Retrieve an item whose content hash the caller already knows (e.g.
+        from its Photo row). Caching providers use the hash to validate
+        cached copies; the default just calls retrieve().
+        """
+        return self.retrieve(key)
+
+    def read_prefix(self, key: str, length: int) -> bytes:
+        """
+        Return the first `length` bytes of an item (fewer if the item is shorter).
+        Used to read image headers without fetching whole originals.
+        Default: reads from retrieve(); providers backed by remote storage should
+        override this to transfer only the requested range.
+        Raises FileNotFoundError if not found.
+        """
+        with self.retrieve(key) as f:
+            return f.read(length)
+
+    def content_hash(self, key: str) -> str:
+        """
+        Return the content hash of an item (see content_hash_stream()).
+        Default: streams the item from retrieve(); providers that store the
+        hash should return it without reading the content.
+        Raises FileNotFoundError if not found.
+        """
+        with self.retrieve(key) as f:
+            return content_hash_stream(f)
+
+    def max_rendition_size(self) -> Optional[Tuple[int, int]]:
+        """
+        Largest size get_rendition() can cover, or None if the provider
+        cannot render images server-side (the default).
+        """
+        return None
+
+    def get_rendition(self, key: str, min_size: Tuple[int, int]) -> Optional[bytes]:
+        """
+        Return a pre-scaled JPEG of an image, rendered by the backend, that
+        covers min_size (both edges at least that large, unless the original
+        is smaller), or None if no such rendition is available; callers then
+        render from the original. Default: None.
+        """
+        return None
+
+    def get_renditions(
+        self, keys: Iterable[str], min_size: Tuple[int, int]
+    ) -> dict[str, bytes]:
+        """
+        Batch form of get_rendition(). Keys without a rendition are left out.
+        Default: one get_rendition() call per key.
+        """
+        renditions: dict[str, bytes] = {}
+        for key in keys:
+            data = self.get_rendition(key, min_size)
+            if data is not None:
+                renditions[key] = data
+        return renditions
+
+    def cursor_scope(self) -> Optional[str]:
+        """
+        Identifier under which this provider's listing cursor is persisted, or
+        None if the provider cannot list incrementally (the default). Providers
+        returning a scope must implement list_with_cursor() and list_changes().
+        """
+        return None
+
+    def list_with_cursor(self) -> Tuple[List[StorageEntry], str]:
+        """
+        List all items (as for list_entries()), plus a cursor marking the
+        state of storage at the end of the listing (for a later list_changes()
+        call).
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support incremental listing."
+        )
+
+    def list_changes(self, cursor: str) -> StorageChanges:
+        """
+        Return the keys added, modified or deleted since cursor, with listing
+        metadata for the updated keys where available.
+        Raises StorageCursorReset if the cursor has expired.
+        """
+        raise NotImplementedError(
+            f"{type(self).__name__} does not support incremental listing."
+        )
+
+    def check_health(self) -> None:
+        """
+        Raise if the backend is unreachable or misconfigured (e.g. the root
+        directory went away). Default: no check.
+        """
+
+    def close(self) -> None:
+        """Release connections and other resources. Default: nothing to release."""
+
     def upload(self, key: str, data: BinaryIO) -> None:
         """
         Uploading items is not supported in Tagline (read-only app).
@@ -57,9 +252,21 @@ class StorageProvider(ABC):
         )
 
     # Optionally, add a method for generating public URLs (for S3, etc)
-    def get_url(self, key: str) -> Optional[str]:
+    def get_url(self, key: str, content_hash: Optional[str] = None) -> Optional[str]:
         """
         Return a public URL for the item, if supported by the backend.
+        content_hash, if the caller knows it (e.g. from its Photo row), names
+        the version wanted, so a URL cached for an older version of a
+        replaced file is not reused.
         Default: None (not supported).
         """
         return None
+
+    def local_path(self, key: str) -> Optional[Path]:
+        """
+        Return the path of the item on the local filesystem, if the backend
+        stores it there, so it can be served with sendfile instead of read
+        through Python. Default: None.
+        Raises FileNotFoundError if not found.
+        """
+        return None
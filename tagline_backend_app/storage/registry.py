@@ -0,0 +1,82 @@
+"""
+Process-wide registry of storage provider instances.
+
+Providers are built once and shared by every request, scan and watcher, so
+a Dropbox client keeps its pooled HTTP connections and access token between
+requests instead of paying a TLS handshake and token refresh on each one.
+"""
+
+import logging
+import threading
+from typing import Any, Callable, Optional
+
+from tagline_backend_app.storage.provider import StorageProvider
+
+logger = logging.getLogger(__name__)
+
+
+class ProviderRegistry:
+    """
+    Thread-safe map of provider name -> instance, built on first use.
+
+    A factory that raises (e.g. StorageProviderMisconfigured) caches
+    nothing, so the next get() tries again. health() checks each instance
+    and drops the ones that fail, so a provider with a dead connection or
+    revoked credentials is rebuilt on its next use; reset() drops them on
+    demand.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._providers: dict[str, StorageProvider] = {}
+
+    def get(self, name: str, factory: Callable[[], StorageProvider]) -> StorageProvider:
+        """Return the provider registered as name, building it if needed."""
+        provider = self._providers.get(name)
+        if provider is not None:
+            return provider
+        with self._lock:
+            provider = self._providers.get(name)
+            if provider is None:
+                provider = factory()
+                self._providers[name] = provider
+                logger.info(f"Storage provider '{name}' created.")
+            return provider
+
+    def reset(self, name: Optional[str] = None) -> None:
+        """Close and forget the provider registered as name (or all of them)."""
+        with self._lock:
+            names = list(self._providers) if name is None else [name]
+            dropped = [self._providers.pop(n) for n in names if n in self._providers]
+        for provider in dropped:
+            try:
+                provider.close()
+            except Exception as e:
+                logger.warning(f"Could not close {type(provider).__name__}: {e}")
+        if dropped:
+            logger.info(f"Storage provider(s) reset: {', '.join(names)}")
+
+    def health(self) -> dict[str, dict[str, Any]]:
+        """
+        Run check_health() on every built provider. Failing providers are
+        reset so the next request builds a fresh one.
+        Returns:
+            {name: {"provider": class name, "ok": bool, "error": str or None}}
+        """
+        with self._lock:
+            providers = dict(self._providers)
+        report: dict[str, dict[str, Any]] = {}
+        for name, provider in providers.items():
+            error = None
+            try:
+                provider.check_health()
+            except Exception as e:
+                error = str(e)
+                logger.warning(f"Storage provider '{name}' is unhealthy: {e}")
+                self.reset(name)
+            report[name] = {
+                "provider": type(provider).__name__,
+                "ok": error is None,
+                "error": error,
+            }
+        return report
@@ -0,0 +1,175 @@
+"""
+transform_pool.py
+
+Optional worker-process pool for CPU-bound image transforms.
+Pillow decode/resize/encode holds the GIL for much of its work, so running it
+in request threads caps throughput at one core and lets a large HEIC stall
+unrelated requests. With IMAGE_WORKER_PROCESSES > 0, transforms run in
+separate processes instead; with 0 (the default) they run inline.
+"""
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, Tuple
+
+from tagline_backend_app.config import get_settings
+from tagline_backend_app.imaging import register_codecs
+
+logger = logging.getLogger(__name__)
+
+
+class TransformQueueFull(Exception):
+    """Raised when every worker is busy and the pending queue is at its limit."""
+
+    pass
+
+
+class TransformPool:
+    """
+    Process pool with a bounded number of in-flight transforms.
+
+    At most ``workers + queue_depth`` transforms are running or queued at once;
+    beyond that ``run`` fails fast with TransformQueueFull instead of letting
+    the backlog (and the memory held by queued originals) grow without bound.
+
+    If a worker dies (OOM on a huge image, a crash in a codec) the executor
+    is broken for good; it is replaced with a fresh one, and only the
+    transforms that were running on the broken executor fail.
+    """
+
+    def __init__(self, workers: int, queue_depth: int):
+        self._executor = self._new_executor(workers)
+        self._slots = threading.BoundedSemaphore(workers + queue_depth)
+        self._lock = threading.Lock()
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.restarts = 0
+
+    @staticmethod
+    def _new_executor(workers: int) -> ProcessPoolExecutor:
+        # "spawn" avoids forking a process that already runs server threads
+        return ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=register_codecs,
+        )
+
+    def _replace_executor(self, broken: ProcessPoolExecutor) -> ProcessPoolExecutor:
+        """Swap in a new executor for a broken one (once) and return the current one."""
+        with self._lock:
+            if self._executor is broken:
+                logger.error("Image transform worker died; restarting the pool")
+                self._executor = self._new_executor(self.workers)
+                self.restarts += 1
+                broken.shutdown(wait=False, cancel_futures=True)
+            return self._executor
+
+    def _submit(
+        self, fn: Callable[[bytes], bytes], data: bytes
+    ) -> Tuple[ProcessPoolExecutor, Future]:
+        executor = self._executor
+        try:
+            return executor, executor.submit(fn, data)
+        except BrokenProcessPool:
+            # Broken by an earlier transform; this one never ran, so retry it
+            executor = self._replace_executor(executor)
+            return executor, executor.submit(fn, data)
+
+    def run(self, fn: Callable[[bytes], bytes], data: bytes) -> bytes:
+        """
+        Run fn(data) in a worker process and wait for the result.
+        Raises:
+            TransformQueueFull: If no slot is free.
+            BrokenProcessPool: If a worker died while this transform was
+                running (the pool is restarted for later transforms).
+            Exception: Whatever fn raised in the worker.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise TransformQueueFull(
+                f"Image transform queue is full ({self.workers} workers, "
+                f"{self.queue_depth} queued)"
+            )
+        with self._lock:
+            self.in_flight += 1
+        try:
+            executor, future = self._submit(fn, data)
+            try:
+                return future.result()
+            except BrokenProcessPool:
+                self._replace_executor(executor)
+                raise
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+                self.completed += 1
+            self._slots.release()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> dict[str, Any]:
+        """Return a snapshot of pool size and counters."""
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_depth": self.queue_depth,
+                "in_flight": self.in_flight,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "restarts": self.restarts,
+            }
+
+
+# Global transform pool instance (initialized later; None means run inline)
+TRANSFORM_POOL: Optional[TransformPool] = None
+
+
+def initialize_transform_pool():
+    """Initializes the global transform pool based on environment settings."""
+    global TRANSFORM_POOL
+    settings = get_settings()
+
+    shutdown_transform_pool()
+    workers = settings.IMAGE_WORKER_PROCESSES
+    if workers <= 0:
+        logger.info(
+            "Image transforms run in request threads (IMAGE_WORKER_PROCESSES=0)."
+        )
+        return
+
+    queue_depth = max(0, settings.IMAGE_WORKER_QUEUE_DEPTH)
+    TRANSFORM_POOL = TransformPool(workers=workers, queue_depth=queue_depth)
+    logger.info(
+        f"Initializing image transform pool: workers={workers}, "
+        f"queue_depth={queue_depth}"
+    )
+
+
+def get_transform_pool() -> Optional[TransformPool]:
+    """Returns the global transform pool, or None if transforms run inline."""
+    return TRANSFORM_POOL
+
+
+def shutdown_transform_pool():
+    """Shuts down the global transform pool, if any."""
+    global TRANSFORM_POOL
+    if TRANSFORM_POOL is not None:
+        TRANSFORM_POOL.shutdown()
+        TRANSFORM_POOL = None
+        logger.info("Image transform pool shut down.")
+
+
+def run_transform(fn: Callable[[bytes], bytes], data: bytes) -> bytes:
+    """Run an image transform in the worker pool if configured, else inline."""
+    pool = TRANSFORM_POOL
+    if pool is None:
+        return fn(data)
+    return pool.run(fn, data)
@@ -0,0 +1,291 @@
+"""
+watcher.py
+
+Optional background watcher for the filesystem storage provider.
+Filesystem events (inotify on Linux, or polling for network shares where
+inotify does not see writes made by other hosts) are debounced and coalesced
+by path, and only the affected paths are fed to the scanner, so files dropped
+into the share show up within seconds without a full rescan.
+"""
+
+import logging
+import stat
+import threading
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+import watchfiles
+from sqlalchemy.orm import Session
+
+from tagline_backend_app.config import get_settings
+from tagline_backend_app.scan_lock import ScanLock, create_scan_lock
+from tagline_backend_app.scanner import ScanProgress, apply_changes, create_pregenerator
+from tagline_backend_app.storage.filesystem import FilesystemStorageProvider
+from tagline_backend_app.storage.provider import StorageChanges, StorageEntry
+
+logger = logging.getLogger(__name__)
+
+# Delay before retrying a batch that found the scan lock taken. It doubles on
+# each miss up to the maximum, so the watchers of every other worker process
+# do not poll the lock each second while one of them (or a scan) holds it.
+_LOCK_RETRY_DELAY = 1.0
+_LOCK_RETRY_MAX_DELAY = 30.0
+
+
+class FilesystemWatcher:
+    """
+    Watches a FilesystemStorageProvider's root and applies changes in batches.
+
+    Two daemon threads:
+    - the watch thread receives debounced event sets from watchfiles and adds
+      the paths to a pending set (repeated events for one path collapse);
+    - the apply thread takes the whole pending set, resolves each path's
+      current state on disk (file, directory or gone) and hands the result to
+      scanner.apply_changes() with its own database session, under the
+      cluster-wide scan lock (a batch that finds it taken is retried, backing
+      off while it stays taken).
+
+    ``queue_depth`` is the number of paths waiting to be applied.
+    """
+
+    def __init__(
+        self,
+        provider: FilesystemStorageProvider,
+        session_factory: Callable[[], Session],
+        debounce_ms: int = 1000,
+        force_polling: bool = False,
+        poll_interval_ms: int = 2000,
+        lock_factory: Optional[Callable[[], ScanLock]] = None,
+    ):
+        self._provider = provider
+        self._root = provider.root
+        self._session_factory = session_factory
+        self._debounce_ms = debounce_ms
+        self._force_polling = force_polling
+        self._poll_interval_ms = poll_interval_ms
+        self._lock_factory = lock_factory or (
+            lambda: create_scan_lock(
+                session_factory, get_settings().SCAN_LOCK_LEASE_SECONDS
+            )
+        )
+        self._stop = threading.Event()
+        self._cond = threading.Condition()
+        # Path -> whether it was reported as added (only added directories are
+        # expanded; a directory's own "modified" events are noise)
+        self._pending: dict[Path, bool] = {}
+        self._threads: list[threading.Thread] = []
+        self.progress = ScanProgress()
+        self.polling = force_polling
+        self.events = 0
+        self.batches = 0
+        self.errors = 0
+        self.last_applied_at: Optional[datetime] = None
+
+    def start(self) -> None:
+        self._threads = [
+            threading.Thread(target=self._watch, name="fs-watch", daemon=True),
+            threading.Thread(
+                target=self._apply_loop, name="fs-watch-apply", daemon=True
+            ),
+        ]
+        for thread in self._threads:
+            thread.start()
+        logger.info(f"[watch] Watching {self._root} for changes")
+
+    def stop(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def _watch(self) -> None:
+        while not self._stop.is_set():
+            try:
+                for event_set in watchfiles.watch(
+                    self._root,
+                    debounce=self._debounce_ms,
+                    stop_event=self._stop,
+                    force_polling=self.polling,
+                    poll_delay_ms=self._poll_interval_ms,
+                    raise_interrupt=False,
+                    ignore_permission_denied=True,
+                ):
+                    self.enqueue(
+                        (Path(path), change == watchfiles.Change.added)
+                        for change, path in event_set
+                    )
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                if not self.polling:
+                    # e.g. inotify watch limit reached or unsupported filesystem
+                    logger.warning(f"[watch] Native watcher failed ({e}); polling")
+                    self.polling = True
+                else:
+                    logger.error(f"[watch] Watcher failed: {e}; restarting")
+                    self._stop.wait(5)
+
+    def enqueue(self, events: Iterable[tuple[Path, bool]]) -> None:
+        """Add (absolute path, was added) events to the pending set."""
+        with self._cond:
+            for path, added in events:
+                self.events += 1
+                self._pending[path] = self._pending.get(path, False) or added
+            self._cond.notify()
+
+    def _apply_loop(self) -> None:
+        lock_delay = _LOCK_RETRY_DELAY
+        while not self._stop.is_set():
+            with self._cond:
+                while not self._pending and not self._stop.is_set():
+                    self._cond.wait()
+                if self._stop.is_set():
+                    return
+                paths = dict(self._pending)
+                self._pending.clear()
+            try:
+                if self.apply(paths):
+                    lock_delay = _LOCK_RETRY_DELAY
+                    continue
+                # A scan (or another worker's watcher) is busy; it may well
+                # pick these up, and if not they are cheap to re-check later
+                delay = lock_delay
+                lock_delay = min(lock_delay * 2, _LOCK_RETRY_MAX_DELAY)
+            except Exception as e:
+                self.errors += 1
+                logger.error(f"[watch] Failed to apply {len(paths)} changes: {e}")
+                delay = 5.0
+            # Retry on the next batch rather than dropping the paths
+            with self._cond:
+                for path, added in paths.items():
+                    self._pending[path] = self._pending.get(path, False) or added
+            self._stop.wait(delay)
+
+    def apply(self, paths: dict[Path, bool]) -> bool:
+        """
+        Resolve paths to storage changes and apply them (blocking), holding
+        the cluster-wide scan lock so only one worker process writes.
+        Returns False, having applied nothing, if the lock is held elsewhere.
+        """
+        changes = self._resolve(paths)
+        if not (changes.updated or changes.deleted):
+            return True
+        settings = get_settings()
+        scan_lock = self._lock_factory()
+        if not scan_lock.acquire():
+            return False
+        pregenerator = create_pregenerator(self.progress)
+        db = self._session_factory()
+        try:
+            apply_changes(
+                self._provider,
+                db,
+                changes,
+                self.progress,
+                pregenerator,
+                batch_size=settings.SCAN_BATCH_SIZE,
+                workers=settings.SCAN_WORKERS,
+                extensions=settings.scan_extensions,
+            )
+        finally:
+            db.close()
+            if pregenerator is not None:
+                pregenerator.close()
+            scan_lock.release()
+        self.batches += 1
+        self.last_applied_at = datetime.now(UTC)
+        logger.info(
+            f"[watch] Applied {len(changes.updated)} updated, "
+            f"{len(changes.deleted)} deleted"
+        )
+        return True
+
+    def _resolve(self, paths: dict[Path, bool]) -> StorageChanges:
+        """
+        Turn event paths into keys by their state now, so a burst of
+        create/modify/move/delete events for one path collapses to its outcome.
+        An added directory (e.g. moved into the tree) yields every file under it.
+        Size/mtime come along, so the scanner can skip files that did not change.
+        """
+        changes = StorageChanges()
+        for path, added in paths.items():
+            try:
+                key = path.relative_to(self._root).as_posix()
+            except ValueError:
+                continue
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                changes.deleted.append(key)
+                continue
+            except OSError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                changes.updated.append(key)
+                changes.entries[key] = StorageEntry(
+                    key=key, size=st.st_size, mtime=st.st_mtime, inode=st.st_ino
+                )
+            elif stat.S_ISDIR(st.st_mode) and added:
+                for entry in self._provider.list_entries(prefix=key + "/"):
+                    changes.updated.append(entry.key)
+                    changes.entries[entry.key] = entry
+        return changes
+
+    def stats(self) -> dict[str, Any]:
+        """Return a snapshot of queue depth and counters."""
+        with self._cond:
+            queue_depth = len(self._pending)
+        return {
+            "root": str(self._root),
+            "polling": self.polling,
+            "queue_depth": queue_depth,
+            "events": self.events,
+            "batches": self.batches,
+            "errors": self.errors,
+            "last_applied_at": self.last_applied_at,
+            **{
+                k: v
+                for k, v in self.progress.as_dict().items()
+                if k not in ("running", "started_at", "finished_at", "error")
+            },
+        }
+
+
+# Global watcher instance (started from the app lifespan when enabled)
+FILESYSTEM_WATCHER: Optional[FilesystemWatcher] = None
+
+
+def start_filesystem_watcher(
+    provider: FilesystemStorageProvider, session_factory: Callable[[], Session]
+) -> None:
+    """Starts the global filesystem watcher if enabled in settings."""
+    global FILESYSTEM_WATCHER
+    settings = get_settings()
+    if not settings.FILESYSTEM_WATCH_ENABLED:
+        return
+    stop_filesystem_watcher()
+    FILESYSTEM_WATCHER = FilesystemWatcher(
+        provider,
+        session_factory,
+        debounce_ms=settings.FILESYSTEM_WATCH_DEBOUNCE_MS,
+        force_polling=settings.FILESYSTEM_WATCH_FORCE_POLLING,
+        poll_interval_ms=settings.FILESYSTEM_WATCH_POLL_INTERVAL_MS,
+    )
+    FILESYSTEM_WATCHER.start()
+
+
+def get_filesystem_watcher() -> Optional[FilesystemWatcher]:
+    """Returns the global filesystem watcher, or None if not running."""
+    return FILESYSTEM_WATCHER
+
+
+def stop_filesystem_watcher() -> None:
+    """Stops the global filesystem watcher, if any."""
+    global FILESYSTEM_WATCHER
+    if FILESYSTEM_WATCHER is not None:
+        FILESYSTEM_WATCHER.stop()
+        FILESYSTEM_WATCHER = None
+        logger.info("[watch] Filesystem watcher stopped.")
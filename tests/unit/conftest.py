@@ -0,0 +1,24 @@
+"""
+Shared fixtures for the unit tests.
+"""
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from tagline_backend_app.models import Base
+
+
+@pytest.fixture
+def session_factory():
+    # One shared connection, so sessions opened on other threads (scan
+    # runners, watchers, test clients) see the same in-memory DB
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
@@ -0,0 +1,99 @@
+"""
+Unit tests for tagline_backend_app.caching
+Covers: ByteLRUCache byte accounting, eviction and stats; cache initialization
+"""
+
+import pytest
+
+from tagline_backend_app import caching
+from tagline_backend_app.caching import ByteLRUCache
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture(autouse=True)
+def restore_caches(monkeypatch):
+    """Put back the module's cache globals, which initialize_*() replace."""
+    for name in (
+        "THUMBNAIL_CACHE",
+        "IMAGE_CACHE",
+        "DERIVATIVE_CACHE",
+        "ORIGINAL_CACHE",
+    ):
+        monkeypatch.setattr(caching, name, getattr(caching, name))
+
+
+def test_byte_cache_accounts_actual_bytes():
+    cache = ByteLRUCache(max_bytes=100)
+    cache["a"] = b"x" * 30
+    cache["b"] = b"y" * 50
+    stats = cache.stats()
+    assert stats["current_bytes"] == 80
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 0
+
+
+def test_byte_cache_evicts_lru_until_it_fits():
+    cache = ByteLRUCache(max_bytes=100)
+    cache["a"] = b"x" * 40
+    cache["b"] = b"y" * 40
+    assert cache.get("a") is not None  # "a" is now most recently used
+    cache["c"] = b"z" * 70
+    assert "b" not in cache
+    assert "a" not in cache  # still over budget after evicting "b"
+    assert cache.get("c") == b"z" * 70
+    assert cache.stats()["evictions"] == 2
+    assert cache.currsize <= 100
+
+
+def test_byte_cache_rejects_value_larger_than_budget():
+    cache = ByteLRUCache(max_bytes=10)
+    with pytest.raises(ValueError):
+        cache["big"] = b"x" * 11
+    assert len(cache) == 0
+
+
+def test_byte_cache_counts_hits_and_misses():
+    cache = ByteLRUCache(max_bytes=10)
+    cache["a"] = b"1"
+    cache.get("a")
+    cache.get("nope")
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_explicit_delete_is_not_an_eviction():
+    cache = ByteLRUCache(max_bytes=10)
+    cache["a"] = b"1"
+    del cache["a"]
+    assert cache.stats()["evictions"] == 0
+    assert cache.currsize == 0
+
+
+def test_initialize_caches_use_mb_as_byte_budget(monkeypatch):
+    class FakeSettings:
+        THUMBNAIL_CACHE_MAX_MB = 2
+        IMAGE_CACHE_MAX_MB = 3
+
+    monkeypatch.setattr(caching, "get_settings", lambda: FakeSettings())
+    caching.initialize_thumbnail_cache()
+    caching.initialize_image_cache()
+    stats = caching.get_cache_stats()
+    assert stats["thumbnail"]["max_bytes"] == 2 * 1024 * 1024
+    assert stats["image"]["max_bytes"] == 3 * 1024 * 1024
+
+
+def test_initialize_caches_disabled_when_zero(monkeypatch):
+    class FakeSettings:
+        THUMBNAIL_CACHE_MAX_MB = 0
+        IMAGE_CACHE_MAX_MB = 0
+
+    monkeypatch.setattr(caching, "get_settings", lambda: FakeSettings())
+    caching.initialize_thumbnail_cache()
+    caching.initialize_image_cache()
+    assert caching.get_thumbnail_cache() is None
+    assert caching.get_image_cache() is None
+    stats = caching.get_cache_stats()
+    assert stats["thumbnail"] is None
+    assert stats["image"] is None
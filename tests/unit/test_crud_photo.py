@@ -0,0 +1,146 @@
+"""
+Unit tests for tagline_backend_app.crud.photo.PhotoRepository
+Covers: SQL-level pagination (list_page), counting and bulk inserts, lookups by
+filename or folder, deletes by id (in-memory SQLite DB)
+"""
+
+import uuid
+from datetime import UTC, datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from tagline_backend_app.crud.photo import PhotoRepository
+from tagline_backend_app.models import Base, Photo
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture(scope="function")
+def db_session():
+    engine = create_engine("sqlite:///:memory:", echo=False, future=True)
+    Base.metadata.create_all(engine)
+    SessionLocal = sessionmaker(bind=engine, future=True)
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+@pytest.fixture
+def seeded_repo(db_session):
+    base = datetime(2025, 1, 1, tzinfo=UTC)
+    for i in range(7):
+        db_session.add(
+            Photo(filename=f"photo{i}.jpg", created_at=base + timedelta(minutes=i))
+        )
+    db_session.commit()
+    return PhotoRepository(db_session)
+
+
+def test_count(seeded_repo):
+    assert seeded_repo.count() == 7
+
+
+def test_count_empty(db_session):
+    assert PhotoRepository(db_session).count() == 0
+
+
+def test_list_page_orders_by_created_at(seeded_repo):
+    page = seeded_repo.list_page(offset=0, limit=3)
+    assert [p.filename for p in page] == ["photo0.jpg", "photo1.jpg", "photo2.jpg"]
+
+
+def test_list_page_offset_and_tail(seeded_repo):
+    page = seeded_repo.list_page(offset=5, limit=3)
+    assert [p.filename for p in page] == ["photo5.jpg", "photo6.jpg"]
+    assert seeded_repo.list_page(offset=10, limit=3) == []
+
+
+def test_list_page_ties_broken_by_id(db_session):
+    same_time = datetime(2025, 1, 1, tzinfo=UTC)
+    for i in range(4):
+        db_session.add(Photo(filename=f"tie{i}.jpg", created_at=same_time))
+    db_session.commit()
+    repo = PhotoRepository(db_session)
+    ids = [p.id for p in repo.list_page(offset=0, limit=2)]
+    ids += [p.id for p in repo.list_page(offset=2, limit=2)]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == 4
+
+
+def test_list_after_walks_all_pages(seeded_repo):
+    seen = []
+    after = None
+    while True:
+        page = seeded_repo.list_after(after=after, limit=3)
+        if not page:
+            break
+        seen.extend(p.filename for p in page)
+        after = (page[-1].created_at, page[-1].id)
+    assert seen == [f"photo{i}.jpg" for i in range(7)]
+
+
+def test_list_after_ties_broken_by_id(db_session):
+    same_time = datetime(2025, 1, 1, tzinfo=UTC)
+    for i in range(5):
+        db_session.add(Photo(filename=f"tie{i}.jpg", created_at=same_time))
+    db_session.commit()
+    repo = PhotoRepository(db_session)
+    first = repo.list_after(limit=2)
+    rest = repo.list_after(after=(first[-1].created_at, first[-1].id), limit=10)
+    ids = [p.id for p in first + rest]
+    assert ids == sorted(ids)
+    assert len(set(ids)) == 5
+
+
+def test_bulk_create_inserts_in_batches(db_session):
+    inserts = []
+    event.listen(
+        db_session.get_bind(),
+        "before_cursor_execute",
+        lambda conn, cursor, stmt, *a: (
+            inserts.append(stmt) if stmt.startswith("INSERT") else None
+        ),
+    )
+    repo = PhotoRepository(db_session)
+    rows = [{"filename": f"bulk{i}.jpg", "width": i, "height": 1} for i in range(7)]
+    ids = repo.bulk_create(rows, batch_size=3)
+
+    assert len(ids) == len(set(ids)) == 7
+    assert len(inserts) == 3  # 3 + 3 + 1
+    assert repo.count() == 7
+    photo = repo.get(ids[4])
+    assert photo is not None
+    assert (photo.filename, photo.width) == ("bulk4.jpg", 4)
+    assert photo.created_at is not None and photo.updated_at is not None
+
+
+def test_bulk_create_keeps_given_ids(db_session):
+    repo = PhotoRepository(db_session)
+    given = uuid.uuid4()
+    assert repo.bulk_create([{"id": given, "filename": "a.jpg"}]) == [given]
+    photo = repo.get(given)
+    assert photo is not None and photo.filename == "a.jpg"
+
+
+def test_list_by_filenames(seeded_repo):
+    photos = seeded_repo.list_by_filenames(["photo1.jpg", "photo3.jpg", "nope.jpg"])
+    assert sorted(p.filename for p in photos) == ["photo1.jpg", "photo3.jpg"]
+    assert seeded_repo.list_by_filenames([]) == []
+
+
+def test_list_under_and_delete_by_ids(db_session):
+    repo = PhotoRepository(db_session)
+    ids = repo.bulk_create(
+        {"filename": name}
+        for name in ["a.jpg", "trip/b.jpg", "trip/c/d.jpg", "trip2/e.jpg", "f_x.jpg"]
+    )
+    # Keys match files and folders; LIKE wildcards in keys are literal
+    under = repo.list_under(["trip", "a.jpg", "f%"])
+    assert sorted(p.filename for p in under) == ["a.jpg", "trip/b.jpg", "trip/c/d.jpg"]
+    repo.delete_by_ids(ids[:3])
+    assert sorted(p.filename for p in repo.list()) == ["f_x.jpg", "trip2/e.jpg"]
@@ -0,0 +1,96 @@
+"""
+Unit tests for tagline_backend_app.disk_cache.DiskCache
+Covers: get/put round trip, persistence across instances, atomic writes,
+size-bounded LRU eviction, overwrites, delete, open
+"""
+
+import os
+import time
+
+import pytest
+
+from tagline_backend_app.disk_cache import DiskCache
+
+pytestmark = pytest.mark.unit
+
+
+def test_put_and_get_round_trip(tmp_path):
+    cache = DiskCache(tmp_path / "cache", max_bytes=1024)
+    cache.put("photo:thumb", b"webp-bytes")
+    assert cache.get("photo:thumb") == b"webp-bytes"
+    assert cache.get("missing") is None
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["current_bytes"] == len(b"webp-bytes")
+
+
+def test_entries_survive_new_instance(tmp_path):
+    DiskCache(tmp_path, max_bytes=1024).put("k", b"persisted")
+    reopened = DiskCache(tmp_path, max_bytes=1024)
+    assert reopened.get("k") == b"persisted"
+    assert reopened.stats()["current_bytes"] == len(b"persisted")
+
+
+def test_no_temp_files_left_behind(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=1024)
+    cache.put("k", b"data")
+    names = [name for _, _, files in os.walk(tmp_path) for name in files]
+    assert len(names) == 1
+    assert not names[0].startswith(".tmp-")
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=100)
+    cache.put("old", b"a" * 40)
+    cache.put("used", b"b" * 40)
+    # Make "old" the least recently used, then read "used" to bump it
+    past = time.time() - 60
+    os.utime(cache._path("old"), (past, past))
+    os.utime(cache._path("used"), (past + 1, past + 1))
+    assert cache.get("used") is not None
+    cache.put("new", b"c" * 40)
+    assert cache.get("old") is None
+    assert cache.get("used") == b"b" * 40
+    assert cache.get("new") == b"c" * 40
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["current_bytes"] <= 100
+
+
+def test_overwrite_replaces_size_and_does_not_evict(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=100)
+    cache.put("other", b"o" * 40)
+    for _ in range(5):
+        cache.put("k", b"a" * 40)
+    cache.put("k", b"b" * 10)
+    assert cache.stats()["current_bytes"] == 50
+    assert cache.stats()["evictions"] == 0
+    assert cache.get("other") == b"o" * 40
+    assert cache.get("k") == b"b" * 10
+
+
+def test_rejects_value_larger_than_budget(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=10)
+    with pytest.raises(ValueError):
+        cache.put("big", b"x" * 11)
+
+
+def test_delete(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=1024)
+    cache.put("k", b"data")
+    cache.delete("k")
+    cache.delete("k")  # Deleting a missing key is a no-op
+    assert cache.get("k") is None
+    assert cache.stats()["current_bytes"] == 0
+
+
+def test_open_returns_a_file_handle(tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=1024)
+    assert cache.open("k") is None
+    cache.put("k", b"original")
+    f = cache.open("k")
+    assert f is not None
+    with f:
+        cache.delete("k")  # Already open: still readable
+        assert f.read() == b"original"
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
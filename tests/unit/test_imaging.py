@@ -0,0 +1,171 @@
+"""
+Unit tests for tagline_backend_app.imaging
+Covers: rendition sizes and formats, reduced-scale JPEG and HEIC decode, EXIF
+orientation
+"""
+
+import io
+
+import pytest
+from PIL import Image
+
+from tagline_backend_app import imaging
+from tagline_backend_app.imaging import render_image, render_thumbnail
+
+pytestmark = pytest.mark.unit
+
+imaging.register_codecs()
+
+EXIF_ORIENTATION = 0x0112
+
+
+def _encode(size, fmt="JPEG", mode="RGB") -> bytes:
+    buf = io.BytesIO()
+    Image.new(mode, size, "red").save(buf, format=fmt)
+    return buf.getvalue()
+
+
+@pytest.mark.parametrize("size", [(4000, 3000), (3000, 4000), (6000, 2000)])
+def test_render_thumbnail_size_and_format(size):
+    out = Image.open(io.BytesIO(render_thumbnail(_encode(size))))
+    assert out.format == "WEBP"
+    assert out.size == imaging.THUMBNAIL_SIZE
+
+
+@pytest.mark.parametrize(
+    "size,expected",
+    [
+        ((4000, 3000), (1024, 768)),
+        ((3000, 4000), (768, 1024)),
+        ((800, 600), (800, 600)),
+    ],
+)
+def test_render_image_size_and_format(size, expected):
+    out = Image.open(io.BytesIO(render_image(_encode(size))))
+    assert out.format == "JPEG"
+    assert out.size == expected
+
+
+def test_render_image_converts_non_rgb_png():
+    out = Image.open(io.BytesIO(render_image(_encode((2000, 1000), "PNG", "RGBA"))))
+    assert out.mode == "RGB"
+    assert out.size == (1024, 512)
+
+
+def test_large_jpeg_is_decoded_at_reduced_scale(monkeypatch):
+    requested = []
+    original = imaging._decode_reduced
+
+    def spy(img, min_size):
+        original(img, min_size)
+        requested.append((min_size, img.size))
+
+    monkeypatch.setattr(imaging, "_decode_reduced", spy)
+    render_thumbnail(_encode((4096, 3072)))
+    # 1/8 scale (512x384) is the largest reduction that still covers the target
+    assert requested == [(imaging.THUMBNAIL_SIZE, (512, 384))]
+
+    requested.clear()
+    render_image(_encode((4096, 3072)))
+    # 1/4 scale (1024x768) exactly covers the 1024px rendition
+    assert requested == [((1024, 768), (1024, 768))]
+
+
+def test_small_image_is_not_drafted(monkeypatch):
+    calls = []
+    monkeypatch.setattr(imaging, "_decode_reduced", lambda *a: calls.append(a))
+    render_image(_encode((800, 600)))
+    assert calls == []
+
+
+def _halves(size, fmt="JPEG", **params) -> bytes:
+    """Red first half, blue second half, split across the longer edge."""
+    w, h = size
+    img = Image.new("RGB", size, "red")
+    img.paste("blue", (w // 2, 0, w, h) if w >= h else (0, h // 2, w, h))
+    buf = io.BytesIO()
+    img.save(buf, format=fmt, **params)
+    return buf.getvalue()
+
+
+def _assert_halves(img):
+    """Red then blue along the longer edge, as drawn by _halves()."""
+    w, h = img.size
+    if w >= h:
+        first, second = (5, h // 2), (w - 5, h // 2)
+    else:
+        first, second = (w // 2, 5), (w // 2, h - 5)
+    rgb = img.convert("RGB")
+    assert rgb.getpixel(first) == pytest.approx((255, 0, 0), abs=60)
+    assert rgb.getpixel(second) == pytest.approx((0, 0, 255), abs=60)
+
+
+@pytest.fixture
+def decoded(monkeypatch):
+    """Sizes images had after _decode_reduced() ran."""
+    sizes = []
+    original = imaging._decode_reduced
+
+    def spy(img, min_size):
+        original(img, min_size)
+        sizes.append(img.size)
+
+    monkeypatch.setattr(imaging, "_decode_reduced", spy)
+    return sizes
+
+
+@pytest.mark.parametrize("fmt", ["JPEG", "HEIF"])
+@pytest.mark.parametrize(
+    "size,expected",
+    [((2048, 1536), (1024, 768)), ((1536, 2048), (768, 1024))],
+    ids=["landscape", "portrait"],
+)
+def test_reduced_decode_keeps_size_and_orientation(decoded, fmt, size, expected):
+    # HEIC only decodes reduced from an embedded thumbnail
+    params = {"thumbnails": [1024]} if fmt == "HEIF" else {}
+    data = _halves(size, fmt, **params)
+
+    image = Image.open(io.BytesIO(render_image(data)))
+    assert image.size == expected
+    _assert_halves(image)
+    thumb = Image.open(io.BytesIO(render_thumbnail(data)))
+    assert thumb.size == imaging.THUMBNAIL_SIZE
+    if size[0] >= size[1]:
+        _assert_halves(thumb)
+
+    # Both renditions were decoded below full size
+    assert len(decoded) == 2
+    assert all(w < size[0] and h < size[1] for w, h in decoded)
+
+
+def test_reduced_heic_decode_applies_rotation(decoded):
+    # Stored landscape, displayed portrait: the embedded thumbnail is rotated
+    # the same way as the full image
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = 6
+    data = _halves((2048, 1536), "HEIF", exif=exif.tobytes(), thumbnails=[1024])
+    image = Image.open(io.BytesIO(render_image(data)))
+    assert decoded == [(768, 1024)]
+    assert image.size == (768, 1024)
+    _assert_halves(image)
+
+
+def test_jpeg_exif_orientation_is_applied(decoded):
+    # Stored landscape, displayed portrait, as Dropbox renders it too
+    exif = Image.Exif()
+    exif[EXIF_ORIENTATION] = 6
+    data = _halves((2048, 1536), exif=exif.tobytes())
+
+    image = Image.open(io.BytesIO(render_image(data)))
+    assert image.size == (768, 1024)
+    _assert_halves(image)
+    assert EXIF_ORIENTATION not in image.getexif()
+
+    thumb = Image.open(io.BytesIO(render_thumbnail(data)))
+    assert thumb.size == imaging.THUMBNAIL_SIZE
+    # Upright: the crop spans red above blue
+    rgb = thumb.convert("RGB")
+    assert rgb.getpixel((256, 5)) == pytest.approx((255, 0, 0), abs=60)
+    assert rgb.getpixel((256, 378)) == pytest.approx((0, 0, 255), abs=60)
+    # Decoded at reduced scale, but still wide enough once turned upright
+    assert decoded == [(1024, 768), (1024, 768)]
@@ -0,0 +1,322 @@
+"""
+Unit tests for tagline_backend_app.routes.photos
+Covers: GET /photos offset and cursor pagination; conditional requests (ETag,
+If-None-Match, If-Modified-Since, 304) on the image routes; GET
+/photos/{id}/original (redirects to provider links, byte ranges on the
+FileResponse and streamed branches)
+"""
+
+import base64
+import io
+import uuid
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from tagline_backend_app.db import get_db
+from tagline_backend_app.deps import verify_api_key
+from tagline_backend_app.models import Photo
+from tagline_backend_app.routes import photos
+from tagline_backend_app.storage.filesystem import FilesystemStorageProvider
+from tagline_backend_app.storage.memory import InMemoryStorageProvider
+
+pytestmark = pytest.mark.unit
+
+DATA = bytes(range(256)) * 4
+
+
+@pytest.fixture
+def provider():
+    provider = InMemoryStorageProvider()
+    provider._store["a.jpg"] = DATA
+    return provider
+
+
+@pytest.fixture
+def app(session_factory, provider):
+    app = FastAPI()
+    app.include_router(photos.router)
+
+    def _db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = _db
+    app.dependency_overrides[verify_api_key] = lambda: None
+    app.state.get_photo_storage_provider = lambda _app: provider
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return TestClient(app)
+
+
+@pytest.fixture
+def local_client(app, tmp_path):
+    (tmp_path / "a.jpg").write_bytes(DATA)
+    provider = FilesystemStorageProvider(tmp_path)
+    app.state.get_photo_storage_provider = lambda _app: provider
+    return TestClient(app)
+
+
+def _jpeg(size=(64, 48)) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", size, "red").save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def _add(session_factory, filename="a.jpg", **columns) -> str:
+    db = session_factory()
+    photo = Photo(filename=filename, **columns)
+    db.add(photo)
+    db.commit()
+    photo_id = str(photo.id)
+    db.close()
+    return photo_id
+
+
+def _pages(client, **params):
+    """Follow next_cursor from the first page; return the pages' ids."""
+    pages = []
+    body = client.get("/photos", params=params).json()
+    while True:
+        pages.append([item["id"] for item in body["items"]])
+        if body["next_cursor"] is None:
+            return pages
+        # Cursor pages skip the count
+        assert body["total"] is None or len(pages) == 1
+        body = client.get(
+            "/photos", params={"limit": params["limit"], "cursor": body["next_cursor"]}
+        ).json()
+
+
+def test_cursor_pages_match_offset_order(client, session_factory):
+    for i in range(7):
+        _add(session_factory, filename=f"{i}.jpg")
+    everything = client.get("/photos", params={"limit": 100}).json()
+    assert everything["total"] == 7
+    assert everything["next_cursor"] is None
+    ids = [item["id"] for item in everything["items"]]
+
+    # Offset page first, then cursors from its next_cursor
+    pages = _pages(client, limit=3)
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert sum(pages, []) == ids
+    offset_page = client.get("/photos", params={"limit": 3, "offset": 3}).json()
+    assert [item["id"] for item in offset_page["items"]] == pages[1]
+
+
+def test_cursor_breaks_created_at_ties_by_id(client, session_factory):
+    created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    ids = sorted(
+        (_add(session_factory, filename=name, created_at=created_at) for name in "ab"),
+        key=lambda photo_id: uuid.UUID(photo_id).hex,
+    )
+    # Each page's cursor lands between the two rows sharing created_at
+    pages = _pages(client, limit=1)
+    assert pages == [[ids[0]], [ids[1]]]
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "garbage!",
+        base64.urlsafe_b64encode(b"not json").decode(),
+        base64.urlsafe_b64encode(b'["2024-01-01T00:00:00", "nope"]').decode(),
+        base64.urlsafe_b64encode(b'{"a": 1}').decode(),
+    ],
+    ids=["not-base64", "not-json", "bad-uuid", "wrong-shape"],
+)
+def test_invalid_cursor_is_rejected(client, session_factory, cursor):
+    _add(session_factory)
+    r = client.get("/photos", params={"cursor": cursor})
+    assert r.status_code == 422
+
+
+def test_cursor_cannot_be_combined_with_offset(client, session_factory):
+    _add(session_factory)
+    _add(session_factory, filename="b.jpg")
+    cursor = client.get("/photos", params={"limit": 1}).json()["next_cursor"]
+    assert cursor is not None
+    r = client.get("/photos", params={"offset": 1, "cursor": cursor})
+    assert r.status_code == 422
+
+
+class _NoStorageProvider(InMemoryStorageProvider):
+    """Fails any attempt to read storage."""
+
+    def retrieve(self, key):
+        raise AssertionError(f"storage was read for {key}")
+
+
+@pytest.mark.parametrize("route", ["image", "thumbnail"])
+def test_rendition_etag_is_stable(client, session_factory, provider, route):
+    provider._store["p.jpg"] = _jpeg()
+    photo_id = _add(session_factory, filename="p.jpg", content_hash="h1")
+    first = client.get(f"/photos/{photo_id}/{route}")
+    second = client.get(f"/photos/{photo_id}/{route}")
+    assert first.status_code == second.status_code == 200
+    assert first.headers["etag"] == second.headers["etag"]
+    assert first.headers["last-modified"] == second.headers["last-modified"]
+    assert "cache-control" in first.headers
+
+    # Each rendition of a photo has its own ETag
+    other = "image" if route == "thumbnail" else "thumbnail"
+    assert client.get(f"/photos/{photo_id}/{other}").headers["etag"] != (
+        first.headers["etag"]
+    )
+
+
+@pytest.mark.parametrize(
+    "if_none_match",
+    ["{etag}", "W/{etag}", '"nope", {etag}', "*"],
+    ids=["exact", "weak", "list", "star"],
+)
+def test_if_none_match_answers_304_without_storage(
+    app, session_factory, provider, if_none_match
+):
+    provider._store["p.jpg"] = _jpeg()
+    photo_id = _add(session_factory, filename="p.jpg", content_hash="h1")
+    etag = TestClient(app).get(f"/photos/{photo_id}/thumbnail").headers["etag"]
+
+    app.state.get_photo_storage_provider = lambda _app: _NoStorageProvider()
+    r = TestClient(app).get(
+        f"/photos/{photo_id}/thumbnail",
+        headers={"If-None-Match": if_none_match.format(etag=etag)},
+    )
+    assert r.status_code == 304
+    assert r.headers["etag"] == etag
+    assert r.content == b""
+
+
+def test_if_none_match_mismatch_renders(client, session_factory, provider):
+    provider._store["p.jpg"] = _jpeg()
+    photo_id = _add(session_factory, filename="p.jpg", content_hash="h1")
+    r = client.get(f"/photos/{photo_id}/image", headers={"If-None-Match": '"nope"'})
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "image/jpeg"
+
+
+def test_if_modified_since(client, session_factory, provider):
+    provider._store["p.jpg"] = _jpeg()
+    photo_id = _add(session_factory, filename="p.jpg", content_hash="h1")
+    url = f"/photos/{photo_id}/image"
+    last_modified = client.get(url).headers["last-modified"]
+
+    assert client.get(
+        url, headers={"If-Modified-Since": last_modified}
+    ).status_code == (304)
+    earlier = format_datetime(
+        datetime.now(timezone.utc) - timedelta(days=1), usegmt=True
+    )
+    assert client.get(url, headers={"If-Modified-Since": earlier}).status_code == 200
+    # Invalid dates are ignored, and If-None-Match takes precedence
+    assert client.get(url, headers={"If-Modified-Since": "soon"}).status_code == 200
+    r = client.get(
+        url, headers={"If-Modified-Since": last_modified, "If-None-Match": '"nope"'}
+    )
+    assert r.status_code == 200
+
+
+class _LinkingProvider(InMemoryStorageProvider):
+    """Hands out links per version, like Dropbox temporary links."""
+
+    def get_url(self, key, content_hash=None):
+        return f"https://dl.example/{key}?v={content_hash}"
+
+
+def test_original_redirects_to_provider_link(app, session_factory):
+    app.state.get_photo_storage_provider = lambda _app: _LinkingProvider()
+    photo_id = _add(session_factory, content_hash="h1")
+    r = TestClient(app).get(f"/photos/{photo_id}/original", follow_redirects=False)
+    assert r.status_code == 307
+    assert r.headers["location"] == "https://dl.example/a.jpg?v=h1"
+    # The link expires, so the redirect must not be cached
+    assert r.headers["cache-control"] == "no-store"
+
+
+@pytest.mark.parametrize("branch", ["client", "local_client"])
+def test_original_full_and_ranges(request, session_factory, branch):
+    client = request.getfixturevalue(branch)
+    url = f"/photos/{_add(session_factory)}/original"
+
+    r = client.get(url)
+    assert r.status_code == 200
+    assert r.content == DATA
+    assert r.headers["accept-ranges"] == "bytes"
+    assert r.headers["content-type"] == "image/jpeg"
+
+    r = client.get(url, headers={"Range": "bytes=10-19"})
+    assert r.status_code == 206
+    assert r.headers["content-range"] == f"bytes 10-19/{len(DATA)}"
+    assert r.content == DATA[10:20]
+
+    # Open-ended
+    r = client.get(url, headers={"Range": "bytes=1000-"})
+    assert r.status_code == 206
+    assert r.headers["content-range"] == f"bytes 1000-1023/{len(DATA)}"
+    assert r.content == DATA[1000:]
+
+    # Suffix
+    r = client.get(url, headers={"Range": "bytes=-5"})
+    assert r.status_code == 206
+    assert r.headers["content-range"] == f"bytes 1019-1023/{len(DATA)}"
+    assert r.content == DATA[-5:]
+
+    # Unsatisfiable
+    r = client.get(url, headers={"Range": "bytes=5000-"})
+    assert r.status_code == 416
+    assert r.headers["content-range"] == f"bytes */{len(DATA)}"
+
+
+@pytest.mark.parametrize("header", ["bytes=abc", "bytes=5-2", "items=0-1"])
+def test_streamed_original_ignores_malformed_range(client, session_factory, header):
+    url = f"/photos/{_add(session_factory)}/original"
+    r = client.get(url, headers={"Range": header})
+    assert r.status_code == 200
+    assert r.content == DATA
+
+
+@pytest.mark.parametrize("header", ["bytes=abc", "bytes=5-2"])
+def test_local_original_rejects_malformed_range(local_client, session_factory, header):
+    # Starlette's FileResponse answers malformed ranges with 400
+    url = f"/photos/{_add(session_factory)}/original"
+    assert local_client.get(url, headers={"Range": header}).status_code == 400
+
+
+def test_streamed_original_honours_if_range(client, session_factory):
+    url = f"/photos/{_add(session_factory, content_hash='abc')}/original"
+    etag = client.get(url).headers["etag"]
+    assert etag == '"abc"'
+
+    r = client.get(url, headers={"Range": "bytes=0-3", "If-Range": etag})
+    assert r.status_code == 206
+    assert r.content == DATA[:4]
+    # The file changed since the partial download: send all of it
+    r = client.get(url, headers={"Range": "bytes=0-3", "If-Range": '"old"'})
+    assert r.status_code == 200
+    assert r.content == DATA
+
+
+def test_local_original_honours_if_range(local_client, session_factory):
+    url = f"/photos/{_add(session_factory)}/original"
+    etag = local_client.get(url).headers["etag"]
+    r = local_client.get(url, headers={"Range": "bytes=0-3", "If-Range": etag})
+    assert r.status_code == 206
+    r = local_client.get(url, headers={"Range": "bytes=0-3", "If-Range": '"old"'})
+    assert r.status_code == 200
+
+
+def test_original_not_found(client, session_factory):
+    missing = _add(session_factory, filename="gone.jpg")
+    assert client.get(f"/photos/{missing}/original").status_code == 404
+    unknown = "00000000-0000-0000-0000-000000000000"
+    assert client.get(f"/photos/{unknown}/original").status_code == 404
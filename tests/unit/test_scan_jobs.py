@@ -0,0 +1,274 @@
+"""
+Unit tests for tagline_backend_app.scan_jobs.ScanJobRunner
+Covers: recording jobs, deduplicating concurrent submits (in and across
+processes), failures, orphaned jobs, resuming interrupted scans, stopping a
+scan on shutdown or when its lock is lost, latest job, progress flushes on
+file SQLite
+"""
+
+import io
+import threading
+import time
+
+import pytest
+from PIL import Image
+from sqlalchemy.orm import sessionmaker
+
+from tagline_backend_app.config import clear_settings_cache
+from tagline_backend_app.crud.photo import PhotoRepository
+from tagline_backend_app.crud.scan_checkpoint import ScanCheckpointRepository
+from tagline_backend_app.crud.scan_job import ScanJobRepository
+from tagline_backend_app.db import get_engine
+from tagline_backend_app.models import Base
+from tagline_backend_app.scan_jobs import ScanJobRunner
+from tagline_backend_app.scan_lock import ScanLock
+from tagline_backend_app.scanner import checkpoint_scope
+from tagline_backend_app.storage.memory import InMemoryStorageProvider
+
+pytestmark = pytest.mark.unit
+
+
+def _jpeg(size=(20, 10)) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", size, "red").save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+class _GatedProvider(InMemoryStorageProvider):
+    """Blocks listing until released, so a scan can be caught mid-run."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def list(self, prefix=None):
+        self.release.wait(5)
+        if "fail" in self._store:
+            raise RuntimeError("listing exploded")
+        return super().list(prefix)
+
+
+@pytest.fixture
+def one_file_per_batch(monkeypatch):
+    monkeypatch.setenv("SCAN_BATCH_SIZE", "1")
+    clear_settings_cache()
+    yield
+    clear_settings_cache()
+
+
+def _wait_for(runner, timeout=10):
+    deadline = time.monotonic() + timeout
+    while runner.current_job_id is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert runner.current_job_id is None
+
+
+def _job(session_factory, job_id):
+    db = session_factory()
+    try:
+        job = ScanJobRepository(db).get(job_id)
+    finally:
+        db.close()
+    assert job is not None
+    return job
+
+
+def test_runner_records_a_finished_job(session_factory):
+    provider = _GatedProvider()
+    provider._store["a.jpg"] = _jpeg()
+    provider._store["b.jpg"] = _jpeg()
+    provider._store["broken.jpg"] = b"nope"
+    runner = ScanJobRunner(session_factory, flush_interval=0.05)
+
+    job_id, started = runner.submit(provider)
+    assert started is True
+    assert runner.submit(provider) == (job_id, False)
+    assert _job(session_factory, job_id).status == "running"
+
+    provider.release.set()
+    _wait_for(runner)
+    job = _job(session_factory, job_id)
+    assert job.status == "succeeded"
+    assert job.finished_at is not None
+    assert (job.files_seen, job.imported, job.skipped) == (3, 2, 1)
+    db = session_factory()
+    assert PhotoRepository(db).count() == 2
+    latest = ScanJobRepository(db).latest()
+    assert latest is not None and latest.id == job_id
+    db.close()
+    runner.shutdown()
+
+
+def test_runner_records_failures(session_factory):
+    provider = _GatedProvider()
+    provider._store["fail"] = b""
+    provider.release.set()
+    runner = ScanJobRunner(session_factory)
+
+    job_id, _ = runner.submit(provider)
+    _wait_for(runner)
+    job = _job(session_factory, job_id)
+    assert job.status == "failed"
+    assert job.error is not None and "listing exploded" in job.error
+    assert runner.progress.as_dict()["error"] == job.error
+
+    # The runner accepts a new scan after a failure
+    del provider._store["fail"]
+    next_id, started = runner.submit(provider)
+    assert started and next_id != job_id
+    _wait_for(runner)
+    runner.shutdown()
+
+
+def test_runner_defers_to_a_scan_in_another_process(session_factory):
+    provider = _GatedProvider()
+    provider._store["a.jpg"] = _jpeg()
+    # Two runners on one database stand in for two worker processes
+    first = ScanJobRunner(session_factory, flush_interval=0.05)
+    second = ScanJobRunner(session_factory, flush_interval=0.05)
+
+    job_id, started = first.submit(provider)
+    assert started
+    assert second.submit(provider) == (job_id, False)
+
+    provider.release.set()
+    _wait_for(first)
+    next_id, started = second.submit(provider)
+    assert started and next_id != job_id
+    _wait_for(second)
+    first.shutdown()
+    second.shutdown()
+
+
+def test_runner_fails_jobs_orphaned_by_a_dead_worker(session_factory):
+    db = session_factory()
+    orphan = ScanJobRepository(db).create()
+    db.close()
+    provider = _GatedProvider()
+    provider.release.set()
+    runner = ScanJobRunner(session_factory)
+
+    runner.submit(provider)
+    _wait_for(runner)
+    job = _job(session_factory, orphan.id)
+    assert job.status == "failed"
+    assert job.error is not None and "Interrupted" in job.error
+    runner.shutdown()
+
+
+def test_runner_resumes_an_interrupted_scan(session_factory):
+    provider = _GatedProvider()
+    provider.release.set()
+    provider._store["a.jpg"] = _jpeg()
+    runner = ScanJobRunner(session_factory)
+    assert runner.resume(provider) is None  # Nothing to resume
+
+    db = session_factory()
+    orphan_id = ScanJobRepository(db).create().id
+    ScanCheckpointRepository(db).create(
+        checkpoint_scope(provider), orphan_id, None, [{"kind": "file", "key": "a.jpg"}]
+    )
+    db.close()
+
+    job_id = runner.resume(provider)
+    assert job_id is not None
+    _wait_for(runner)
+    job = _job(session_factory, job_id)
+    assert job.status == "succeeded"
+    assert job.resumed_from == orphan_id
+    assert job.imported == 1
+    assert _job(session_factory, orphan_id).status == "failed"
+    runner.shutdown()
+
+
+def test_shutdown_interrupts_a_running_scan(session_factory, one_file_per_batch):
+    provider = _GatedProvider()
+    for name in ("a.jpg", "b.jpg", "c.jpg"):
+        provider._store[name] = _jpeg()
+    runner = ScanJobRunner(session_factory, flush_interval=0.05)
+
+    job_id, _ = runner.submit(provider)
+    runner.shutdown()
+    provider.release.set()
+    _wait_for(runner)
+    job = _job(session_factory, job_id)
+    assert job.status == "failed"
+    assert job.error is not None and job.error.startswith("Interrupted")
+    # Stopped after the first batch
+    assert job.imported == 1
+
+    # The next process resumes from the checkpoint
+    resumed = ScanJobRunner(session_factory)
+    resumed_id = resumed.resume(provider)
+    assert resumed_id is not None
+    _wait_for(resumed)
+    job = _job(session_factory, resumed_id)
+    assert job.status == "succeeded"
+    assert job.resumed_from == job_id
+    assert job.imported == 2
+    db = session_factory()
+    assert PhotoRepository(db).count() == 3
+    db.close()
+    resumed.shutdown()
+
+
+class _LosingLock(ScanLock):
+    """Granted, then lost by the first heartbeat."""
+
+    def __init__(self):
+        self.heartbeats = threading.Event()
+
+    def acquire(self):
+        return True
+
+    def heartbeat(self):
+        self.heartbeats.set()
+        return False
+
+    def release(self):
+        pass
+
+
+def test_lost_scan_lock_stops_the_scan(session_factory, one_file_per_batch):
+    provider = _GatedProvider()
+    for name in ("a.jpg", "b.jpg", "c.jpg"):
+        provider._store[name] = _jpeg()
+    lock = _LosingLock()
+    runner = ScanJobRunner(
+        session_factory, flush_interval=0.01, lock_factory=lambda: lock
+    )
+
+    job_id, _ = runner.submit(provider)
+    assert lock.heartbeats.wait(5)
+    provider.release.set()
+    _wait_for(runner)
+    job = _job(session_factory, job_id)
+    assert job.status == "failed"
+    assert job.error is not None and job.error.startswith("Interrupted")
+    assert job.imported == 1
+    runner.shutdown()
+
+
+def test_runner_flushes_progress_without_disturbing_the_scan(tmp_path):
+    # A file DB gives each session its own connection, so frequent progress
+    # flushes from the flusher thread can't roll back or interleave with the
+    # scan's transactions
+    engine = get_engine(f"sqlite:///{tmp_path / 'scan.db'}")
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    provider = _GatedProvider()
+    provider.release.set()
+    data = _jpeg()
+    for i in range(2000):
+        provider._store[f"{i}.jpg"] = data
+    runner = ScanJobRunner(session_factory, flush_interval=0.0005)
+
+    job_id, _ = runner.submit(provider)
+    _wait_for(runner, timeout=60)
+    job = _job(session_factory, job_id)
+    assert job.status == "succeeded", job.error
+    db = session_factory()
+    assert job.imported == PhotoRepository(db).count() == 2000
+    db.close()
+    runner.shutdown()
+    engine.dispose()
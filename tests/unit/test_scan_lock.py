@@ -0,0 +1,80 @@
+"""
+Unit tests for tagline_backend_app.scan_lock
+Covers: lease lock exclusion, expiry takeover, heartbeat and release; advisory lock
+connection handling (mocked); lock selection by dialect
+"""
+
+from datetime import UTC, datetime, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy import update
+
+from tagline_backend_app.models import ScanLease
+from tagline_backend_app.scan_lock import (
+    AdvisoryScanLock,
+    LeaseScanLock,
+    create_scan_lock,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def _expire(session_factory):
+    db = session_factory()
+    db.execute(
+        update(ScanLease).values(expires_at=datetime.now(UTC) - timedelta(seconds=1))
+    )
+    db.commit()
+    db.close()
+
+
+def test_lease_lock_is_exclusive(session_factory):
+    first = LeaseScanLock(session_factory)
+    second = LeaseScanLock(session_factory)
+    assert first.acquire() is True
+    assert second.acquire() is False
+    assert first.heartbeat() is True
+
+    first.release()
+    assert second.acquire() is True
+    assert first.acquire() is False
+
+
+def test_lease_lock_expires_and_is_taken_over(session_factory):
+    crashed = LeaseScanLock(session_factory, lease_seconds=60)
+    other = LeaseScanLock(session_factory, lease_seconds=60)
+    assert crashed.acquire() is True
+    _expire(session_factory)
+
+    assert other.acquire() is True
+    # The old holder finds out on its next heartbeat, and can't release it
+    assert crashed.heartbeat() is False
+    crashed.release()
+    assert LeaseScanLock(session_factory).acquire() is False
+
+
+def test_advisory_lock_holds_its_connection():
+    engine = MagicMock()
+    conn = engine.connect.return_value
+    conn.scalar.return_value = True
+    lock = AdvisoryScanLock(engine, key=42)
+    assert lock.acquire() is True
+    conn.close.assert_not_called()
+    assert lock.heartbeat() is True
+
+    lock.release()
+    conn.close.assert_called_once()
+    assert lock.heartbeat() is False
+
+
+def test_advisory_lock_busy_closes_connection():
+    engine = MagicMock()
+    conn = engine.connect.return_value
+    conn.scalar.return_value = False
+    assert AdvisoryScanLock(engine).acquire() is False
+    conn.close.assert_called_once()
+
+
+def test_create_scan_lock_uses_lease_on_sqlite(session_factory):
+    assert isinstance(create_scan_lock(session_factory), LeaseScanLock)
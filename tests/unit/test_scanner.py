@@ -0,0 +1,537 @@
+"""
+Unit tests for tagline_backend_app.scanner
+Covers: importing new files, skipping corrupt ones, header probing, delta scans
+from a saved cursor, reconciling edits/moves/deletions by content hash, resuming
+checkpointed scans, rendition pre-generation
+"""
+
+import io
+import os
+import threading
+import time
+import uuid
+from typing import Optional
+
+import pytest
+from PIL import Image, UnidentifiedImageError
+
+from tagline_backend_app import caching
+from tagline_backend_app.caching import derivative_key
+from tagline_backend_app.crud.photo import PhotoRepository
+from tagline_backend_app.crud.scan_checkpoint import ScanCheckpointRepository
+from tagline_backend_app.crud.storage_cursor import StorageCursorRepository
+from tagline_backend_app.disk_cache import DiskCache
+from tagline_backend_app.imaging import IMAGE_TRANSFORM, THUMBNAIL_TRANSFORM
+from tagline_backend_app.scanner import (
+    PROBE_INITIAL_BYTES,
+    Pregenerator,
+    ScanProgress,
+    probe_dimensions,
+    run_scan,
+)
+from tagline_backend_app.storage.filesystem import FilesystemStorageProvider
+from tagline_backend_app.storage.memory import InMemoryStorageProvider
+from tagline_backend_app.storage.provider import (
+    StorageChanges,
+    StorageCursorReset,
+    StorageEntry,
+    content_hash_stream,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def _jpeg(size) -> bytes:
+    buf = io.BytesIO()
+    Image.new("RGB", size, "blue").save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def db_session(session_factory):
+    session = session_factory()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def provider():
+    p = InMemoryStorageProvider()
+    p._store["a.jpg"] = _jpeg((800, 600))
+    p._store["b.jpg"] = _jpeg((300, 400))
+    p._store["broken.jpg"] = b"not an image"
+    return p
+
+
+def test_run_scan_imports_new_files(db_session, provider):
+    progress = ScanProgress()
+    imported = run_scan(provider, db_session, progress)
+    assert sorted(imported) == ["a.jpg", "b.jpg"]
+    photos = {p.filename: p for p in PhotoRepository(db_session).list()}
+    assert (photos["a.jpg"].width, photos["a.jpg"].height) == (800, 600)
+    assert (photos["b.jpg"].width, photos["b.jpg"].height) == (300, 400)
+    counts = progress.as_dict()
+    assert counts["files_found"] == 3
+    assert counts["imported"] == 2
+    assert counts["skipped"] == 1
+
+    # A second scan finds nothing new
+    assert run_scan(provider, db_session, ScanProgress()) == []
+
+
+def test_run_scan_filters_extensions(db_session, provider):
+    provider._store["notes.txt"] = b"not a photo"
+    progress = ScanProgress()
+    imported = run_scan(provider, db_session, progress, extensions=[".jpg"])
+    assert sorted(imported) == ["a.jpg", "b.jpg"]
+    assert progress.as_dict()["files_found"] == 3
+
+
+def test_run_scan_batches_inserts(db_session, provider):
+    for i in range(5):
+        provider._store[f"extra{i}.jpg"] = _jpeg((10, 10))
+    progress = ScanProgress()
+    imported = run_scan(provider, db_session, progress, batch_size=2)
+    assert len(imported) == 7
+    assert PhotoRepository(db_session).count() == 7
+    assert progress.as_dict()["imported"] == 7
+
+
+def test_run_scan_probes_files_concurrently(db_session):
+    class SlowProvider(InMemoryStorageProvider):
+        def __init__(self):
+            super().__init__()
+            self.active = 0
+            self.peak = 0
+            self.lock = threading.Lock()
+
+        def read_prefix(self, key, length):
+            with self.lock:
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            time.sleep(0.02)
+            with self.lock:
+                self.active -= 1
+            return super().read_prefix(key, length)
+
+    provider = SlowProvider()
+    for i in range(20):
+        provider._store[f"p{i}.jpg"] = _jpeg((10, 10))
+    imported = run_scan(provider, db_session, ScanProgress(), workers=4)
+    assert len(imported) == 20
+    assert 1 < provider.peak <= 4
+
+
+class _CountingProvider(InMemoryStorageProvider):
+    def __init__(self):
+        super().__init__()
+        self.prefix_reads = []
+        self.full_reads = 0
+
+    def read_prefix(self, key, length):
+        self.prefix_reads.append(length)
+        return super().read_prefix(key, length)
+
+    def retrieve(self, key):
+        self.full_reads += 1
+        return super().retrieve(key)
+
+
+def test_run_scan_reconciles_edits_moves_and_deletes(db_session, provider):
+    run_scan(provider, db_session, ScanProgress())
+    repo = PhotoRepository(db_session)
+    before = {p.filename: p for p in repo.list()}
+    repo.update(before["a.jpg"].id, description="kept across the move")
+    a_id, b_id, b_hash = (
+        before["a.jpg"].id,
+        before["b.jpg"].id,
+        before["b.jpg"].content_hash,
+    )
+
+    provider._store["album/a.jpg"] = provider._store.pop("a.jpg")
+    provider._store["b.jpg"] = _jpeg((30, 20))
+    provider._store["c.jpg"] = _jpeg((5, 5))
+    provider._store["gone.jpg"] = _jpeg((6, 6))
+    run_scan(provider, db_session, ScanProgress())
+    del provider._store["gone.jpg"]
+    progress = ScanProgress()
+    assert run_scan(provider, db_session, progress) == []
+
+    photos = {p.filename: p for p in repo.list()}
+    assert sorted(photos) == ["album/a.jpg", "b.jpg", "c.jpg"]
+    assert photos["album/a.jpg"].id == a_id
+    assert photos["album/a.jpg"].description == "kept across the move"
+    assert photos["b.jpg"].id == b_id
+    assert (photos["b.jpg"].width, photos["b.jpg"].height) == (30, 20)
+    assert photos["b.jpg"].content_hash != b_hash
+    counts = progress.as_dict()
+    assert (counts["deleted"], counts["moved"], counts["modified"]) == (1, 0, 0)
+
+
+def test_run_scan_counts_moves_and_modifications(db_session, provider):
+    run_scan(provider, db_session, ScanProgress())
+    provider._store["renamed.jpg"] = provider._store.pop("a.jpg")
+    provider._store["b.jpg"] = _jpeg((30, 20))
+    progress = ScanProgress()
+    assert run_scan(provider, db_session, progress) == []
+    counts = progress.as_dict()
+    assert (counts["moved"], counts["modified"], counts["deleted"]) == (1, 1, 0)
+    assert counts["imported"] == 0
+
+
+def test_run_scan_skips_unchanged_files_by_size_and_mtime(db_session, tmp_path):
+    root = tmp_path / "photos"
+    root.mkdir()
+    (root / "a.jpg").write_bytes(_jpeg((10, 10)))
+    (root / "b.jpg").write_bytes(_jpeg((10, 10)))
+
+    class Provider(FilesystemStorageProvider):
+        hashed: list = []
+
+        def content_hash(self, key):
+            self.hashed.append(key)
+            return super().content_hash(key)
+
+    provider = Provider(root)
+    run_scan(provider, db_session, ScanProgress())
+    assert sorted(provider.hashed) == ["a.jpg", "b.jpg"]
+    provider.hashed.clear()
+    run_scan(provider, db_session, ScanProgress())
+    assert provider.hashed == []
+
+    (root / "b.jpg").write_bytes(_jpeg((40, 20)))
+    os.utime(root / "b.jpg", (1, 1))
+    run_scan(provider, db_session, ScanProgress())
+    assert provider.hashed == ["b.jpg"]
+    photo = PhotoRepository(db_session).list_by_filenames(["b.jpg"])[0]
+    assert (photo.width, photo.height, photo.mtime) == (40, 20, 1.0)
+
+
+def test_run_scan_keeps_rows_when_storage_lists_nothing(db_session, provider):
+    run_scan(provider, db_session, ScanProgress())
+    provider._store.clear()
+    progress = ScanProgress()
+    run_scan(provider, db_session, progress)
+    assert PhotoRepository(db_session).count() == 2
+    assert progress.as_dict()["deleted"] == 0
+
+
+def test_run_scan_backfills_legacy_rows(db_session, provider):
+    repo = PhotoRepository(db_session)
+    repo.create("a.jpg", {"description": "legacy"})
+    run_scan(provider, db_session, ScanProgress())
+    photo = repo.list_by_filenames(["a.jpg"])[0]
+    assert photo.description == "legacy"
+    assert photo.content_hash == provider.content_hash("a.jpg")
+    assert (photo.width, photo.height) == (800, 600)
+
+
+def test_probe_dimensions_reads_only_header():
+    provider = _CountingProvider()
+    buf = io.BytesIO()
+    noise = Image.effect_noise((1200, 900), 50).convert("RGB")
+    noise.save(buf, format="JPEG")
+    provider._store["big.jpg"] = buf.getvalue()
+    assert len(provider._store["big.jpg"]) > PROBE_INITIAL_BYTES
+
+    assert probe_dimensions(provider, "big.jpg") == (1200, 900)
+    assert provider.prefix_reads == [PROBE_INITIAL_BYTES]
+    assert provider.full_reads == 0
+
+
+def test_probe_dimensions_grows_prefix_for_large_headers():
+    provider = _CountingProvider()
+    buf = io.BytesIO()
+    # A ~60KB EXIF segment pushes the frame header past the first 16KB
+    exif = b"Exif\x00\x00" + b"\x00" * 60000
+    Image.new("RGB", (64, 48)).save(buf, format="JPEG", exif=exif)
+    provider._store["exif.jpg"] = buf.getvalue()
+
+    assert probe_dimensions(provider, "exif.jpg", initial_bytes=16 * 1024) == (64, 48)
+    assert provider.prefix_reads == [16 * 1024, 64 * 1024]
+    assert provider.full_reads == 0
+
+
+def test_probe_dimensions_falls_back_to_full_read():
+    provider = _CountingProvider()
+    buf = io.BytesIO()
+    Image.effect_noise((400, 300), 50).convert("RGB").save(buf, format="WEBP")
+    provider._store["a.webp"] = buf.getvalue()
+
+    assert probe_dimensions(provider, "a.webp", initial_bytes=16, max_bytes=64) == (
+        400,
+        300,
+    )
+    assert provider.prefix_reads == [16, 64]
+    assert provider.full_reads == 1
+
+
+def test_probe_dimensions_raises_for_corrupt_file():
+    provider = _CountingProvider()
+    provider._store["broken.jpg"] = b"not an image"
+    with pytest.raises(UnidentifiedImageError):
+        probe_dimensions(provider, "broken.jpg")
+    assert provider.full_reads == 0
+
+
+def test_run_scan_pregenerates_renditions(db_session, provider, tmp_path):
+    cache = DiskCache(tmp_path, max_bytes=10 * 1024 * 1024)
+    progress = ScanProgress()
+    pregenerator = Pregenerator(cache, progress, thumbnails=True, images=True)
+    run_scan(provider, db_session, progress, pregenerator)
+    pregenerator.close()
+
+    for photo in PhotoRepository(db_session).list():
+        thumb = cache.get(
+            derivative_key(photo.id, THUMBNAIL_TRANSFORM, photo.content_hash)
+        )
+        image = cache.get(derivative_key(photo.id, IMAGE_TRANSFORM, photo.content_hash))
+        assert thumb is not None and image is not None
+        assert Image.open(io.BytesIO(thumb)).format == "WEBP"
+        assert Image.open(io.BytesIO(image)).format == "JPEG"
+    counts = progress.as_dict()
+    assert counts["thumbnails_generated"] == 2
+    assert counts["images_generated"] == 2
+    assert counts["pregenerate_failed"] == 0
+
+
+class _RenderingProvider(_CountingProvider):
+    """Provider that renders thumbnails server-side, like Dropbox."""
+
+    def __init__(self):
+        super().__init__()
+        self.rendition_calls = []
+
+    def content_hash(self, key):
+        # Like Dropbox, hashes come without downloading the file
+        return content_hash_stream(io.BytesIO(self._store[key]))
+
+    def max_rendition_size(self):
+        return (2048, 1536)
+
+    def get_renditions(self, keys, min_size):
+        keys = list(keys)
+        self.rendition_calls.append(keys)
+        return {key: _jpeg((640, 480)) for key in keys if key != "b.jpg"}
+
+
+def test_run_scan_pregenerates_thumbnails_from_provider_renditions(
+    db_session, tmp_path
+):
+    provider = _RenderingProvider()
+    provider._store["a.jpg"] = _jpeg((800, 600))
+    provider._store["b.jpg"] = _jpeg((800, 600))
+    cache = DiskCache(tmp_path, max_bytes=10 * 1024 * 1024)
+    progress = ScanProgress()
+    pregenerator = Pregenerator(cache, progress, thumbnails=True, images=False)
+    run_scan(provider, db_session, progress, pregenerator)
+    pregenerator.close()
+
+    # One batch call, and no original downloaded just to pre-generate
+    assert [sorted(keys) for keys in provider.rendition_calls] == [["a.jpg", "b.jpg"]]
+    assert provider.full_reads == 0
+    photos = {p.filename: p for p in PhotoRepository(db_session).list()}
+    thumb = cache.get(
+        derivative_key(
+            photos["a.jpg"].id, THUMBNAIL_TRANSFORM, photos["a.jpg"].content_hash
+        )
+    )
+    assert thumb is not None
+    assert Image.open(io.BytesIO(thumb)).size == (512, 384)
+    # No rendition for b.jpg: left for the first view
+    assert progress.as_dict()["thumbnails_generated"] == 1
+
+
+def test_pregenerator_counts_failures(tmp_path):
+    progress = ScanProgress()
+    pregenerator = Pregenerator(
+        DiskCache(tmp_path, max_bytes=1024), progress, thumbnails=True
+    )
+    pregenerator.submit(uuid.uuid4(), b"garbage")
+    pregenerator.close()
+    assert progress.as_dict()["pregenerate_failed"] == 1
+    assert progress.as_dict()["thumbnails_generated"] == 0
+
+
+def test_scan_progress_start_resets_counters():
+    progress = ScanProgress()
+    progress.increment("imported", 5)
+    progress.start()
+    snapshot = progress.as_dict()
+    assert snapshot["running"] is True
+    assert snapshot["imported"] == 0
+    progress.finish("boom")
+    assert progress.as_dict()["running"] is False
+    assert progress.as_dict()["error"] == "boom"
+
+
+class _FeedProvider(InMemoryStorageProvider):
+    """In-memory provider with a scripted change feed."""
+
+    def __init__(self):
+        super().__init__()
+        self.changes: Optional[StorageChanges] = None
+        self.full_listings = 0
+
+    def cursor_scope(self):
+        return "feed:/"
+
+    def list_with_cursor(self):
+        self.full_listings += 1
+        return [StorageEntry(key=key) for key in self._store], "c-full"
+
+    def list_changes(self, cursor):
+        if self.changes is None:
+            raise StorageCursorReset("expired")
+        return self.changes
+
+
+def test_run_scan_delta_applies_changes(db_session):
+    provider = _FeedProvider()
+    provider._store["keep.jpg"] = _jpeg((10, 10))
+    provider._store["edit.jpg"] = _jpeg((10, 10))
+    provider._store["gone.jpg"] = _jpeg((10, 10))
+    run_scan(provider, db_session, ScanProgress())
+    cursors = StorageCursorRepository(db_session)
+    assert cursors.get("feed:/") == "c-full"
+    repo = PhotoRepository(db_session)
+    edited = repo.list_by_filenames(["edit.jpg"])[0]
+    edited_at = edited.updated_at
+
+    provider._store["edit.jpg"] = _jpeg((40, 30))
+    provider._store["new.jpg"] = _jpeg((20, 20))
+    del provider._store["gone.jpg"]
+    provider.changes = StorageChanges(
+        updated=["edit.jpg", "new.jpg"], deleted=["gone.jpg"], cursor="c-2"
+    )
+    progress = ScanProgress()
+    assert run_scan(provider, db_session, progress) == ["new.jpg"]
+
+    assert provider.full_listings == 1
+    assert cursors.get("feed:/") == "c-2"
+    photos = {p.filename: p for p in repo.list()}
+    assert sorted(photos) == ["edit.jpg", "keep.jpg", "new.jpg"]
+    assert (photos["edit.jpg"].width, photos["edit.jpg"].height) == (40, 30)
+    assert photos["edit.jpg"].updated_at > edited_at
+    counts = progress.as_dict()
+    assert (counts["imported"], counts["modified"], counts["deleted"]) == (1, 1, 1)
+
+
+def test_run_scan_delta_invalidates_cached_renditions(
+    db_session, tmp_path, monkeypatch
+):
+    provider = _FeedProvider()
+    provider._store["edit.jpg"] = _jpeg((10, 10))
+    run_scan(provider, db_session, ScanProgress())
+    photo = PhotoRepository(db_session).list()[0]
+    cache = DiskCache(tmp_path, max_bytes=1024 * 1024)
+    monkeypatch.setattr(caching, "DERIVATIVE_CACHE", cache)
+    key = derivative_key(photo.id, THUMBNAIL_TRANSFORM, photo.content_hash)
+    cache.put(key, b"stale")
+
+    provider._store["edit.jpg"] = _jpeg((20, 10))
+    provider.changes = StorageChanges(updated=["edit.jpg"], cursor="c-2")
+    run_scan(provider, db_session, ScanProgress())
+    assert cache.get(key) is None
+
+
+def test_run_scan_falls_back_to_full_listing_on_reset(db_session):
+    provider = _FeedProvider()
+    provider._store["a.jpg"] = _jpeg((10, 10))
+    StorageCursorRepository(db_session).save("feed:/", "expired")
+    assert run_scan(provider, db_session, ScanProgress()) == ["a.jpg"]
+    assert provider.full_listings == 1
+    assert StorageCursorRepository(db_session).get("feed:/") == "c-full"
+
+
+def test_run_scan_full_ignores_saved_cursor(db_session):
+    provider = _FeedProvider()
+    provider.changes = StorageChanges(cursor="c-2")
+    StorageCursorRepository(db_session).save("feed:/", "c-1")
+    provider._store["a.jpg"] = _jpeg((10, 10))
+    assert run_scan(provider, db_session, ScanProgress(), full=True) == ["a.jpg"]
+    assert provider.full_listings == 1
+
+
+class _InterruptedProvider(_FeedProvider):
+    """Feed provider that dies while reading one file, like a killed worker."""
+
+    def __init__(self):
+        super().__init__()
+        self.fail_on: Optional[str] = None
+
+    def content_hash(self, key):
+        if key == self.fail_on:
+            raise RuntimeError("worker killed")
+        return super().content_hash(key)
+
+
+def test_run_scan_resumes_an_interrupted_scan(db_session):
+    provider = _InterruptedProvider()
+    provider._store["gone.jpg"] = _jpeg((5, 5))
+    run_scan(provider, db_session, ScanProgress())
+    del provider._store["gone.jpg"]
+    for i, name in enumerate("abcde"):
+        provider._store[f"{name}.jpg"] = _jpeg((10 + i, 10))
+    provider.fail_on = "c.jpg"
+    job_id = uuid.uuid4()
+
+    with pytest.raises(RuntimeError):
+        run_scan(provider, db_session, ScanProgress(), batch_size=2, full=True)
+    db_session.rollback()
+    repo = PhotoRepository(db_session)
+    # The first batch is committed; deletions wait until the plan is done
+    assert sorted(p.filename for p in repo.list()) == ["a.jpg", "b.jpg", "gone.jpg"]
+    checkpoints = ScanCheckpointRepository(db_session)
+    checkpoint = checkpoints.get("feed:/")
+    assert checkpoint is not None and checkpoint.processed == 2
+
+    provider.fail_on = None
+    progress = ScanProgress()
+    provider.changes = StorageChanges(cursor="not-used")
+    imported = run_scan(provider, db_session, progress, batch_size=2, job_id=job_id)
+
+    assert sorted(imported) == ["c.jpg", "d.jpg", "e.jpg"]
+    assert provider.full_listings == 2  # Not listed again on resume
+    assert sorted(p.filename for p in repo.list()) == [
+        f"{name}.jpg" for name in "abcde"
+    ]
+    counts = progress.as_dict()
+    assert (counts["files_seen"], counts["deleted"]) == (3, 1)
+    assert counts["resumed_from"] is None  # The interrupted run had no job
+    assert checkpoints.get("feed:/") is None
+    assert StorageCursorRepository(db_session).get("feed:/") == "c-full"
+
+
+def test_run_scan_reports_resumed_job(db_session):
+    provider = _InterruptedProvider()
+    provider._store["a.jpg"] = _jpeg((10, 10))
+    provider.fail_on = "a.jpg"
+    job_id = uuid.uuid4()
+    with pytest.raises(RuntimeError):
+        run_scan(provider, db_session, ScanProgress(), job_id=job_id)
+    db_session.rollback()
+
+    provider.fail_on = None
+    progress = ScanProgress()
+    assert run_scan(provider, db_session, progress) == ["a.jpg"]
+    assert progress.as_dict()["resumed_from"] == job_id
+
+
+def test_run_scan_full_discards_checkpoint(db_session):
+    provider = _InterruptedProvider()
+    provider._store["a.jpg"] = _jpeg((10, 10))
+    provider.fail_on = "a.jpg"
+    with pytest.raises(RuntimeError):
+        run_scan(provider, db_session, ScanProgress())
+    db_session.rollback()
+
+    provider.fail_on = None
+    provider._store["b.jpg"] = _jpeg((10, 10))
+    progress = ScanProgress()
+    imported = run_scan(provider, db_session, progress, full=True)
+    assert sorted(imported) == ["a.jpg", "b.jpg"]
+    assert progress.as_dict()["resumed_from"] is None
+    assert provider.full_listings == 2
@@ -67,6 +67,19 @@ def test_photo_model_missing_fields():
         )
 
 
+def test_photo_list_response_next_cursor_defaults_to_none():
+    resp = schemas.PhotoListResponse(total=0, limit=50, offset=0, items=[])
+    assert resp.next_cursor is None
+
+
+def test_photo_list_response_cursor_mode_without_total():
+    resp = schemas.PhotoListResponse(
+        total=None, limit=50, offset=0, items=[], next_cursor="abc"
+    )
+    assert resp.total is None
+    assert resp.next_cursor == "abc"
+
+
 def test_update_metadata_request_valid():
     req = schemas.UpdateMetadataRequest(metadata={"description": "desc"})
     assert req.metadata["description"] == "desc"
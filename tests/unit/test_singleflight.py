@@ -0,0 +1,63 @@
+"""
+Unit tests for tagline_backend_app.singleflight.SingleFlight
+Covers: coalescing concurrent calls, sharing results and errors, counters
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from tagline_backend_app.singleflight import SingleFlight
+
+pytestmark = pytest.mark.unit
+
+
+def test_concurrent_calls_share_one_execution():
+    group = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    runs = []
+
+    def work():
+        runs.append(1)
+        started.set()
+        release.wait(5)
+        return b"thumb"
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        leader = pool.submit(group.do, "k", work)
+        assert started.wait(5)
+        waiters = [pool.submit(group.do, "k", work) for _ in range(7)]
+        # Wait until every waiter has joined the flight before releasing it
+        while group.stats()["coalesced"] < 7:
+            pass
+        release.set()
+        results = [leader.result()] + [w.result() for w in waiters]
+
+    assert results == [b"thumb"] * 8
+    assert len(runs) == 1
+    stats = group.stats()
+    assert stats["executions"] == 1
+    assert stats["coalesced"] == 7
+    assert stats["in_flight"] == 0
+
+
+def test_error_is_shared_and_key_is_released():
+    group = SingleFlight()
+
+    def boom():
+        raise RuntimeError("decode failed")
+
+    with pytest.raises(RuntimeError):
+        group.do("k", boom)
+    # The failed flight is gone, so the next call runs again
+    assert group.do("k", lambda: 42) == 42
+    assert group.stats()["executions"] == 2
+
+
+def test_different_keys_run_independently():
+    group = SingleFlight()
+    assert group.do("a", lambda: 1) == 1
+    assert group.do("b", lambda: 2) == 2
+    assert group.stats() == {"in_flight": 0, "executions": 2, "coalesced": 0}
@@ -0,0 +1,120 @@
+"""
+Unit tests for tagline_backend_app.storage.cached.CachedStorageProvider
+Covers: read-through caching by content hash, hits served from disk, validation
+of downloads, coalesced concurrent misses, delegation to the wrapped provider
+"""
+
+import threading
+import time
+from io import BytesIO
+
+import pytest
+
+from tagline_backend_app.disk_cache import DiskCache
+from tagline_backend_app.storage.cached import CachedStorageProvider
+from tagline_backend_app.storage.memory import InMemoryStorageProvider
+from tagline_backend_app.storage.provider import content_hash_stream
+
+pytestmark = pytest.mark.unit
+
+
+def _hash(data: bytes) -> str:
+    return content_hash_stream(BytesIO(data))
+
+
+class _CountingProvider(InMemoryStorageProvider):
+    def __init__(self, delay=0.0):
+        super().__init__()
+        self.downloads = 0
+        self._delay = delay
+
+    def cursor_scope(self):
+        return "remote:/"
+
+    def retrieve(self, key):
+        self.downloads += 1
+        time.sleep(self._delay)
+        return super().retrieve(key)
+
+
+@pytest.fixture
+def inner():
+    p = _CountingProvider()
+    p._store["a.jpg"] = b"original bytes"
+    return p
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DiskCache(tmp_path / "originals", max_bytes=1024)
+
+
+def test_retrieve_version_reads_through(inner, cache):
+    provider = CachedStorageProvider(inner, cache)
+    digest = _hash(b"original bytes")
+    with provider.retrieve_version("a.jpg", digest) as f:
+        assert f.read() == b"original bytes"
+    with provider.retrieve_version("a.jpg", digest) as f:
+        assert f.read() == b"original bytes"
+        assert hasattr(f, "fileno")  # A local file, not a download
+    assert inner.downloads == 1
+    assert provider.stats()["hits"] == 1
+
+
+def test_edited_original_is_a_miss(inner, cache):
+    provider = CachedStorageProvider(inner, cache)
+    provider.retrieve_version("a.jpg", _hash(b"original bytes")).close()
+    inner._store["a.jpg"] = b"edited"
+    with provider.retrieve_version("a.jpg", _hash(b"edited")) as f:
+        assert f.read() == b"edited"
+    assert inner.downloads == 2
+
+
+def test_download_not_matching_hash_is_not_cached(inner, cache):
+    provider = CachedStorageProvider(inner, cache)
+    # The row's hash is stale: the file changed after the last scan
+    for _ in range(2):
+        with provider.retrieve_version("a.jpg", "stale-hash") as f:
+            assert f.read() == b"original bytes"
+    assert inner.downloads == 2
+    assert cache.stats()["current_bytes"] == 0
+
+
+def test_legacy_rows_bypass_the_cache(inner, cache):
+    provider = CachedStorageProvider(inner, cache)
+    provider.retrieve_version("a.jpg", None).close()
+    provider.retrieve("a.jpg").close()
+    assert inner.downloads == 2
+    assert cache.stats()["misses"] == 0
+
+
+def test_concurrent_misses_share_one_download(cache):
+    inner = _CountingProvider(delay=0.05)
+    inner._store["a.jpg"] = b"original bytes"
+    provider = CachedStorageProvider(inner, cache)
+    digest = _hash(b"original bytes")
+    results = []
+    threads = [
+        threading.Thread(
+            target=lambda: results.append(
+                provider.retrieve_version("a.jpg", digest).read()
+            )
+        )
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [b"original bytes"] * 4
+    assert inner.downloads == 1
+
+
+def test_delegates_everything_else(inner, cache):
+    provider = CachedStorageProvider(inner, cache)
+    assert list(provider.list()) == ["a.jpg"]
+    assert provider.cursor_scope() == "remote:/"
+    assert provider.read_prefix("a.jpg", 8) == b"original"
+    assert provider.content_hash("a.jpg") == _hash(b"original bytes")
+    assert provider.get_url("a.jpg") is None
+    assert provider.local_path("a.jpg") is None
@@ -1,18 +1,41 @@
 """
 Unit tests for DropboxStorageProvider
-- Config/validation (credentials, root path)
+- Config/validation (credentials, root path, pooled session)
+- check_health (lists one root entry)
 - list (mock Dropbox SDK, returns expected)
 - retrieve (mock Dropbox SDK, returns data or raises)
+- read_prefix (Range request via a cloned client)
+- list_entries (size and server_modified from the listing)
+- content_hash (Dropbox-stored hash, no download)
+- get_rendition / get_renditions (server-side thumbnails, batched)
+- get_url (temporary links, cached per version until shortly before expiry)
+- list_with_cursor / list_changes (incremental listing, cursor reset)
 - Error handling (bad creds, file not found)
 """
 
-from unittest.mock import Mock, patch
+import base64
+import io
+import time
+from datetime import datetime, timezone
+from unittest.mock import ANY, Mock, patch
 
 import pytest
-from dropbox.exceptions import ApiError
+from dropbox.exceptions import ApiError, HttpError
+from dropbox.files import (
+    DeletedMetadata,
+    FileMetadata,
+    ListFolderContinueError,
+    ThumbnailMode,
+    ThumbnailSize,
+)
+from PIL import Image
 
+from tagline_backend_app.imaging import THUMBNAIL_SIZE
 from tagline_backend_app.storage.dropbox import (
+    _THUMBNAIL_SIZES,
+    TEMPORARY_LINK_TTL,
     DropboxStorageProvider,
+    StorageCursorReset,
     StorageProviderMisconfigured,
 )
 
@@ -32,7 +55,7 @@ def test_init_refresh_token_success(dropbox_creds):
     with patch("dropbox.Dropbox") as MockDbx:
         provider = DropboxStorageProvider(**dropbox_creds)
         MockDbx.assert_called_once_with(
-            oauth2_refresh_token="tok", app_key="key", app_secret="sec"
+            oauth2_refresh_token="tok", app_key="key", app_secret="sec", session=ANY
         )
         assert provider.root_path == "/photos"
 
@@ -40,10 +63,36 @@ def test_init_refresh_token_success(dropbox_creds):
 def test_init_access_token_success():
     with patch("dropbox.Dropbox") as MockDbx:
         provider = DropboxStorageProvider(access_token="abc", root_path="/foo")
-        MockDbx.assert_called_once_with("abc")
+        MockDbx.assert_called_once_with("abc", session=ANY)
         assert provider.root_path == "/foo"
 
 
+def test_init_shares_a_pooled_session(dropbox_creds):
+    with (
+        patch("dropbox.create_session") as create_session,
+        patch("dropbox.Dropbox") as MockDbx,
+    ):
+        provider = DropboxStorageProvider(**dropbox_creds, max_connections=4)
+        create_session.assert_called_once_with(max_connections=4)
+        assert MockDbx.call_args.kwargs["session"] is create_session.return_value
+        provider.close()
+        MockDbx.return_value.close.assert_called_once()
+
+
+def test_check_health_lists_root(dropbox_creds):
+    with patch("dropbox.Dropbox") as MockDbx:
+        provider = DropboxStorageProvider(**dropbox_creds)
+        provider.check_health()
+        MockDbx.return_value.files_list_folder.assert_called_once_with(
+            "/photos", limit=1
+        )
+        MockDbx.return_value.files_list_folder.side_effect = ApiError(
+            "id", "err", "msg", "en"
+        )
+        with pytest.raises(ApiError):
+            provider.check_health()
+
+
 def test_init_missing_creds_raises():
     with pytest.raises(StorageProviderMisconfigured):
         DropboxStorageProvider()
@@ -99,3 +148,278 @@ def test_retrieve_handles_api_error(dropbox_creds):
         provider = DropboxStorageProvider(**dropbox_creds)
         with pytest.raises(FileNotFoundError):
             provider.retrieve("cat.jpg")
+
+
+# --- read_prefix ---
+def test_read_prefix_sends_range_header(dropbox_creds):
+    with patch("dropbox.Dropbox") as MockDbx:
+        mock_dbx = MockDbx.return_value
+        ranged = mock_dbx.clone.return_value
+        mock_res = Mock()
+        mock_res.raw.read.return_value = b"\xff\xd8\xff"
+        ranged.files_download.return_value = (Mock(), mock_res)
+        provider = DropboxStorageProvider(**dropbox_creds)
+        assert provider.read_prefix("cat.jpg", 3) == b"\xff\xd8\xff"
+        mock_dbx.check_and_refresh_access_token.assert_called_once()
+        mock_dbx.clone.assert_called_once_with(headers={"Range": "bytes=0-2"})
+        ranged.files_download.assert_called_once_with("/photos/cat.jpg")
+        mock_res.raw.read.assert_called_once_with(3, decode_content=True)
+        mock_res.close.assert_called_once()
+
+
+def test_read_prefix_handles_api_error(dropbox_creds):
+    with patch("dropbox.Dropbox") as MockDbx:
+        ranged = MockDbx.return_value.clone.return_value
+        ranged.files_download.side_effect = ApiError("req", "err", "user", "en-US")
+        provider = DropboxStorageProvider(**dropbox_creds)
+        with pytest.raises(FileNotFoundError):
+            provider.read_prefix("cat.jpg", 3)
+
+
+def test_read_prefix_empty_file(dropbox_creds):
+    with patch("dropbox.Dropbox") as MockDbx:
+        ranged = MockDbx.return_value.clone.return_value
+        ranged.files_download.side_effect = HttpError("req", 416, "")
+        provider = DropboxStorageProvider(**dropbox_creds)
+        assert provider.read_prefix("empty.jpg", 3) == b""
+
+
+# --- incremental listing ---
+def _file(path, content_hash="h"):
+    return Mock(
+        spec=FileMetadata,
+        path_display=path,
+        size=1,
+        server_modified=datetime(2024, 5, 1),
+        content_hash=content_hash,
+    )
+
+
+def _deleted(path):
+    return Mock(spec=DeletedMetadata, path_display=path)
+
+
+def test_list_with_cursor_returns_final_cursor(dropbox_creds):
+    with patch("dropbox.Dropbox") as MockDbx:
+        mock_dbx = MockDbx.return_value
+        mock_dbx.files_list_folder.return_value = Mock(
+            entries=[_file("/photos/a.jpg")], has_more=True, cursor="c1"
+        )
+        mock_dbx.files_list_folder_continue.return_value = Mock(
+            entries=[_file("/photos/sub/b.jpg")], has_more=False, cursor="c2"
+        )
+        provider = DropboxStorageProvider(**dropbox_creds)
+        assert provider.cursor_scope() == "dropbox:/photos"
+        entries, cursor = provider.list_with_cursor()
+        assert [e.key for e in entries] == ["a.jpg", "sub/b.jpg"]
+        assert cursor == "c2"
+
+
+def test_list_entries_uses_listing_metadata(dropbox_creds):
+    modified = datetime(2024, 5, 1, 12, 0, 0)
+    photo = Mock(
+        spec=FileMetadata,
+        path_display="/photos/a.JPG",
+        size=42,
+        server_modified=modified,
+        content_hash="abc",
+    )
+    notes = _file("/photos/a.txt")
+    with patch("dropbox.Dropbox") as MockDbx:
+        mock_dbx = MockDbx.return_value
+        mock_dbx.files_list_folder.return_value = Mock(
+            entries=[photo, notes], has_more=False, cursor="c1"
+        )
+        provider = DropboxStorageProvider(**dropbox_creds)
+        entries = provider.list_entries(extensions=[".jpg"])
+        assert [(e.key, e.size, e.content_hash) for e in entries] == [
+            ("a.JPG", 42, "abc")
+        ]
+        assert entries[0].mtime == modified.replace(tzinfo=timezone.utc).timestamp()
+
+
+def test_list_changes_applies_entries_in_order(dropbox_creds):
+    with patch("dropbox.Dropbox") as MockDbx:
+        mock_dbx = MockDbx.return_value
+        mock_dbx.files_list_folder_continue.side_effect = [
+            Mock(
+                entries=[
+                    _file("/photos/new.jpg"),
+                    _deleted("/photos/gone.jpg"),
+                    _file("/photos/old/x.jpg"),
+                ],
+                has_more=True,
+                cursor="c2",
+            ),
+            Mock(
+                entries=[_deleted("/photos/old"), _file("/photos/gone.jpg", "h2")],
+                has_more=False,
+                cursor="c3",
+            ),
+        ]
+        provider = DropboxStorageProvider(**dropbox_creds)
+        changes = provider.list_changes("c1")
+        assert changes.updated == ["new.jpg", "gone.jpg"]
+        assert changes.entries["gone.jpg"].content_hash == "h2"
+        assert changes.deleted == ["old"]
+        assert changes.cursor == "c3"
+        assert mock_dbx.files_list_folder_continue.call_args_list[0].args == ("c1",)
+
+
+def test_content_hash_uses_stored_metadata(dropbox_creds):
+    with patch("dropbox.Dropbox") as MockDbx:
+        mock_dbx = MockDbx.return_value
+        mock_dbx.files_get_metadata.return_value = _file("/photos/a.jpg", "abc")
+        provider = DropboxStorageProvider(**dropbox_creds)
+        assert provider.content_hash("a.jpg") == "abc"
+        mock_dbx.files_get_metadata.assert_called_once_with("/photos/a.jpg")
+        mock_dbx.files_download.assert_not_called()
+
+
+def test_list_changes_raises_on_cursor_reset(dropbox_creds):
+    with patch("dropbox.Dropbox") as MockDbx:
+        mock_dbx = MockDbx.return_value
+        mock_dbx.files_list_folder_continue.side_effect = ApiError(
+            "req", ListFolderContinueError.reset, "reset", "en-US"
+        )
+        provider = DropboxStorageProvider(**dropbox_creds)
+        with pytest.raises(StorageCursorReset):
+            provider.list_changes("stale")
+
+
+# --- renditions ---
+def test_get_rendition_picks_smallest_covering_thumbnail(dropbox_creds):
+    with patch("dropbox.Dropbox") as MockDbx:
+        mock_dbx = MockDbx.return_value
+        res = Mock(content=b"jpeg")
+        mock_dbx.files_get_thumbnail_v2.return_value = (Mock(), res)
+        provider = DropboxStorageProvider(**dropbox_creds)
+        assert provider.get_rendition("a.jpg", (512, 384)) == b"jpeg"
+        args, kwargs = mock_dbx.files_get_thumbnail_v2.call_args
+        assert args[0].get_path() == "/photos/a.jpg"
+        # Portrait photos come back as 640x960, still covering 512x384
+        assert kwargs["size"] == ThumbnailSize.w960h640
+        assert kwargs["mode"] == ThumbnailMode.fitone_bestfit
+        res.close.assert_called_once()
+        # Bigger than any Dropbox thumbnail: no API call
+        assert provider.max_rendition_size() == (1536, 1536)
+        assert provider.get_rendition("a.jpg", (2048, 1536)) is None
+        assert mock_dbx.files_get_thumbnail_v2.call_count == 1
+
+
+def _portrait_thumbnail(size) -> bytes:
+    """A JPEG the way fitone_bestfit fits a portrait photo: size transposed."""
+    ((width, height),) = [dims for dims, s in _THUMBNAIL_SIZES if s == size]
+    buf = io.BytesIO()
+    Image.new("RGB", (height, width), "red").save(buf, format="JPEG")
+    return buf.getvalue()
+
+
+def test_renditions_cover_portrait_photos(dropbox_creds):
+    def thumbnail(path, format, size, mode):
+        return Mock(), Mock(content=_portrait_thumbnail(size))
+
+    def batch(args):
+        data = [
+            Mock(thumbnail=base64.b64encode(_portrait_thumbnail(arg.size)).decode())
+            for arg in args
+        ]
+        return Mock(
+            entries=[
+                Mock(
+                    is_success=Mock(return_value=True), get_success=Mock(return_value=d)
+                )
+                for d in data
+            ]
+        )
+
+    with patch("dropbox.Dropbox") as MockDbx:
+        mock_dbx = MockDbx.return_value
+        mock_dbx.files_get_thumbnail_v2.side_effect = thumbnail
+        mock_dbx.files_get_thumbnail_batch.side_effect = batch
+        provider = DropboxStorageProvider(**dropbox_creds)
+        rendition = provider.get_rendition("tall.jpg", THUMBNAIL_SIZE)
+        renditions = provider.get_renditions(["tall.jpg"], THUMBNAIL_SIZE)
+    assert rendition is not None
+    for data in (rendition, renditions["tall.jpg"]):
+        width, height = Image.open(io.BytesIO(data)).size
+        assert height > width
+        # Wide enough for the 512x384 crop without upscaling
+        assert width >= THUMBNAIL_SIZE[0] and height >= THUMBNAIL_SIZE[1]
+
+
+def test_get_rendition_returns_none_when_unsupported(dropbox_creds):
+    with patch("dropbox.Dropbox") as MockDbx:
+        MockDbx.return_value.files_get_thumbnail_v2.side_effect = ApiError(
+            "req", "unsupported_extension", "user", "en-US"
+        )
+        provider = DropboxStorageProvider(**dropbox_creds)
+        assert provider.get_rendition("a.cr2", (512, 384)) is None
+
+
+def test_get_renditions_batches_25_per_call(dropbox_creds):
+    def batch(args):
+        entries = []
+        for arg in args:
+            if arg.path.endswith("bad.jpg"):
+                entries.append(Mock(is_success=Mock(return_value=False)))
+            else:
+                data = Mock(thumbnail=base64.b64encode(arg.path.encode()).decode())
+                entries.append(
+                    Mock(
+                        is_success=Mock(return_value=True),
+                        get_success=Mock(return_value=data),
+                    )
+                )
+        return Mock(entries=entries)
+
+    with patch("dropbox.Dropbox") as MockDbx:
+        mock_dbx = MockDbx.return_value
+        mock_dbx.files_get_thumbnail_batch.side_effect = batch
+        provider = DropboxStorageProvider(**dropbox_creds)
+        keys = [f"{i}.jpg" for i in range(30)] + ["bad.jpg"]
+        renditions = provider.get_renditions(keys, (512, 384))
+        assert mock_dbx.files_get_thumbnail_batch.call_count == 2
+        assert len(renditions) == 30
+        assert renditions["7.jpg"] == b"/photos/7.jpg"
+        assert "bad.jpg" not in renditions
+
+
+def test_get_url_caches_temporary_links(dropbox_creds):
+    with patch("dropbox.Dropbox") as MockDbx:
+        mock_dbx = MockDbx.return_value
+        mock_dbx.files_get_temporary_link.side_effect = [
+            Mock(link="https://dl/1"),
+            Mock(link="https://dl/2"),
+        ]
+        provider = DropboxStorageProvider(**dropbox_creds)
+        assert provider.get_url("a.jpg", "h1") == "https://dl/1"
+        assert provider.get_url("a.jpg", "h1") == "https://dl/1"
+        mock_dbx.files_get_temporary_link.assert_called_once_with("/photos/a.jpg")
+
+        # Expired links are fetched again
+        provider._links.expire(time.monotonic() + TEMPORARY_LINK_TTL + 1)
+        assert provider.get_url("a.jpg", "h1") == "https://dl/2"
+
+
+def test_get_url_replaced_file_gets_a_new_link(dropbox_creds):
+    with patch("dropbox.Dropbox") as MockDbx:
+        mock_dbx = MockDbx.return_value
+        mock_dbx.files_get_temporary_link.side_effect = [
+            Mock(link="https://dl/old"),
+            Mock(link="https://dl/new"),
+        ]
+        provider = DropboxStorageProvider(**dropbox_creds)
+        assert provider.get_url("a.jpg", "h1") == "https://dl/old"
+        assert provider.get_url("a.jpg", "h2") == "https://dl/new"
+        assert mock_dbx.files_get_temporary_link.call_count == 2
+
+
+def test_get_url_handles_api_error(dropbox_creds):
+    with patch("dropbox.Dropbox") as MockDbx:
+        MockDbx.return_value.files_get_temporary_link.side_effect = ApiError(
+            "req", "not_found", "user", "en-US"
+        )
+        provider = DropboxStorageProvider(**dropbox_creds)
+        with pytest.raises(FileNotFoundError):
+            provider.get_url("missing.jpg")
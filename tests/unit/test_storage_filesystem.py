@@ -2,7 +2,10 @@
 Unit tests for FilesystemStorageProvider
 - Config/validation (path handling, sandboxing)
 - list (returns correct files, respects prefix)
+- list_entries (size/mtime/inode from scandir, extension filter, nested walk)
 - retrieve (returns file data, raises on not found)
+- read_prefix (returns leading bytes, sandboxed like retrieve)
+- local_path (resolved file path for sendfile, sandboxed like retrieve)
 - Error handling (bad path, traversal, etc)
 """
 
@@ -58,6 +61,39 @@ def test_list_prefix(tmp_storage_root):
     assert files == {os.path.join("subdir", "bird.jpg")}
 
 
+def test_list_entries_returns_stat_data(tmp_storage_root):
+    provider = FilesystemStorageProvider(tmp_storage_root)
+    entries = {e.key: e for e in provider.list_entries()}
+    assert set(entries) == {"cat.jpg", "dog.jpg", os.path.join("subdir", "bird.jpg")}
+    st = (tmp_storage_root / "subdir" / "bird.jpg").stat()
+    bird = entries[os.path.join("subdir", "bird.jpg")]
+    assert (bird.size, bird.mtime, bird.inode) == (5, st.st_mtime, st.st_ino)
+
+
+def test_list_entries_filters_extensions(tmp_storage_root):
+    (tmp_storage_root / "notes.txt").write_bytes(b"hi")
+    (tmp_storage_root / "subdir" / "LOUD.JPG").write_bytes(b"HI")
+    provider = FilesystemStorageProvider(tmp_storage_root)
+    keys = set(e.key for e in provider.list_entries(extensions=[".jpg"]))
+    assert "notes.txt" not in keys
+    assert os.path.join("subdir", "LOUD.JPG") in keys
+
+
+def test_list_entries_walks_nested_dirs(tmp_storage_root):
+    deep = tmp_storage_root / "a" / "b" / "c"
+    deep.mkdir(parents=True)
+    (deep / "x.jpg").write_bytes(b"x")
+    (tmp_storage_root / "e").mkdir()
+    (tmp_storage_root / "e" / "y.jpg").write_bytes(b"y")
+    provider = FilesystemStorageProvider(tmp_storage_root)
+    keys = set(e.key for e in provider.list_entries(workers=2))
+    assert os.path.join("a", "b", "c", "x.jpg") in keys
+    assert os.path.join("e", "y.jpg") in keys
+    assert len(keys) == 5
+    prefixed = set(e.key for e in provider.list_entries(prefix="a/b"))
+    assert prefixed == {os.path.join("a", "b", "c", "x.jpg")}
+
+
 def test_retrieve_file(tmp_storage_root):
     provider = FilesystemStorageProvider(tmp_storage_root)
     f = provider.retrieve("cat.jpg")
@@ -65,6 +101,23 @@ def test_retrieve_file(tmp_storage_root):
     f.close()
 
 
+def test_read_prefix(tmp_storage_root):
+    provider = FilesystemStorageProvider(tmp_storage_root)
+    assert provider.read_prefix("cat.jpg", 2) == b"me"
+    assert provider.read_prefix("subdir/bird.jpg", 100) == b"tweet"
+    with pytest.raises(FileNotFoundError):
+        provider.read_prefix("../cat.jpg", 2)
+
+
+def test_local_path(tmp_storage_root):
+    provider = FilesystemStorageProvider(tmp_storage_root)
+    path = provider.local_path("subdir/bird.jpg")
+    assert path == (tmp_storage_root / "subdir" / "bird.jpg").resolve()
+    for key in ("nope.jpg", "../cat.jpg", "subdir"):
+        with pytest.raises(FileNotFoundError):
+            provider.local_path(key)
+
+
 def test_retrieve_not_found(tmp_storage_root):
     provider = FilesystemStorageProvider(tmp_storage_root)
     with pytest.raises(FileNotFoundError):
@@ -1,13 +1,16 @@
 """
 Unit tests for InMemoryStorageProvider
 - All ops: behaves as ephemeral store (list, retrieve, add, delete)
+- content_hash (default streaming implementation, Dropbox block algorithm)
 """
 
+import hashlib
 from io import BytesIO
 
 import pytest
 
 from tagline_backend_app.storage.memory import InMemoryStorageProvider
+from tagline_backend_app.storage.provider import CONTENT_HASH_BLOCK_SIZE
 
 pytestmark = pytest.mark.unit
 
@@ -27,6 +30,26 @@ def test_list_returns_keys():
     assert list(provider.list(prefix="cat")) == ["cat.jpg"]
 
 
+def test_read_prefix():
+    provider = InMemoryStorageProvider()
+    provider.upload("foo.jpg", BytesIO(b"catalog"))
+    assert provider.read_prefix("foo.jpg", 3) == b"cat"
+    assert provider.read_prefix("foo.jpg", 100) == b"catalog"
+    with pytest.raises(FileNotFoundError):
+        provider.read_prefix("nope.jpg", 3)
+
+
+def test_content_hash_uses_dropbox_block_algorithm():
+    provider = InMemoryStorageProvider()
+    data = b"a" * CONTENT_HASH_BLOCK_SIZE + b"tail"
+    provider.upload("big.jpg", BytesIO(data))
+    blocks = hashlib.sha256(data[:CONTENT_HASH_BLOCK_SIZE]).digest()
+    blocks += hashlib.sha256(b"tail").digest()
+    assert provider.content_hash("big.jpg") == hashlib.sha256(blocks).hexdigest()
+    with pytest.raises(FileNotFoundError):
+        provider.content_hash("nope.jpg")
+
+
 def test_retrieve_missing_raises():
     provider = InMemoryStorageProvider()
     with pytest.raises(FileNotFoundError):
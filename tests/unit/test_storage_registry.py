@@ -0,0 +1,89 @@
+"""
+Unit tests for tagline_backend_app.storage.registry.ProviderRegistry
+Covers: one instance per name (also under concurrent first use), failed builds
+not cached, health checks resetting unhealthy providers, reset closing providers
+"""
+
+import threading
+import time
+
+import pytest
+
+from tagline_backend_app.storage.filesystem import FilesystemStorageProvider
+from tagline_backend_app.storage.memory import InMemoryStorageProvider
+from tagline_backend_app.storage.provider import StorageProviderMisconfigured
+from tagline_backend_app.storage.registry import ProviderRegistry
+
+pytestmark = pytest.mark.unit
+
+
+class _ClosingProvider(InMemoryStorageProvider):
+    def __init__(self):
+        super().__init__()
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_registry_builds_each_provider_once():
+    registry = ProviderRegistry()
+    built = []
+
+    def factory():
+        time.sleep(0.01)  # Widen the race between first users
+        built.append(1)
+        return InMemoryStorageProvider()
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.get("mem", factory)))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(built) == 1
+    assert all(p is results[0] for p in results)
+
+
+def test_registry_retries_failed_builds():
+    registry = ProviderRegistry()
+
+    def broken():
+        raise StorageProviderMisconfigured("no root")
+
+    with pytest.raises(StorageProviderMisconfigured):
+        registry.get("fs", broken)
+    provider = registry.get("fs", InMemoryStorageProvider)
+    assert registry.get("fs", broken) is provider
+
+
+def test_registry_health_resets_unhealthy_providers(tmp_path):
+    root = tmp_path / "photos"
+    root.mkdir()
+    registry = ProviderRegistry()
+    provider = registry.get("fs", lambda: FilesystemStorageProvider(root))
+    assert registry.health() == {
+        "fs": {"provider": "FilesystemStorageProvider", "ok": True, "error": None}
+    }
+
+    root.rmdir()
+    report = registry.health()
+    assert report["fs"]["ok"] is False
+    assert "not a directory" in report["fs"]["error"]
+    root.mkdir()
+    assert registry.get("fs", lambda: FilesystemStorageProvider(root)) is not provider
+
+
+def test_registry_reset_closes_providers():
+    registry = ProviderRegistry()
+    first, second = _ClosingProvider(), _ClosingProvider()
+    assert registry.get("a", lambda: first) is first
+    assert registry.get("b", lambda: second) is second
+    registry.reset("a")
+    assert first.closed and not second.closed
+    assert registry.get("a", _ClosingProvider) is not first
+    registry.reset()
+    assert second.closed
@@ -0,0 +1,77 @@
+"""
+Unit tests for tagline_backend_app.transform_pool
+Covers: running transforms in worker processes, bounded queue, recovery from a dead
+worker, inline fallback
+"""
+
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from tagline_backend_app import transform_pool
+from tagline_backend_app.transform_pool import (
+    TransformPool,
+    TransformQueueFull,
+    run_transform,
+)
+
+pytestmark = pytest.mark.unit
+
+
+def _upper(data: bytes) -> bytes:
+    # Module-level so it can be pickled into a worker process
+    return data.upper()
+
+
+def _fail(data: bytes) -> bytes:
+    raise ValueError("cannot identify image file")
+
+
+def _die(data: bytes) -> bytes:
+    # Stands in for a worker killed by the OOM killer or a codec crash
+    os._exit(1)
+
+
+@pytest.fixture
+def pool():
+    p = TransformPool(workers=1, queue_depth=0)
+    try:
+        yield p
+    finally:
+        p.shutdown()
+
+
+def test_run_in_worker_process(pool):
+    assert pool.run(_upper, b"jpeg") == b"JPEG"
+    assert pool.stats()["completed"] == 1
+    assert pool.stats()["in_flight"] == 0
+
+
+def test_worker_exception_propagates(pool):
+    with pytest.raises(ValueError, match="cannot identify"):
+        pool.run(_fail, b"garbage")
+
+
+def test_dead_worker_fails_one_transform_and_restarts_the_pool(pool):
+    with pytest.raises(BrokenProcessPool):
+        pool.run(_die, b"huge.heic")
+    assert pool.run(_upper, b"jpeg") == b"JPEG"
+    assert pool.stats()["restarts"] == 1
+    assert pool.stats()["in_flight"] == 0
+
+
+def test_queue_full_is_rejected(pool):
+    # Occupy the only slot as if a transform were already running
+    pool._slots.acquire()
+    try:
+        with pytest.raises(TransformQueueFull):
+            pool.run(_upper, b"x")
+    finally:
+        pool._slots.release()
+    assert pool.stats()["rejected"] == 1
+
+
+def test_run_transform_inline_without_pool(monkeypatch):
+    monkeypatch.setattr(transform_pool, "TRANSFORM_POOL", None)
+    assert run_transform(_upper, b"webp") == b"WEBP"
@@ -0,0 +1,149 @@
+"""
+Unit tests for tagline_backend_app.watcher.FilesystemWatcher
+Covers: resolving event paths to changes, applying them, queue depth, scan lock
+(and backing off while it is taken), live polling
+"""
+
+import io
+import threading
+import time
+
+import pytest
+from PIL import Image
+
+from tagline_backend_app.crud.photo import PhotoRepository
+from tagline_backend_app.scan_lock import LeaseScanLock
+from tagline_backend_app.storage.filesystem import FilesystemStorageProvider
+from tagline_backend_app.watcher import FilesystemWatcher
+
+pytestmark = pytest.mark.unit
+
+
+def _write_jpeg(path, size=(20, 10)):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    buf = io.BytesIO()
+    Image.new("RGB", size, "green").save(buf, format="JPEG")
+    path.write_bytes(buf.getvalue())
+
+
+@pytest.fixture
+def root(tmp_path):
+    d = tmp_path / "photos"
+    d.mkdir()
+    return d
+
+
+def _filenames(session_factory):
+    db = session_factory()
+    try:
+        return sorted(p.filename for p in PhotoRepository(db).list())
+    finally:
+        db.close()
+
+
+def test_apply_imports_updates_and_deletes(root, session_factory):
+    watcher = FilesystemWatcher(FilesystemStorageProvider(root), session_factory)
+    _write_jpeg(root / "a.jpg")
+    _write_jpeg(root / "album" / "b.jpg")
+    watcher.apply({root / "a.jpg": True, root / "album": True})
+    assert _filenames(session_factory) == ["a.jpg", "album/b.jpg"]
+
+    (root / "a.jpg").unlink()
+    _write_jpeg(root / "album" / "b.jpg", size=(40, 30))
+    watcher.apply({root / "a.jpg": False, root / "album" / "b.jpg": False})
+    db = session_factory()
+    photos = PhotoRepository(db).list()
+    assert [(p.filename, p.width, p.height) for p in photos] == [
+        ("album/b.jpg", 40, 30)
+    ]
+    db.close()
+    stats = watcher.stats()
+    assert (stats["imported"], stats["modified"], stats["deleted"]) == (2, 1, 1)
+    assert stats["batches"] == 2
+
+
+def test_modified_directory_is_not_expanded(root, session_factory):
+    watcher = FilesystemWatcher(FilesystemStorageProvider(root), session_factory)
+    _write_jpeg(root / "album" / "b.jpg")
+    watcher.apply({root / "album": False})
+    assert _filenames(session_factory) == []
+
+
+def test_apply_waits_for_the_scan_lock(root, session_factory):
+    watcher = FilesystemWatcher(FilesystemStorageProvider(root), session_factory)
+    _write_jpeg(root / "a.jpg")
+    scanning = LeaseScanLock(session_factory)
+    assert scanning.acquire()
+    assert watcher.apply({root / "a.jpg": True}) is False
+    assert _filenames(session_factory) == []
+
+    scanning.release()
+    assert watcher.apply({root / "a.jpg": True}) is True
+    assert _filenames(session_factory) == ["a.jpg"]
+
+
+class _CountingStop(threading.Event):
+    """Records wait() timeouts instead of sleeping; sets itself after limit."""
+
+    def __init__(self, limit):
+        super().__init__()
+        self.limit = limit
+        self.waits = []
+
+    def wait(self, timeout=None):
+        self.waits.append(timeout)
+        if len(self.waits) >= self.limit:
+            self.set()
+        return self.is_set()
+
+
+def test_lock_retries_back_off(root, session_factory, monkeypatch):
+    watcher = FilesystemWatcher(FilesystemStorageProvider(root), session_factory)
+    results = iter([False] * 7 + [True] + [False] * 2)
+
+    def apply(paths):
+        applied = next(results)
+        if applied:
+            # Keep the loop busy after a success
+            watcher.enqueue(paths.items())
+        return applied
+
+    monkeypatch.setattr(watcher, "apply", apply)
+    watcher._stop = _CountingStop(limit=9)
+    watcher.enqueue([(root / "a.jpg", True)])
+    watcher._apply_loop()
+    # Doubling up to the cap, and back to the first delay once a batch applies
+    assert watcher._stop.waits == [1, 2, 4, 8, 16, 30, 30, 1, 2]
+    assert watcher.stats()["queue_depth"] == 1
+
+
+def test_enqueue_coalesces_paths(root, session_factory):
+    watcher = FilesystemWatcher(FilesystemStorageProvider(root), session_factory)
+    watcher.enqueue([(root / "a.jpg", True), (root / "a.jpg", False)])
+    watcher.enqueue([(root / "b.jpg", False)])
+    stats = watcher.stats()
+    assert stats["queue_depth"] == 2
+    assert stats["events"] == 3
+
+
+def test_live_watch_imports_new_files(root, session_factory):
+    watcher = FilesystemWatcher(
+        FilesystemStorageProvider(root),
+        session_factory,
+        debounce_ms=50,
+        force_polling=True,
+        poll_interval_ms=50,
+    )
+    watcher.start()
+    try:
+        time.sleep(0.3)  # Let the poller take its first snapshot
+        _write_jpeg(root / "dropped.jpg")
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            if _filenames(session_factory) == ["dropped.jpg"]:
+                break
+            time.sleep(0.05)
+        assert _filenames(session_factory) == ["dropped.jpg"]
+        assert watcher.stats()["queue_depth"] == 0
+    finally:
+        watcher.stop()